@@ -0,0 +1,173 @@
+"""
+llmauto.core.backoff -- Wartezeiten und Wiederholungen nach Claude-Aufrufen
+============================================================================
+Klassifiziert Ergebnisse (Erfolg, voruebergehender Fehler wie Rate-Limit oder
+Ueberlastung, dauerhafter Fehler wie fehlende CLI) und bestimmt daraus
+Wartezeit und Wiederholung: kein Warten nach Erfolg, exponentielles Backoff
+mit Jitter bei voruebergehenden Fehlern, sofortiger Abbruch bei dauerhaften.
+Cooldowns gelten pro Modell und werden von allen Links (und Ketten im
+Supervisor) eines Prozesses geteilt.
+"""
+import random
+import re
+import threading
+import time
+from collections import namedtuple
+
+
+# Ergebnis-Klassen
+OK = "ok"
+TRANSIENT = "transient"    # Rate-Limit, Ueberlastung, Netzwerk -> Backoff + Wiederholung
+PERMANENT = "permanent"    # CLI fehlt, Login/Modell ungueltig -> Kette abbrechen
+ERROR = "error"            # sonstiger Fehlschlag (rc != 0) -> Backoff, keine Wiederholung
+TIMEOUT = "timeout"        # Link hat das Zeitlimit erreicht -> kein zusaetzliches Warten
+ABORTED = "aborted"        # Hard-Stop
+
+TRANSIENT_PATTERNS = re.compile(
+    r"rate.?limit|too many requests|\b429\b|overloaded|\b529\b|\b503\b|"
+    r"temporarily unavailable|try again later|ECONNRESET|ETIMEDOUT|network error",
+    re.IGNORECASE,
+)
+PERMANENT_PATTERNS = re.compile(
+    r"invalid api key|authentication|not logged in|please run /login|"
+    r"invalid model|unknown model|model not found",
+    re.IGNORECASE,
+)
+
+# kind: Ergebnis-Klasse, delay: Wartezeit in Sekunden, retry: Link wiederholen
+Decision = namedtuple("Decision", ["kind", "delay", "retry"])
+
+
+def classify(result):
+    """Ordnet ein Runner-Ergebnis einer Ergebnis-Klasse zu."""
+    if result.get("success"):
+        return OK
+    returncode = result.get("returncode")
+    if returncode == -2:
+        return PERMANENT
+    if returncode == -4:
+        return ABORTED
+    if returncode == -1:
+        return TIMEOUT
+    # Nur Fehlertexte der CLI, nie die Antwort des Modells (die kann z.B. von
+    # "authentication" oder "rate limit" handeln)
+    text = f"{result.get('stderr') or ''}\n{result.get('error') or ''}"
+    if TRANSIENT_PATTERNS.search(text):
+        return TRANSIENT
+    if PERMANENT_PATTERNS.search(text):
+        return PERMANENT
+    return ERROR
+
+
+class ModelCooldowns:
+    """Cooldown-Zeitpunkte pro Modell (thread-sicher, prozessweit geteilt)."""
+
+    def __init__(self):
+        self._until = {}
+        self._lock = threading.Lock()
+
+    def extend(self, model, seconds):
+        """Sperrt ``model`` fuer mindestens ``seconds`` Sekunden ab jetzt."""
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._until[model] = max(self._until.get(model, 0.0), until)
+
+    def remaining(self, model):
+        with self._lock:
+            return max(0.0, self._until.get(model, 0.0) - time.monotonic())
+
+    def clear(self, model=None):
+        with self._lock:
+            if model is None:
+                self._until.clear()
+            else:
+                self._until.pop(model, None)
+
+
+SHARED_COOLDOWNS = ModelCooldowns()
+
+
+class BackoffPolicy:
+    """Exponentielles Backoff mit Jitter (Standard-Policy "exponential").
+
+    Wartezeit nach dem n-ten Fehlschlag eines Modells in Folge:
+    ``min(max_seconds, base_seconds * factor ** (n - 1))`` +/- ``jitter``.
+    """
+
+    name = "exponential"
+
+    def __init__(self, base_seconds=5, factor=2, max_seconds=600, jitter=0.2,
+                 max_retries=3, step_delay_seconds=0, cooldowns=None, rng=None):
+        self.base_seconds = base_seconds
+        self.factor = factor
+        self.max_seconds = max_seconds
+        self.jitter = jitter
+        self.max_retries = max_retries
+        self.step_delay_seconds = step_delay_seconds
+        self.cooldowns = cooldowns if cooldowns is not None else SHARED_COOLDOWNS
+        self._rng = rng or random.random
+        self._failures = {}  # Modell -> Fehlschlaege in Folge
+
+    def backoff_seconds(self, failures):
+        delay = min(self.max_seconds, self.base_seconds * self.factor ** max(0, failures - 1))
+        if self.jitter:
+            delay *= 1 + self.jitter * (2 * self._rng() - 1)
+        return max(0.0, delay)
+
+    def cooldown_remaining(self, model):
+        """Sekunden, die vor dem naechsten Aufruf von ``model`` zu warten sind."""
+        return self.cooldowns.remaining(model)
+
+    def record(self, result, model):
+        """Wertet ein Ergebnis aus. Returns: Decision(kind, delay, retry)"""
+        kind = classify(result)
+        if kind == OK:
+            self._failures[model] = 0
+            return Decision(kind, 0.0, False)
+        if kind in (PERMANENT, ABORTED):
+            return Decision(kind, 0.0, False)
+        failures = self._failures.get(model, 0) + 1
+        self._failures[model] = failures
+        if kind == TIMEOUT:
+            return Decision(kind, 0.0, False)
+        delay = self.backoff_seconds(failures)
+        if kind == TRANSIENT:
+            # Modell-Cooldown: gilt auch fuer andere Links mit diesem Modell
+            self.cooldowns.extend(model, delay)
+            return Decision(kind, delay, self.max_retries > 0)
+        return Decision(kind, delay, False)
+
+
+class FixedPolicy(BackoffPolicy):
+    """Feste Wartezeiten wie vor dem Backoff (Policy "fixed")."""
+
+    name = "fixed"
+
+    def __init__(self, failure_seconds=30, step_delay_seconds=5, **kwargs):
+        kwargs.setdefault("max_retries", 0)
+        super().__init__(step_delay_seconds=step_delay_seconds, **kwargs)
+        self.failure_seconds = failure_seconds
+
+    def backoff_seconds(self, failures):
+        return self.failure_seconds
+
+
+POLICIES = {
+    BackoffPolicy.name: BackoffPolicy,
+    FixedPolicy.name: FixedPolicy,
+}
+
+
+def register_policy(cls):
+    """Registriert eine eigene Policy-Klasse (Name aus ``cls.name``)."""
+    POLICIES[cls.name] = cls
+    return cls
+
+
+def make_policy(config=None):
+    """Erstellt die Policy aus dem ``backoff``-Abschnitt der Config."""
+    options = dict(config or {})
+    name = options.pop("policy", BackoffPolicy.name)
+    if name not in POLICIES:
+        raise ValueError(f"Unbekannte Backoff-Policy '{name}' (moeglich: {', '.join(POLICIES)})")
+    return POLICIES[name](**options)
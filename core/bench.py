@@ -0,0 +1,255 @@
+"""
+llmauto.core.bench -- Orchestrierungs-Benchmark
+=================================================
+Misst den Eigenaufwand von run_chain_async, ChainState und Prompt-Registry
+ohne Modellzeit: synthetische Ketten mit 1..n Gliedern laufen ueber mehrere
+Runden gegen ``scripts/fake_claude.py`` (per $LLMAUTO_CLAUDE_CMD).
+
+Je Fall wird berichtet:
+  - Overhead pro Glied: Wandzeit minus Laufzeit der CLI-Prozesse
+  - Dateisystem-Operationen pro Glied (ueber Audit-Hooks: open, rename,
+    remove, mkdir, scandir, SQLite-Verbindungen; ``stat`` ist nicht erfasst)
+  - Speicher: nach dem Lauf verbleibender Zuwachs und Spitze (tracemalloc,
+    in einem eigenen Durchlauf, damit die Zeitmessung unverfaelscht bleibt)
+
+Die Ketten heissen ``_bench-<n>``; State, Logs und Historie-Eintraege werden
+nach jedem Fall entfernt.
+"""
+import asyncio
+import contextlib
+import gc
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from .config import BASE_DIR
+from .runner import CLAUDE_CMD_ENV, ClaudeRunner
+
+
+FAKE_CLAUDE = BASE_DIR / "scripts" / "fake_claude.py"
+DEFAULT_LINK_COUNTS = (1, 10, 100)
+DEFAULT_ROUNDS = 5
+BENCH_PREFIX = "_bench-"
+BENCH_PROMPT = "Benchmark-Glied {LINK}, Runde {ROUND}. Handoff: state/{CHAIN}/handoff.md"
+
+# Audit-Events -> Zaehler-Name
+_FS_EVENTS = {
+    "os.rename": "rename",
+    "os.remove": "remove",
+    "os.mkdir": "mkdir",
+    "os.scandir": "scandir",
+    "os.listdir": "scandir",
+    "sqlite3.connect": "sqlite",
+    "subprocess.Popen": "spawn",
+}
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND
+_fs_counts = None
+_hook_installed = False
+
+
+def _audit_hook(event, args):
+    counts = _fs_counts
+    if counts is None:
+        return
+    if event == "open":
+        mode, flags = args[1], args[2]
+        write = any(c in mode for c in "wax+") if isinstance(mode, str) else bool(flags & _WRITE_FLAGS)
+        counts["write" if write else "read"] += 1
+    else:
+        name = _FS_EVENTS.get(event)
+        if name:
+            counts[name] += 1
+
+
+@contextlib.contextmanager
+def count_fs_ops():
+    """Zaehlt Dateisystem-Operationen im Block (Audit-Hook, einmal installiert)."""
+    global _fs_counts, _hook_installed
+    if not _hook_installed:
+        sys.addaudithook(_audit_hook)
+        _hook_installed = True
+    counts = dict.fromkeys(["read", "write", "rename", "remove", "mkdir", "scandir", "sqlite", "spawn"], 0)
+    _fs_counts = counts
+    try:
+        yield counts
+    finally:
+        _fs_counts = None
+
+
+def fake_command():
+    """Kommandozeile fuer $LLMAUTO_CLAUDE_CMD, die scripts/fake_claude.py startet."""
+    cmd = [sys.executable, str(FAKE_CLAUDE)]
+    if sys.platform == "win32":
+        return subprocess.list2cmdline(cmd)
+    return shlex.join(cmd)
+
+
+def bench_config(links, rounds):
+    """Synthetische Kette: ``links`` sequentielle Glieder, ``rounds`` Runden."""
+    return {
+        "chain_name": f"{BENCH_PREFIX}{links}",
+        "description": "Orchestrierungs-Benchmark",
+        "mode": "loop",
+        "max_rounds": rounds,
+        "runtime_hours": 0,
+        "deadline": "",
+        "max_consecutive_blocks": 5,
+        "links": [
+            {"name": f"link-{i + 1}", "role": "worker", "model": "fake", "prompt": BENCH_PROMPT}
+            for i in range(links)
+        ],
+        "prompts": {},
+        "task_pools": {},
+    }
+
+
+def _cleanup(chain_name, created=()):
+    """Entfernt State, Logs und Historie der Kette sowie vom Lauf angelegte Pfade."""
+    shutil.rmtree(BASE_DIR / "state" / chain_name, ignore_errors=True)
+    logs = BASE_DIR / "logs"
+    if logs.is_dir():
+        for path in logs.glob(f"{chain_name}*.log*"):
+            path.unlink(missing_ok=True)
+    from .history import DEFAULT_DB_PATH, RunHistory, close_shared
+    close_shared()
+    if DEFAULT_DB_PATH.exists() and DEFAULT_DB_PATH not in created:
+        history = RunHistory()
+        try:
+            history.delete_chain(chain_name)
+        finally:
+            history.close()
+    for path in created:
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+
+def _missing_paths():
+    """Laufzeit-Pfade, die erst der Benchmark anlegen wuerde (danach wieder entfernen)."""
+    from .history import DEFAULT_DB_PATH
+    candidates = [DEFAULT_DB_PATH, BASE_DIR / "logs", BASE_DIR / "state"]
+    return [path for path in candidates if not path.exists()]
+
+
+@contextlib.contextmanager
+def _bench_environment(latency, output_bytes):
+    """Fake-CLI per Umgebung aktivieren, Konsolenausgabe der Kette verwerfen."""
+    env = {
+        CLAUDE_CMD_ENV: fake_command(),
+        "FAKE_CLAUDE_LATENCY": str(latency),
+        "FAKE_CLAUDE_OUTPUT_BYTES": str(output_bytes),
+        "FAKE_CLAUDE_EXIT_CODE": "0",
+        "FAKE_CLAUDE_HANDOFF": "auto",
+    }
+    saved = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _run_once(links, rounds, latency, output_bytes):
+    """Ein Lauf der synthetischen Kette. Returns: (Wandzeit, CLI-Laufzeiten)"""
+    from ..modes.chain import run_chain_async
+
+    config = bench_config(links, rounds)
+    chain_name = config["chain_name"]
+    cli_durations = []
+    original = ClaudeRunner.run_async
+
+    async def timed(self, prompt, **overrides):
+        result = await original(self, prompt, **overrides)
+        cli_durations.append(result.get("duration_s") or 0.0)
+        return result
+
+    _cleanup(chain_name)
+    created = _missing_paths()
+    ClaudeRunner.run_async = timed
+    try:
+        with _bench_environment(latency, output_bytes):
+            start = time.perf_counter()
+            rc = asyncio.run(run_chain_async(chain_name, config=config))
+            wall = time.perf_counter() - start
+    finally:
+        ClaudeRunner.run_async = original
+        _cleanup(chain_name, created)
+    if rc != 0:
+        raise RuntimeError(f"Benchmark-Kette {chain_name} endete mit Exit-Code {rc}")
+    return wall, cli_durations
+
+
+def run_case(links, rounds=DEFAULT_ROUNDS, latency=0.0, output_bytes=200, memory=True):
+    """Misst eine Kettengroesse. Returns: dict mit Zeit-, Datei- und Speicherwerten"""
+    with count_fs_ops() as fs:
+        wall, cli_durations = _run_once(links, rounds, latency, output_bytes)
+    calls = len(cli_durations)
+    cli_total = sum(cli_durations)
+    per_call = max(calls, 1)
+    result = {
+        "links": links,
+        "rounds": rounds,
+        "calls": calls,
+        "wall_s": round(wall, 3),
+        "cli_ms_per_call": round(cli_total / per_call * 1000, 2),
+        "overhead_ms_per_link": round((wall - cli_total) / per_call * 1000, 2),
+        "fs_per_link": {name: round(count / per_call, 2) for name, count in fs.items()},
+        "mem_retained_kib": None,
+        "mem_peak_kib": None,
+    }
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            _run_once(links, rounds, latency, output_bytes)
+            gc.collect()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result["mem_retained_kib"] = round((current - before) / 1024, 1)
+        result["mem_peak_kib"] = round((peak - before) / 1024, 1)
+    return result
+
+
+def run_benchmark(link_counts=DEFAULT_LINK_COUNTS, rounds=DEFAULT_ROUNDS, latency=0.0,
+                  output_bytes=200, memory=True, progress=None):
+    """Alle Faelle nacheinander. ``progress(result)`` wird nach jedem Fall aufgerufen."""
+    results = []
+    for links in link_counts:
+        result = run_case(links, rounds, latency, output_bytes, memory)
+        results.append(result)
+        if progress:
+            progress(result)
+    return results
+
+
+def format_report(results):
+    """Tabelle fuer die Konsole."""
+    header = (f"{'Glieder':>7} {'Runden':>6} {'Aufrufe':>7} {'Wand s':>8} {'CLI ms':>8} "
+              f"{'Overhead ms':>11} {'open r/w':>9} {'rename':>6} {'sqlite':>6} "
+              f"{'Speicher +KiB':>13} {'Peak KiB':>9}")
+    lines = [header, "-" * len(header)]
+    for r in results:
+        fs = r["fs_per_link"]
+        mem = "-" if r["mem_retained_kib"] is None else f"{r['mem_retained_kib']:.1f}"
+        peak = "-" if r["mem_peak_kib"] is None else f"{r['mem_peak_kib']:.1f}"
+        lines.append(
+            f"{r['links']:>7} {r['rounds']:>6} {r['calls']:>7} {r['wall_s']:>8.2f} "
+            f"{r['cli_ms_per_call']:>8.1f} {r['overhead_ms_per_link']:>11.2f} "
+            f"{fs['read']:>4.1f}/{fs['write']:<4.1f} {fs['rename']:>6.1f} {fs['sqlite']:>6.1f} "
+            f"{mem:>13} {peak:>9}")
+    lines.append("Overhead und Dateioperationen jeweils pro Glied-Aufruf.")
+    return "\n".join(lines)
@@ -0,0 +1,153 @@
+"""
+llmauto.core.cache -- Ergebnis-Cache fuer ``llmauto pipe``
+============================================================
+Inhaltsadressierter Cache auf der Platte: der Schluessel ist ein SHA-256 ueber
+Prompt, Modell, Fallback-Modell, Berechtigungsmodus, erlaubte Tools,
+Ausgabeformat und einen Fingerabdruck des Arbeitsverzeichnisses. Eintraege verfallen nach
+``ttl_seconds``; uebersteigt der Cache ``max_bytes``, werden die am laengsten
+nicht gelesenen Eintraege entfernt (LRU ueber die mtime der Dateien).
+
+Gespeichert werden nur erfolgreiche Ergebnisse.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from .state import atomic_write_text
+
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "state" / "_cache"
+KEY_VERSION = 2
+
+
+def cwd_fingerprint(cwd):
+    """Fingerabdruck des Arbeitsverzeichnisses (Pfad + Eintraege der obersten Ebene).
+
+    Aendert sich, sobald dort Dateien hinzukommen, verschwinden oder
+    geaendert werden. Tiefere Ebenen werden bewusst nicht durchsucht.
+    """
+    if not cwd:
+        return ""
+    path = Path(cwd).resolve()
+    digest = hashlib.sha256(str(path).encode("utf-8"))
+    try:
+        with os.scandir(path) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                digest.update(f"\0{entry.name}\0{st.st_size}\0{st.st_mtime_ns}".encode("utf-8"))
+    except OSError:
+        pass
+    return digest.hexdigest()
+
+
+def cache_key(prompt, model, fallback_model=None, permission_mode=None,
+              allowed_tools=None, cwd=None, output_format=None):
+    """SHA-256-Schluessel fuer einen Aufruf.
+
+    Das Ausgabeformat gehoert dazu, weil Ergebnisse im Format json zusaetzlich
+    Verbrauchsdaten tragen, Ergebnisse im Format text nicht.
+    """
+    material = json.dumps({
+        "v": KEY_VERSION,
+        "prompt": prompt,
+        "model": model,
+        "fallback_model": fallback_model or "",
+        "permission_mode": permission_mode or "",
+        "allowed_tools": sorted(allowed_tools or []),
+        "output_format": output_format or "text",
+        "cwd": cwd_fingerprint(cwd),
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Cache-Verzeichnis mit TTL und groessenbasierter LRU-Verdraengung."""
+
+    def __init__(self, cache_dir=None, ttl_seconds=86400, max_bytes=50 * 1024 * 1024):
+        self.dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return self.dir / key[:2] / f"{key}.json"
+
+    def get(self, key, now=None):
+        """Gespeichertes Ergebnis oder None (fehlt, abgelaufen, unlesbar)."""
+        path = self._path(key)
+        now = time.time() if now is None else now
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        if self.ttl_seconds and now - entry.get("created", 0) > self.ttl_seconds:
+            self._remove(path)
+            return None
+        # Lesezugriff als mtime vermerken (Grundlage der LRU-Verdraengung)
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        return entry.get("result")
+
+    def put(self, key, result, now=None):
+        """Speichert ein erfolgreiches Ergebnis; Fehlschlaege werden ignoriert."""
+        if not result.get("success"):
+            return False
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        now = time.time() if now is None else now
+        atomic_write_text(path, json.dumps({"created": now, "result": result}, ensure_ascii=False))
+        os.utime(path, (now, now))
+        self.evict(now)
+        return True
+
+    def _entries(self):
+        """Liste (mtime, groesse, pfad) aller Eintraege."""
+        entries = []
+        if not self.dir.exists():
+            return entries
+        for path in self.dir.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def evict(self, now=None):
+        """Entfernt abgelaufene und (bei Ueberschreitung von max_bytes) aelteste Eintraege.
+
+        Returns: Anzahl entfernter Eintraege
+        """
+        now = time.time() if now is None else now
+        entries = sorted(self._entries(), key=lambda e: e[0])
+        removed = 0
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            # mtime ist der letzte Zugriff; ohne Zugriff seit TTL sicher abgelaufen
+            expired = self.ttl_seconds and now - mtime > self.ttl_seconds
+            if not expired and (not self.max_bytes or total <= self.max_bytes):
+                continue
+            self._remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        removed = 0
+        for _, _, path in self._entries():
+            self._remove(path)
+            removed += 1
+        return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
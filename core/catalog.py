@@ -0,0 +1,93 @@
+"""
+llmauto.core.catalog -- Index der gespeicherten Ketten
+========================================================
+Metadaten aller Ketten (Name, Beschreibung, Modus, Anzahl Glieder) fuer
+``chain list``, zwischengespeichert in ``chains/.catalog.cache``. Bei jedem
+Aufruf wird nur per ``stat`` verglichen; neu geparst werden nur Dateien,
+deren Groesse oder mtime sich geaendert hat. Auf einem Netzlaufwerk mit
+hunderten Ketten spart das das Lesen und Normalisieren jeder Datei.
+"""
+import json
+import os
+from pathlib import Path
+
+from .config import BASE_DIR, DEFAULT_CHAIN_CONFIG
+from .state import atomic_write_text
+
+
+CATALOG_FILE = ".catalog.cache"
+CATALOG_VERSION = 1
+
+
+def _read_entry(path):
+    """Metadaten einer Ketten-Datei (ohne Pfad-Normalisierung und Defaults-Kopie)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            chain = json.load(f)
+    except (OSError, ValueError) as e:
+        return {"error": str(e)}
+    if not isinstance(chain, dict):
+        return {"error": "Ketten-Datei ist kein JSON-Objekt"}
+    links = chain.get("links", DEFAULT_CHAIN_CONFIG["links"])
+    return {
+        "description": chain.get("description", DEFAULT_CHAIN_CONFIG["description"]),
+        "mode": chain.get("mode", DEFAULT_CHAIN_CONFIG["mode"]),
+        "links": len(links) if isinstance(links, list) else 0,
+    }
+
+
+def _load_cache(cache_path):
+    try:
+        data = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != CATALOG_VERSION:
+        return {}
+    entries = data.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def chain_catalog(chains_dir=None):
+    """Alle Ketten als Liste von dicts (name, description, mode, links, mtime | error).
+
+    Aktualisiert den Cache inkrementell; ist das Verzeichnis nicht
+    beschreibbar, wird ohne Cache weitergearbeitet.
+    """
+    chains_dir = Path(chains_dir) if chains_dir else BASE_DIR / "chains"
+    if not chains_dir.is_dir():
+        return []
+    cache_path = chains_dir / CATALOG_FILE
+    cached = _load_cache(cache_path)
+    entries = {}
+    changed = False
+    with os.scandir(chains_dir) as it:
+        for item in it:
+            if not item.name.endswith(".json") or not item.is_file():
+                continue
+            name = item.name[:-len(".json")]
+            try:
+                st = item.stat()
+            except OSError:
+                continue
+            entry = cached.get(name)
+            if not entry or entry.get("mtime_ns") != st.st_mtime_ns or entry.get("size") != st.st_size:
+                entry = _read_entry(item.path)
+                entry.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+                changed = True
+            entries[name] = entry
+    if changed or entries.keys() != cached.keys():
+        try:
+            atomic_write_text(cache_path, json.dumps(
+                {"version": CATALOG_VERSION, "entries": entries}, ensure_ascii=False))
+        except OSError:
+            pass  # z.B. schreibgeschuetztes Netzlaufwerk
+    result = []
+    for name in sorted(entries):
+        entry = entries[name]
+        info = {"name": name, "mtime": entry["mtime_ns"] / 1e9}
+        if "error" in entry:
+            info["error"] = entry["error"]
+        else:
+            info.update(description=entry["description"], mode=entry["mode"], links=entry["links"])
+        result.append(info)
+    return result
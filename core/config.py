@@ -5,6 +5,7 @@ Laedt, validiert und speichert Chain-Configs und globale Einstellungen.
 """
 import json
 import os
+import re
 from pathlib import Path
 from copy import deepcopy
 
@@ -23,6 +24,56 @@ DEFAULT_GLOBAL_CONFIG = {
     "default_permission_mode": "dontAsk",
     "default_allowed_tools": ["Read", "Edit", "Write", "Bash", "Glob", "Grep"],
     "default_timeout_seconds": 1800,
+    "claude_cmd": "claude",
+    "output_format": "text",
+    "stream_output": True,
+    "supervisor_max_concurrent": 4,
+    "stop_poll_seconds": 2,
+    "state_legacy_files": True,
+    "history_enabled": True,
+    "log_max_bytes": 0,
+    "log_backups": 3,
+    "model_limits": {},
+    "backoff": {
+        "policy": "exponential",
+        "base_seconds": 5,
+        "factor": 2,
+        "max_seconds": 600,
+        "jitter": 0.2,
+        "max_retries": 3,
+        "step_delay_seconds": 0,
+    },
+    "model_router": {
+        "enabled": False,
+        "failure_threshold": 3,
+        "window": 20,
+        "probe_after_seconds": 900,
+        "fallbacks": {
+            "claude-opus-4-6": ["claude-sonnet-4-6", "claude-haiku-4-5"],
+            "claude-sonnet-4-6": ["claude-haiku-4-5"],
+        },
+    },
+    "pipe_cache": {
+        "enabled": False,
+        "ttl_seconds": 86400,
+        "max_bytes": 50 * 1024 * 1024,
+    },
+    "session_pool": {
+        "enabled": False,
+        "size": 0,
+        "max_prompts": 20,
+        "max_context_tokens": 150000,
+        "idle_seconds": 300,
+    },
+    "tracing": {
+        "enabled": False,
+        "keep_runs": 20,
+    },
+    "replay": {
+        "mode": "",
+        "archive": "",
+        "time_scale": 0,
+    },
     "telegram": {
         "enabled": False,
         "bot_token_env": "LLMAUTO_TELEGRAM_BOT_TOKEN",
@@ -39,6 +90,12 @@ DEFAULT_CHAIN_CONFIG = {
     "runtime_hours": 0,
     "deadline": "",
     "max_consecutive_blocks": 5,
+    "handoff_max_bytes": 0,
+    "handoff_max_lines": 0,
+    "handoff_summary_model": "",
+    "max_parallel": 0,
+    "after": [],
+    "on_status": "COMPLETED",
     "links": [],
     "prompts": {},
     "task_pools": {},
@@ -54,6 +111,7 @@ DEFAULT_LINK = {
     "task_pool": "",
     "telegram_update": False,
     "until_full": False,
+    "parallel_group": "",
     "description": "",
 }
 
@@ -87,22 +145,80 @@ def save_global_config(config):
         json.dump(config, f, indent=4, ensure_ascii=False)
 
 
-def _normalize_paths(obj):
+_HOME_PATTERN = (None, None, None)  # (Schluessel, Regex, Regex fuer JSON-Rohtext)
+
+
+def _home_patterns():
+    """Regex ueber alle fremden bekannten Homes (einmal kompiliert, neu bei Aenderung).
+
+    Die Regex dient nur der schnellen Suche; ersetzt wird mit ``_replace_homes``.
+
+    Returns: (pattern, json_pattern) -- json_pattern findet die Homes im
+    JSON-Rohtext (Backslashes escaped, Nicht-ASCII roh oder als \\uXXXX);
+    beide None, wenn nichts zu ersetzen ist.
+    """
+    global _HOME_PATTERN
+    key = (tuple(_KNOWN_USER_HOMES), _ACTUAL_HOME)
+    if _HOME_PATTERN[0] != key:
+        foreign = [h for h in _KNOWN_USER_HOMES if h and h != _ACTUAL_HOME]
+        if foreign:
+            pattern = re.compile("|".join(re.escape(h) for h in foreign))
+            # save_chain schreibt mit ensure_ascii=False, andere Werkzeuge evtl. escaped
+            encoded = {json.dumps(h, ensure_ascii=ascii)[1:-1] for h in foreign for ascii in (False, True)}
+            json_pattern = re.compile("|".join(re.escape(e) for e in sorted(encoded)))
+        else:
+            pattern = json_pattern = None
+        _HOME_PATTERN = (key, pattern, json_pattern)
+    return _HOME_PATTERN[1], _HOME_PATTERN[2]
+
+
+def _replace_homes(text):
+    """Ersetzt die bekannten Homes nacheinander in Listen-Reihenfolge."""
+    for known in _KNOWN_USER_HOMES:
+        if known and known in text and known != _ACTUAL_HOME:
+            text = text.replace(known, _ACTUAL_HOME)
+    return text
+
+
+def _normalize_paths(obj, _pattern=None):
     """Ersetzt bekannte User-Home-Pfade durch den aktuellen.
 
     Damit funktionieren Chain-Configs auf verschiedenen Rechnern
-    ohne manuelle Pfad-Anpassung.
+    ohne manuelle Pfad-Anpassung. Ein Regex-Durchlauf pro String erkennt
+    Treffer; Strings, Dicts und Listen ohne Treffer werden unveraendert
+    zurueckgegeben (keine Kopie), nur geaenderte Container werden neu gebaut.
     """
-    if isinstance(obj, str):
-        for known in _KNOWN_USER_HOMES:
-            if known in obj and known != _ACTUAL_HOME:
-                obj = obj.replace(known, _ACTUAL_HOME)
+    pattern = _pattern or _home_patterns()[0]
+    if pattern is None:
         return obj
-    elif isinstance(obj, dict):
-        return {k: _normalize_paths(v) for k, v in obj.items()}
+    if isinstance(obj, str):
+        if pattern.search(obj) is None:
+            return obj
+        return _replace_homes(obj)
+    if isinstance(obj, dict):
+        items = obj.items()
     elif isinstance(obj, list):
-        return [_normalize_paths(item) for item in obj]
-    return obj
+        items = enumerate(obj)
+    else:
+        return obj
+    search = pattern.search
+    changed = None
+    for k, v in items:
+        if type(v) is str:
+            # Haeufigster Fall inline: String ohne Treffer
+            if search(v) is None:
+                continue
+            new = _replace_homes(v)
+        elif isinstance(v, (dict, list)):
+            new = _normalize_paths(v, pattern)
+            if new is v:
+                continue
+        else:
+            continue
+        if changed is None:
+            changed = dict(obj) if isinstance(obj, dict) else list(obj)
+        changed[k] = new
+    return obj if changed is None else changed
 
 
 def load_chain(name):
@@ -111,9 +227,13 @@ def load_chain(name):
     if not chain_file.exists():
         raise FileNotFoundError(f"Kette '{name}' nicht gefunden: {chain_file}")
     with open(chain_file, "r", encoding="utf-8") as f:
-        chain = json.load(f)
-    # Pfade an aktuelles System anpassen
-    chain = _normalize_paths(chain)
+        text = f.read()
+    chain = json.loads(text)
+    # Pfade an aktuelles System anpassen; kommt kein fremdes Home im Rohtext
+    # vor, entfaellt der Durchlauf durch die ganze Config
+    pattern, json_pattern = _home_patterns()
+    if pattern is not None and json_pattern.search(text):
+        chain = _normalize_paths(chain, pattern)
     # Defaults anwenden
     config = deepcopy(DEFAULT_CHAIN_CONFIG)
     config.update(chain)
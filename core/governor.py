@@ -0,0 +1,241 @@
+"""
+llmauto.core.governor -- Modell-Governor ueber Prozesse hinweg
+================================================================
+Begrenzt gleichzeitige Claude-Sitzungen und Aufrufe pro Zeit je Modell,
+auch ueber mehrere Ketten-Prozesse hinweg. Koordination nur ueber Dateien
+unter ``state/_governor/`` (kein externer Dienst):
+
+    <modell>.slot<N>     belegte Sitzungs-Slots (max_concurrent)
+    <modell>.bucket.json Token-Bucket (requests_per_hour, burst)
+    <modell>.queue/      Wartemarken (FIFO: die aeltesten Wartenden zuerst)
+
+Belegte Slots und Wartemarken werden regelmaessig "angefasst" (Heartbeat);
+Dateien abgestuerzter Prozesse verfallen nach ``stale_seconds``.
+"""
+import asyncio
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+from .state import atomic_write_text, file_lock
+
+
+DEFAULT_GOVERNOR_DIR = Path(__file__).parent.parent / "state" / "_governor"
+POLL_SECONDS = 0.5
+HEARTBEAT_SECONDS = 10.0
+STALE_SECONDS = 60.0
+
+_TICKET_COUNTER = itertools.count()
+
+
+def _safe_name(model):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", model)
+
+
+def _pid_alive(pid):
+    """Prueft ob ein Prozess lebt (nur POSIX; unter Windows zaehlt der Heartbeat)."""
+    if sys.platform == "win32" or pid <= 0:
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _is_stale(path, now, stale_seconds):
+    """Slot/Wartemarke verwaist: Prozess beendet oder Heartbeat zu alt."""
+    try:
+        st = path.stat()
+        pid = int(path.read_text(encoding="ascii").split()[0] or 0)
+    except (FileNotFoundError, ValueError, IndexError):
+        return True
+    return now - st.st_mtime > stale_seconds or not _pid_alive(pid)
+
+
+def _touch(path):
+    try:
+        os.utime(path, None)
+    except FileNotFoundError:
+        pass
+
+
+class Lease:
+    """Ein belegter Slot; haelt per Heartbeat die Slot-Datei frisch."""
+
+    def __init__(self, model, slot_path, heartbeat):
+        self.model = model
+        self.slot_path = slot_path
+        self.waited_s = 0.0
+        self._task = None
+        if slot_path is not None:
+            self._task = asyncio.ensure_future(self._beat(heartbeat))
+
+    async def _beat(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            _touch(self.slot_path)
+
+    async def release(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.slot_path is not None:
+            try:
+                self.slot_path.unlink()
+            except FileNotFoundError:
+                pass
+            self.slot_path = None
+
+
+class ModelGovernor:
+    """Vergibt Sitzungs-Slots und Aufruf-Budget je Modell (prozessuebergreifend).
+
+    ``limits``: dict Modell -> {"max_concurrent": N, "requests_per_hour": R,
+    "burst": B}; der Schluessel ``"*"`` gilt fuer alle anderen Modelle.
+    0 bzw. fehlende Werte bedeuten unbegrenzt.
+    """
+
+    def __init__(self, limits, governor_dir=None, poll=POLL_SECONDS,
+                 heartbeat=HEARTBEAT_SECONDS, stale_seconds=STALE_SECONDS):
+        self.limits = dict(limits or {})
+        self.dir = Path(governor_dir) if governor_dir else DEFAULT_GOVERNOR_DIR
+        self.poll = poll
+        self.heartbeat = heartbeat
+        self.stale_seconds = stale_seconds
+
+    def limits_for(self, model):
+        """Limits fuer ein Modell oder None (nicht begrenzt)."""
+        limit = self.limits.get(model, self.limits.get("*"))
+        if not limit or not (limit.get("max_concurrent") or limit.get("requests_per_hour")):
+            return None
+        return limit
+
+    # --- Dateien ---
+
+    def _paths(self, model):
+        name = _safe_name(model)
+        return (self.dir / f"{name}.lock", self.dir / f"{name}.queue",
+                self.dir / f"{name}.bucket.json")
+
+    def _slot_path(self, model, index):
+        return self.dir / f"{_safe_name(model)}.slot{index}"
+
+    def _cleanup(self, paths, now):
+        for path in paths:
+            if _is_stale(path, now, self.stale_seconds):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def _bucket_tokens(self, bucket_path, limit, now):
+        """Aktueller Fuellstand des Token-Buckets (ohne zu speichern)."""
+        rate = (limit.get("requests_per_hour") or 0) / 3600.0
+        if not rate:
+            return None, None
+        capacity = max(1, limit.get("burst") or 1)
+        try:
+            data = json.loads(bucket_path.read_text(encoding="utf-8"))
+            tokens = data["tokens"] + (now - data["updated"]) * rate
+        except (FileNotFoundError, ValueError, KeyError):
+            tokens = capacity
+        return min(capacity, tokens), rate
+
+    # --- Vergabe ---
+
+    def _try_acquire(self, model, limit, ticket):
+        """Ein Versuch unter Lock. Returns: (slot_path | False, wartezeit_hinweis)"""
+        lock_path, queue_dir, bucket_path = self._paths(model)
+        with file_lock(lock_path):
+            now = time.time()
+            self._cleanup([t for t in queue_dir.iterdir() if t != ticket], now)
+            if not ticket.exists():
+                # Von einem anderen Prozess als verwaist entfernt -> neu anstellen
+                ticket.write_text(str(os.getpid()), encoding="ascii")
+            position = sorted(queue_dir.iterdir()).index(ticket)
+
+            max_concurrent = limit.get("max_concurrent") or 0
+            free = None
+            if max_concurrent:
+                slots = [self._slot_path(model, i) for i in range(max_concurrent)]
+                self._cleanup([p for p in slots if p.exists()], now)
+                free = [p for p in slots if not p.exists()]
+                if position >= len(free):
+                    return False, self.poll
+
+            tokens, rate = self._bucket_tokens(bucket_path, limit, now)
+            if tokens is not None and position >= int(tokens):
+                return False, max(0.05, (position + 1 - tokens) / rate)
+
+            if tokens is not None:
+                atomic_write_text(bucket_path, json.dumps({"tokens": tokens - 1, "updated": now}))
+            slot_path = None
+            if free is not None:
+                slot_path = free[0]
+                slot_path.write_text(f"{os.getpid()} {time.time()}", encoding="ascii")
+            ticket.unlink()
+            return slot_path, 0.0
+
+    async def acquire(self, model, abort_check=None):
+        """Wartet (FIFO) auf einen Slot/ein Budget fuer ``model``.
+
+        Returns: Lease (mit ``await lease.release()`` freigeben) oder None,
+        wenn ``abort_check`` waehrend des Wartens True liefert.
+        """
+        limit = self.limits_for(model)
+        if limit is None:
+            return Lease(model, None, self.heartbeat)
+        _, queue_dir, _ = self._paths(model)
+        queue_dir.mkdir(parents=True, exist_ok=True)
+        # Name sortiert nach Ankunft: Zeitstempel (ns) + PID + Zaehler
+        ticket = queue_dir / f"{time.time_ns():020d}-{os.getpid()}-{next(_TICKET_COUNTER)}"
+        ticket.write_text(str(os.getpid()), encoding="ascii")
+        start = time.monotonic()
+        last_beat = start
+        try:
+            while True:
+                slot_path, hint = await asyncio.to_thread(self._try_acquire, model, limit, ticket)
+                if slot_path is not False:
+                    lease = Lease(model, slot_path, self.heartbeat)
+                    lease.waited_s = time.monotonic() - start
+                    return lease
+                if abort_check is not None and abort_check():
+                    return None
+                if time.monotonic() - last_beat >= self.heartbeat:
+                    _touch(ticket)
+                    last_beat = time.monotonic()
+                await asyncio.sleep(min(self.poll, hint) if hint else self.poll)
+        finally:
+            try:
+                ticket.unlink()
+            except FileNotFoundError:
+                pass
+
+    def snapshot(self):
+        """Aktuelle Belegung: dict Modell -> {"active": n, "waiting": m, "max": k}"""
+        result = {}
+        now = time.time()
+        for model, limit in self.limits.items():
+            if model == "*":
+                continue
+            max_concurrent = (limit or {}).get("max_concurrent") or 0
+            active = sum(
+                1 for i in range(max_concurrent)
+                if self._slot_path(model, i).exists()
+                and not _is_stale(self._slot_path(model, i), now, self.stale_seconds)
+            )
+            _, queue_dir, _ = self._paths(model)
+            waiting = len(list(queue_dir.iterdir())) if queue_dir.exists() else 0
+            result[model] = {"active": active, "waiting": waiting, "max": max_concurrent}
+        return result
@@ -0,0 +1,326 @@
+"""
+llmauto.core.history -- Lauf-Historie und Metriken
+===================================================
+Speichert jedes Ergebnis eines Claude-Aufrufs (Kette, Runde, Link, Modell,
+Returncode, Dauer, Ausgabegroesse, Skip-Schutz, Fallback, bei strukturierter
+CLI-Ausgabe auch Token, Kosten und Turns) in einer lokalen SQLite-Datenbank
+und liefert Auswertungen fuer ``llmauto stats``: Latenz-Perzentile pro Link,
+Fehlerquote und Durchsatz pro Modell, Token-Verbrauch und Kosten pro Link.
+
+``record_result`` nutzt eine Verbindung pro Prozess und Datenbank (Schema und
+Migration laufen nur einmal); asynchrone Aufrufer schreiben ueber
+``asyncio.to_thread``.
+"""
+import atexit
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "state" / "history.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id             INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts             REAL    NOT NULL,
+    chain          TEXT,
+    round          INTEGER,
+    link           TEXT,
+    model          TEXT,
+    returncode     INTEGER,
+    success        INTEGER,
+    duration_s     REAL,
+    output_bytes   INTEGER,
+    skip_protected INTEGER DEFAULT 0,
+    fallback_used  INTEGER DEFAULT 0,
+    input_tokens   INTEGER,
+    output_tokens  INTEGER,
+    cache_read_tokens     INTEGER,
+    cache_creation_tokens INTEGER,
+    cost_usd       REAL,
+    num_turns      INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_runs_chain_ts ON runs (chain, ts);
+CREATE INDEX IF NOT EXISTS idx_runs_model_ts ON runs (model, ts);
+CREATE INDEX IF NOT EXISTS idx_runs_ts ON runs (ts);
+"""
+# Spalten, die nach der ersten Version dazukamen (Migration bestehender Datenbanken)
+_ADDED_COLUMNS = {
+    "input_tokens": "INTEGER",
+    "output_tokens": "INTEGER",
+    "cache_read_tokens": "INTEGER",
+    "cache_creation_tokens": "INTEGER",
+    "cost_usd": "REAL",
+    "num_turns": "INTEGER",
+}
+
+
+def percentile(sorted_values, pct):
+    """Perzentil (Nearest-Rank) einer bereits sortierten Liste."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5 - 1e-9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class RunHistory:
+    """SQLite-Store fuer Lauf-Ergebnisse."""
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            # timeout: mehrere Ketten-Prozesse schreiben in dieselbe Datenbank;
+            # check_same_thread: record_result schreibt aus Worker-Threads (serialisiert)
+            self._conn = sqlite3.connect(str(self.db_path), timeout=10, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._migrate()
+        return self._conn
+
+    def _migrate(self):
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(runs)")}
+        with self._conn:
+            for column, kind in _ADDED_COLUMNS.items():
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {kind}")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def record(self, result, chain=None, round_no=None, link=None,
+               skip_protected=False, fallback_used=False, ts=None):
+        """Speichert ein Runner-Ergebnis (dict aus ClaudeRunner.run)."""
+        output_bytes = result.get("output_bytes")
+        if output_bytes is None:
+            output_bytes = len((result.get("output") or "").encode("utf-8"))
+        # Verbrauch nur bei strukturierter Ausgabe bekannt (sonst NULL)
+        usage = result.get("usage") or {}
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO runs (ts, chain, round, link, model, returncode, success, "
+                "duration_s, output_bytes, skip_protected, fallback_used, input_tokens, "
+                "output_tokens, cache_read_tokens, cache_creation_tokens, cost_usd, num_turns) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    ts if ts is not None else time.time(),
+                    chain, round_no, link, result.get("model"),
+                    result.get("returncode"), int(bool(result.get("success"))),
+                    float(result.get("duration_s") or 0.0), output_bytes,
+                    int(bool(skip_protected)), int(bool(fallback_used)),
+                    usage.get("input_tokens"), usage.get("output_tokens"),
+                    usage.get("cache_read_input_tokens"), usage.get("cache_creation_input_tokens"),
+                    result.get("cost_usd"), result.get("num_turns"),
+                ),
+            )
+
+    def delete_chain(self, chain):
+        """Entfernt alle Eintraege einer Kette. Returns: Anzahl geloeschter Eintraege"""
+        conn = self._connect()
+        with conn:
+            return conn.execute("DELETE FROM runs WHERE chain = ?", (chain,)).rowcount
+
+    def _rows(self, columns, chain=None, since=None):
+        query = f"SELECT {columns} FROM runs WHERE 1=1"
+        params = []
+        if chain:
+            query += " AND chain = ?"
+            params.append(chain)
+        if since is not None:
+            query += " AND ts >= ?"
+            params.append(since)
+        return self._connect().execute(query, params).fetchall()
+
+    def link_stats(self, chain=None, since=None):
+        """Latenz und Fehlerquote pro (Kette, Link), langsamste zuerst (nach p95).
+
+        Returns: Liste von dicts mit chain, link, runs, failures, failure_rate,
+                 p50_s, p95_s, max_s
+        """
+        groups = {}
+        for chain_name, link, duration, success in self._rows(
+                "chain, link, duration_s, success", chain, since):
+            entry = groups.setdefault((chain_name, link), {"durations": [], "failures": 0})
+            entry["durations"].append(duration or 0.0)
+            entry["failures"] += 0 if success else 1
+        stats = []
+        for (chain_name, link), entry in groups.items():
+            durations = sorted(entry["durations"])
+            stats.append({
+                "chain": chain_name,
+                "link": link,
+                "runs": len(durations),
+                "failures": entry["failures"],
+                "failure_rate": entry["failures"] / len(durations),
+                "p50_s": percentile(durations, 50),
+                "p95_s": percentile(durations, 95),
+                "max_s": durations[-1],
+            })
+        stats.sort(key=lambda s: s["p95_s"], reverse=True)
+        return stats
+
+    def model_stats(self, chain=None, since=None):
+        """Fehlerquote, Latenz und Durchsatz pro Modell.
+
+        Durchsatz = erfolgreiche Aufrufe pro Stunde im beobachteten Zeitraum.
+        """
+        groups = {}
+        for model, ts, duration, success in self._rows(
+                "model, ts, duration_s, success", chain, since):
+            entry = groups.setdefault(model, {"durations": [], "failures": 0,
+                                              "first": ts, "last": ts, "busy_s": 0.0})
+            entry["durations"].append(duration or 0.0)
+            entry["failures"] += 0 if success else 1
+            entry["first"] = min(entry["first"], ts - (duration or 0.0))
+            entry["last"] = max(entry["last"], ts)
+            entry["busy_s"] += duration or 0.0
+        stats = []
+        for model, entry in groups.items():
+            durations = sorted(entry["durations"])
+            runs = len(durations)
+            successes = runs - entry["failures"]
+            window_h = max(entry["last"] - entry["first"], 1.0) / 3600
+            stats.append({
+                "model": model,
+                "runs": runs,
+                "failures": entry["failures"],
+                "failure_rate": entry["failures"] / runs,
+                "p50_s": percentile(durations, 50),
+                "p95_s": percentile(durations, 95),
+                "busy_h": entry["busy_s"] / 3600,
+                "throughput_per_h": successes / window_h,
+            })
+        stats.sort(key=lambda s: s["runs"], reverse=True)
+        return stats
+
+    def usage_stats(self, chain=None, since=None):
+        """Token-Verbrauch und Kosten pro (Kette, Link), teuerste zuerst.
+
+        Beruecksichtigt nur Aufrufe mit strukturierter Ausgabe (Token bekannt).
+
+        Returns: Liste von dicts mit chain, link, runs, input_tokens,
+                 output_tokens, cache_read_tokens, cache_creation_tokens,
+                 cache_hit_rate, cost_usd, turns_per_run
+        """
+        groups = {}
+        for row in self._rows(
+                "chain, link, input_tokens, output_tokens, cache_read_tokens, "
+                "cache_creation_tokens, cost_usd, num_turns", chain, since):
+            chain_name, link, tokens_in, tokens_out, cache_read, cache_creation, cost, turns = row
+            if tokens_in is None and cost is None:
+                continue
+            entry = groups.setdefault((chain_name, link), dict.fromkeys(
+                ["runs", "input_tokens", "output_tokens", "cache_read_tokens",
+                 "cache_creation_tokens", "cost_usd", "turns"], 0))
+            entry["runs"] += 1
+            entry["input_tokens"] += tokens_in or 0
+            entry["output_tokens"] += tokens_out or 0
+            entry["cache_read_tokens"] += cache_read or 0
+            entry["cache_creation_tokens"] += cache_creation or 0
+            entry["cost_usd"] += cost or 0.0
+            entry["turns"] += turns or 0
+        stats = []
+        for (chain_name, link), entry in groups.items():
+            prompt_tokens = entry["input_tokens"] + entry["cache_read_tokens"] + entry["cache_creation_tokens"]
+            stats.append({
+                "chain": chain_name,
+                "link": link,
+                "runs": entry["runs"],
+                "input_tokens": entry["input_tokens"],
+                "output_tokens": entry["output_tokens"],
+                "cache_read_tokens": entry["cache_read_tokens"],
+                "cache_creation_tokens": entry["cache_creation_tokens"],
+                "cache_hit_rate": entry["cache_read_tokens"] / prompt_tokens if prompt_tokens else 0.0,
+                "cost_usd": entry["cost_usd"],
+                "turns_per_run": entry["turns"] / entry["runs"],
+            })
+        stats.sort(key=lambda s: (s["cost_usd"], s["input_tokens"] + s["output_tokens"]), reverse=True)
+        return stats
+
+
+_shared = {}  # Datenbank-Pfad -> RunHistory (eine Verbindung pro Prozess)
+_shared_lock = threading.Lock()
+
+
+def close_shared():
+    """Schliesst die prozessweiten Verbindungen (z.B. bevor die Datenbank geloescht wird)."""
+    with _shared_lock:
+        for history in _shared.values():
+            history.close()
+        _shared.clear()
+
+
+atexit.register(close_shared)
+
+
+def record_result(result, db_path=None, **fields):
+    """Speichert ein Ergebnis fehlertolerant (Historie darf keinen Lauf abbrechen).
+
+    Thread-sicher; die Verbindung bleibt fuer weitere Aufrufe offen und wird
+    nach einem Fehler neu aufgebaut.
+
+    Returns: True wenn gespeichert, sonst False
+    """
+    path = Path(db_path) if db_path else DEFAULT_DB_PATH
+    with _shared_lock:
+        history = _shared.get(path)
+        try:
+            if history is None:
+                history = _shared[path] = RunHistory(path)
+            history.record(result, **fields)
+            return True
+        except Exception:
+            if history is not None:
+                history.close()
+            _shared.pop(path, None)
+            return False
+
+
+def show_stats(chain=None, since_hours=None, db_path=None):
+    """Gibt Latenz- und Fehlerstatistiken auf stdout aus."""
+    path = Path(db_path) if db_path else DEFAULT_DB_PATH
+    if not path.exists():
+        print("Keine Lauf-Historie vorhanden.")
+        return 0
+    since = time.time() - since_hours * 3600 if since_hours else None
+    history = RunHistory(path)
+    try:
+        links = history.link_stats(chain=chain, since=since)
+        models = history.model_stats(chain=chain, since=since)
+        usage = history.usage_stats(chain=chain, since=since)
+    finally:
+        history.close()
+    if not links:
+        print("Keine Laeufe im gewaehlten Zeitraum.")
+        return 0
+
+    print("Links (langsamste zuerst):")
+    print(f"  {'Kette/Link':<36} {'Laeufe':>6} {'p50':>8} {'p95':>8} {'max':>8} {'Fehler':>7}")
+    for s in links:
+        name = f"{s['chain'] or '-'}/{s['link'] or '-'}"
+        print(f"  {name:<36} {s['runs']:>6} {s['p50_s']:>7.0f}s {s['p95_s']:>7.0f}s "
+              f"{s['max_s']:>7.0f}s {s['failure_rate']:>6.0%}")
+    print()
+    print("Modelle:")
+    print(f"  {'Modell':<28} {'Laeufe':>6} {'p50':>8} {'p95':>8} {'Fehler':>7} {'OK/h':>7}")
+    for s in models:
+        print(f"  {s['model'] or '-':<28} {s['runs']:>6} {s['p50_s']:>7.0f}s {s['p95_s']:>7.0f}s "
+              f"{s['failure_rate']:>6.0%} {s['throughput_per_h']:>7.1f}")
+    if usage:
+        print()
+        print("Verbrauch (teuerste zuerst):")
+        print(f"  {'Kette/Link':<36} {'Laeufe':>6} {'Token ein':>10} {'Token aus':>10} "
+              f"{'Cache':>6} {'Turns':>6} {'Kosten':>10}")
+        for s in usage:
+            name = f"{s['chain'] or '-'}/{s['link'] or '-'}"
+            tokens_in = s["input_tokens"] + s["cache_read_tokens"] + s["cache_creation_tokens"]
+            print(f"  {name:<36} {s['runs']:>6} {tokens_in:>10} {s['output_tokens']:>10} "
+                  f"{s['cache_hit_rate']:>6.0%} {s['turns_per_run']:>6.1f} {s['cost_usd']:>9.4f}$")
+    return 0
@@ -0,0 +1,120 @@
+"""
+llmauto.core.logfiles -- Log-Dateien lesen und rotieren
+========================================================
+Tail ohne die ganze Datei zu laden (blockweise ab Dateiende), Follow-Modus
+fuer neue Zeilen und groessenbasierte Rotation (<log>.1 ... <log>.N).
+"""
+import os
+import time
+from pathlib import Path
+
+
+TAIL_BLOCK_SIZE = 64 * 1024
+FOLLOW_POLL_SECONDS = 0.5
+
+
+def tail_lines(path, lines=20, block_size=TAIL_BLOCK_SIZE):
+    """Liefert die letzten ``lines`` Zeilen einer Datei.
+
+    Liest rueckwaerts in Bloecken ab Dateiende, bis genug Zeilenumbrueche
+    gefunden sind. Speicherbedarf ~ Groesse der angeforderten Zeilen.
+    """
+    if lines <= 0:
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        # Abschliessende Leerzeilen ignorieren
+        while end > 0:
+            f.seek(end - 1)
+            if f.read(1) not in (b"\n", b"\r"):
+                break
+            end -= 1
+        if end == 0:
+            return []
+        pos = end
+        chunks = []
+        newlines = 0
+        while pos > 0 and newlines < lines:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            chunk = f.read(size)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+    data = b"".join(reversed(chunks))[: end - pos]
+    text = data.decode("utf-8", errors="replace")
+    return [line.rstrip("\r") for line in text.split("\n")[-lines:]]
+
+
+def follow(path, poll=FOLLOW_POLL_SECONDS, stop=None):
+    """Generator: liefert neu angehaengte Zeilen ab dem aktuellen Dateiende.
+
+    Erkennt Rotation (neue Datei) und Kuerzung und liest dann von vorn.
+    ``stop`` ist ein optionales Callable; liefert es True, endet der Generator.
+    """
+    path = Path(path)
+    fh = None
+    ident = None
+    from_start = False
+    buffer = b""
+    try:
+        while stop is None or not stop():
+            if fh is None:
+                try:
+                    fh = open(path, "rb")
+                except FileNotFoundError:
+                    from_start = True
+                    time.sleep(poll)
+                    continue
+                if not from_start:
+                    fh.seek(0, os.SEEK_END)
+                st = os.fstat(fh.fileno())
+                ident = (st.st_dev, st.st_ino)
+            data = fh.read()
+            if data:
+                buffer += data
+                *complete, buffer = buffer.split(b"\n")
+                for raw in complete:
+                    yield raw.decode("utf-8", errors="replace").rstrip("\r")
+                continue
+            time.sleep(poll)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if (st.st_dev, st.st_ino) != ident or st.st_size < fh.tell():
+                # Rotiert oder gekuerzt: neue Datei von vorn lesen
+                fh.close()
+                fh = None
+                from_start = True
+                buffer = b""
+    finally:
+        if fh is not None:
+            fh.close()
+
+
+def rotate_if_needed(path, max_bytes, backups=3):
+    """Rotiert ``path`` nach ``path.1`` (aeltere nach .2 ... .N), wenn zu gross.
+
+    ``max_bytes`` <= 0 schaltet die Rotation ab.
+
+    Returns: True wenn rotiert wurde
+    """
+    if not max_bytes or max_bytes <= 0:
+        return False
+    path = Path(path)
+    try:
+        if path.stat().st_size < max_bytes:
+            return False
+    except FileNotFoundError:
+        return False
+    if backups <= 0:
+        path.unlink()
+        return True
+    for n in range(backups - 1, 0, -1):
+        older = path.with_name(f"{path.name}.{n}")
+        if older.exists():
+            os.replace(older, path.with_name(f"{path.name}.{n + 1}"))
+    os.replace(path, path.with_name(f"{path.name}.1"))
+    return True
@@ -0,0 +1,210 @@
+"""
+llmauto.core.prompts -- Prompt-Registry
+=========================================
+Loest die Prompts aller Kettenglieder einmal beim Start auf und haelt sie
+als vorkompilierte Templates im Speicher. Prompt-Dateien werden nur per
+mtime geprueft und bei Aenderung neu geladen (Edits wirken ab der naechsten
+Runde); fehlende Prompt-Dateien werden bei jedem Aufruf erneut gesucht.
+Template-Variablen: {HOME}, {BASH_HOME}, {CHAIN}, {LINK}, {ROUND},
+{LAST_VERDICT}, {TASK}, {TASK_ID}.
+"""
+import os
+import re
+from collections import namedtuple
+from pathlib import Path
+
+from .config import _ACTUAL_HOME
+
+
+BASE_DIR = Path(__file__).parent.parent
+
+TEMPLATE_VARIABLES = ("HOME", "BASH_HOME", "CHAIN", "LINK", "ROUND", "LAST_VERDICT", "TASK", "TASK_ID")
+_VARIABLE_RE = re.compile(r"\{(" + "|".join(TEMPLATE_VARIABLES) + r")\}")
+# "## Overall verdict: NEEDS_FIX" / "Verdict: APPROVED"
+_VERDICT_RE = re.compile(r"(?i:verdict|urteil)\W*([A-Z][A-Z_]{2,})")
+
+DEFAULT_PROMPT = "Fuehre die naechste Aufgabe aus."
+UNTIL_FULL_SUFFIX = (
+    "\n\nWICHTIG: Dein Kontext ist deine Begrenzung. Arbeite so viele Aufgaben ab "
+    "wie moeglich. Erst wenn du merkst, dass dein Kontext knapp wird oder eine "
+    "Komprimierung stattfindet, schliesse die aktuelle Aufgabe sauber ab, "
+    "schreibe ein vollstaendiges Handoff und beende dich."
+)
+
+# path: Prompt-Datei (None bei Inline-Text), text: Inline- oder Ersatz-Text,
+# missing: referenzierte Datei existiert nicht
+PromptSource = namedtuple("PromptSource", ["path", "text", "missing"])
+
+
+def bash_home(home):
+    """Windows-Home als Bash-Pfad (C:\\Users\\X -> /c/Users/X), POSIX unveraendert."""
+    home = home.rstrip("\\/")
+    if len(home) >= 2 and home[1] == ":":
+        drive, rest = home.split(":", 1)
+        return "/" + drive.lower() + rest.replace("\\", "/")
+    return home
+
+
+def extract_verdict(handoff):
+    """Letztes Review-Urteil im Handoff (z.B. APPROVED, NEEDS_FIX), sonst ""."""
+    matches = _VERDICT_RE.findall(handoff or "")
+    return matches[-1] if matches else ""
+
+
+class Template:
+    """Vorkompiliertes Prompt-Template.
+
+    Der Text wird einmal an den Variablen zerlegt; statische Werte (HOME,
+    BASH_HOME, CHAIN) werden dabei direkt eingesetzt. render() setzt nur noch
+    die dynamischen Werte ein. Werte duerfen Callables sein und werden nur
+    ausgewertet, wenn das Template die Variable enthaelt.
+    """
+
+    __slots__ = ("parts", "variables")
+
+    def __init__(self, text, static=None):
+        parts = _VARIABLE_RE.split(text)
+        static = static or {}
+        merged = [parts[0]]
+        for i in range(1, len(parts), 2):
+            name, literal = parts[i], parts[i + 1]
+            if name in static:
+                merged[-1] += str(static[name]) + literal
+            else:
+                merged.extend([name, literal])
+        self.parts = merged
+        self.variables = frozenset(merged[1::2])
+
+    def render(self, values=None):
+        if not self.variables:
+            return self.parts[0]
+        values = values or {}
+        resolved = {}
+        for name in self.variables:
+            value = values.get(name)
+            if callable(value):
+                value = value()
+            resolved[name] = "{" + name + "}" if value is None else str(value)
+        out = list(self.parts)
+        for i in range(1, len(out), 2):
+            out[i] = resolved[out[i]]
+        return "".join(out)
+
+
+class PromptRegistry:
+    """Aufgeloeste und kompilierte Prompts einer Kette (pro Link gecacht)."""
+
+    def __init__(self, chain_config, base_dir=None, home=None, chain_name=None):
+        self.prompts = chain_config.get("prompts", {}) or {}
+        self.base_dir = Path(base_dir) if base_dir else BASE_DIR
+        home = (home or _ACTUAL_HOME).rstrip("\\/")
+        self.static = {
+            "HOME": home,
+            "BASH_HOME": bash_home(home),
+            "CHAIN": chain_name or chain_config.get("chain_name", ""),
+        }
+        self._cache = {}  # link-key -> (source, mtime_ns, Template)
+
+    def resolve(self, prompt_key):
+        """Sucht die Quelle eines Prompts (Reihenfolge siehe USER-DOCU 4.3)."""
+        # 1. Prompt in der prompts-Sektion der Chain-Config
+        if prompt_key in self.prompts:
+            prompt_def = self.prompts[prompt_key]
+            if isinstance(prompt_def, dict) and prompt_def.get("type") == "file":
+                prompt_path = Path(prompt_def["path"])
+                if not prompt_path.is_absolute():
+                    prompt_path = self.base_dir / prompt_path
+                if prompt_path.is_file():
+                    return PromptSource(prompt_path, None, False)
+                return PromptSource(
+                    None,
+                    f"Lies die Datei {prompt_path} und fuehre die darin beschriebene Aufgabe aus.",
+                    True,
+                )
+            elif isinstance(prompt_def, str):
+                return PromptSource(None, prompt_def, False)
+
+        if prompt_key:
+            # 2./3. Datei im prompts/ Ordner (mit und ohne .txt)
+            for candidate in (prompt_key, f"{prompt_key}.txt"):
+                prompt_file = self.base_dir / "prompts" / candidate
+                if prompt_file.is_file():
+                    return PromptSource(prompt_file, None, False)
+            # 4. Prompt-Key als Datei-Referenz
+            if Path(prompt_key).is_file():
+                return PromptSource(
+                    None,
+                    f"Lies die Datei {prompt_key} und fuehre die darin beschriebene Aufgabe aus.",
+                    False,
+                )
+
+        # 5. Als Inline-Prompt verwenden; sieht der Key wie ein Dateiname aus, fehlt die Datei
+        missing = Path(prompt_key).suffix.lower() in (".txt", ".md")
+        return PromptSource(None, prompt_key or DEFAULT_PROMPT, missing)
+
+    def _compile(self, source, link):
+        if source.path is not None:
+            text = source.path.read_text(encoding="utf-8")
+        else:
+            text = source.text
+        if link.get("until_full", False):
+            text += UNTIL_FULL_SUFFIX
+        static = dict(self.static, LINK=link.get("name", ""))
+        return Template(text, static)
+
+    def template(self, link):
+        """Kompiliertes Template eines Links.
+
+        Datei-Prompts werden per mtime geprueft. Nur Inline-Text aus der
+        prompts-Sektion bleibt ungeprueft gecacht; Ersatz-Texte (Datei fehlt,
+        Datei-Referenz, Standard-Prompt) werden neu aufgeloest, damit eine
+        spaeter angelegte Prompt-Datei greift.
+        """
+        prompt_key = link.get("prompt", "")
+        key = (link.get("name", ""), prompt_key, bool(link.get("until_full", False)))
+        cached = self._cache.get(key)
+        source = None
+        if cached is not None:
+            cached_source, mtime_ns, template = cached
+            if cached_source.path is not None:
+                try:
+                    if os.stat(cached_source.path).st_mtime_ns == mtime_ns:
+                        return template
+                except FileNotFoundError:
+                    pass
+            elif isinstance(self.prompts.get(prompt_key), str):
+                return template
+            else:
+                source = self.resolve(prompt_key)
+                if source == cached_source:
+                    return template
+        if source is None:
+            source = self.resolve(prompt_key)
+        mtime_ns = source.path.stat().st_mtime_ns if source.path is not None else None
+        template = self._compile(source, link)
+        self._cache[key] = (source, mtime_ns, template)
+        return template
+
+    def render(self, link, **values):
+        """Fertiger Prompt-Text eines Links (ROUND, LAST_VERDICT, ... als Werte)."""
+        return self.template(link).render(values)
+
+    def preload(self, links):
+        """Loest alle Link-Prompts vorab auf. Returns: Liste von Problemen."""
+        for link in links:
+            self.template(link)
+        return self.validate(links)
+
+    def validate(self, links):
+        """Prueft die Prompts aller Links. Returns: Liste von Problem-Texten."""
+        problems = []
+        for i, link in enumerate(links):
+            name = link.get("name") or f"link-{i+1}"
+            prompt_key = link.get("prompt", "")
+            if not prompt_key:
+                problems.append(f"{name}: kein Prompt angegeben (Standard-Prompt wird verwendet)")
+                continue
+            source = self.resolve(prompt_key)
+            if source.missing:
+                problems.append(f"{name}: Prompt-Datei fuer '{prompt_key}' nicht gefunden")
+        return problems
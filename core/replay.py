@@ -0,0 +1,297 @@
+"""
+llmauto.core.replay -- Aufzeichnen und Abspielen von CLI-Aufrufen
+===================================================================
+``Recorder`` schreibt jeden Aufruf eines ClaudeRunner in ein Archiv (JSONL,
+eine Zeile pro Aufruf, sofort geschrieben): Kommando ohne Prompt, SHA-256
+des Prompts, Arbeitsverzeichnis, Ausgabe, stderr, Exit-Code, Dauer sowie
+die Aenderungen beobachteter Dateien (z.B. handoff.md, status.txt) als
+zeilenweiser Diff. Die erste Zeile haelt den Ausgangsstand dieser Dateien.
+
+``Player`` beantwortet Aufrufe aus einem Archiv ohne die CLI: der Ausgangsstand
+wird wiederhergestellt, jeder Aufruf liefert das aufgezeichnete Ergebnis und
+spielt die Datei-Aenderungen ein. So laeuft eine tagelange Ketten-Sitzung in
+Sekunden nach, um Scheduler, Skip-Schutz oder Shutdown-Logik zu pruefen.
+
+Zuordnung beim Abspielen: zuerst gleicher Prompt-Hash und gleiches Modell
+(in Aufzeichnungsreihenfolge), sonst der naechste unbenutzte Aufruf desselben
+Modells. Aenderungen anderer Dateien (Projektdateien der Agents) werden nicht
+aufgezeichnet. Bei parallelen Links kann ein Diff Aenderungen eines
+gleichzeitig laufenden Links enthalten.
+"""
+import asyncio
+import difflib
+import hashlib
+import json
+import time
+from collections import deque
+from pathlib import Path
+
+from .runner import _StreamCapture, _result
+
+
+ARCHIVE_VERSION = 1
+REPLAY_MODES = ("record", "replay")
+# Ergebnis-Felder, die archiviert werden
+_RESULT_FIELDS = ("success", "output", "stderr", "returncode", "duration_s", "model",
+                  "output_bytes", "usage", "cost_usd", "num_turns", "session_id")
+
+
+def prompt_hash(prompt):
+    return hashlib.sha256((prompt or "").encode("utf-8")).hexdigest()
+
+
+def _text_hash(text):
+    return None if text is None else hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _read(path):
+    try:
+        return path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None  # fehlt (oder nicht lesbar) -> wie geloescht behandeln
+
+
+def file_diff(before, after):
+    """Zeilen-Diff als Liste [i1, i2, neue Zeilen] (ersetzt Zeilen i1..i2 von ``before``)."""
+    a = (before or "").splitlines(keepends=True)
+    b = (after or "").splitlines(keepends=True)
+    return [[i1, i2, b[j1:j2]]
+            for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes()
+            if tag != "equal"]
+
+
+def apply_diff(text, ops):
+    """Wendet einen Diff aus ``file_diff`` an."""
+    lines = (text or "").splitlines(keepends=True)
+    for i1, i2, new in reversed(ops):
+        lines[i1:i2] = new
+    return "".join(lines)
+
+
+class _Archive:
+    """Gemeinsame Pfad-Logik: beobachtete Dateien relativ zu ``root``."""
+
+    def __init__(self, path, watch=(), root=None):
+        self.path = Path(path)
+        self.root = Path(root) if root else None
+        self.watch = [Path(p) for p in watch]
+
+    def _rel(self, path):
+        if self.root is not None:
+            try:
+                return path.relative_to(self.root).as_posix()
+            except ValueError:
+                pass
+        return path.as_posix()
+
+    def _abs(self, rel):
+        path = Path(rel)
+        return path if path.is_absolute() or self.root is None else self.root / path
+
+    def _snapshot(self):
+        return {path: _read(path) for path in self.watch}
+
+
+class Recorder(_Archive):
+    """Zeichnet Aufrufe auf (Archiv wird fortgeschrieben, z.B. bei --resume)."""
+
+    def __init__(self, path, watch=(), root=None):
+        super().__init__(path, watch, root)
+        self.calls = 0
+        self._lock = asyncio.Lock()
+
+    def start(self, **meta):
+        """Schreibt den Kopf mit dem Ausgangsstand der beobachteten Dateien (nur neues Archiv)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists() and self.path.stat().st_size > 0:
+            # Fortschreiben: Nummerierung nach den vorhandenen Zeilen (ohne Kopf)
+            with open(self.path, "rb") as f:
+                self.calls = max(sum(1 for _ in f) - 1, 0)
+            return
+        files = {self._rel(path): text for path, text in self._snapshot().items()}
+        self._append({"type": "header", "version": ARCHIVE_VERSION, "ts": time.time(),
+                      "files": files, **meta})
+
+    def _append(self, record):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    async def run(self, runner, prompt, overrides):
+        """Fuehrt den Aufruf echt aus und archiviert ihn (Aufruf aus ClaudeRunner._run)."""
+        before = self._snapshot()
+        result = await runner._dispatch(prompt, dict(overrides, replay=None))
+        after = self._snapshot()
+        files = {}
+        for path, old in before.items():
+            new = after[path]
+            if new != old:
+                files[self._rel(path)] = {
+                    "before": _text_hash(old), "after": _text_hash(new),
+                    "before_lines": len((old or "").splitlines()),
+                    "deleted": new is None, "ops": file_diff(old, new),
+                }
+        async with self._lock:
+            self.calls += 1
+            self._append({
+                "type": "call",
+                "seq": self.calls,
+                "ts": time.time(),
+                "cmd": runner._build_cmd(None, **overrides),
+                "prompt_sha256": prompt_hash(prompt),
+                "model": overrides.get("model", runner.model),
+                "cwd": str(overrides.get("cwd", runner.cwd) or ""),
+                "result": {k: result[k] for k in _RESULT_FIELDS if k in result},
+                "files": files,
+            })
+        return result
+
+    def summary(self):
+        return f"{self.calls} Aufrufe aufgezeichnet -> {self.path}"
+
+
+class Player(_Archive):
+    """Beantwortet Aufrufe aus einem Archiv, ohne die CLI zu starten.
+
+    ``time_scale`` verzoegert jede Antwort um die aufgezeichnete Dauer mal
+    diesem Faktor (0 = sofort). Die Ketten-Engine skaliert damit auch ihre
+    Wartezeiten (Backoff, Cooldown, step_delay_seconds).
+    """
+
+    def __init__(self, path, watch=(), root=None, time_scale=0.0):
+        super().__init__(path, watch, root)
+        self.time_scale = time_scale
+        self.served = 0
+        self.missing = 0
+        self.diverged = 0
+        self._header_offset = None
+        self._by_prompt = {}
+        self._by_model = {}
+        self._used = set()
+        self._index()
+
+    def _index(self):
+        """Liest nur Schluessel und Byte-Offsets; Aufrufe werden bei Bedarf geladen."""
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None  # z.B. abgeschnittene letzte Zeile
+                if isinstance(record, dict):
+                    if record.get("type") == "header" and self._header_offset is None:
+                        self._header_offset = offset
+                    elif record.get("type") == "call":
+                        key = (record.get("prompt_sha256"), record.get("model"))
+                        self._by_prompt.setdefault(key, deque()).append(offset)
+                        self._by_model.setdefault(record.get("model"), deque()).append(offset)
+                offset += len(line)
+
+    def _load(self, offset):
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    @staticmethod
+    def _take(queue, used):
+        while queue:
+            offset = queue.popleft()
+            if offset not in used:
+                return offset
+        return None
+
+    def start(self):
+        """Stellt den aufgezeichneten Ausgangsstand der Dateien her."""
+        if self._header_offset is None:
+            return
+        for rel, text in self._load(self._header_offset).get("files", {}).items():
+            self._write(self._abs(rel), text)
+
+    @staticmethod
+    def _write(path, text):
+        if text is None:
+            path.unlink(missing_ok=True)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+    def _apply_files(self, files):
+        """Spielt Datei-Diffs ein. Returns: Liste abweichender Dateien (nicht angewendet)."""
+        diverged = []
+        for rel, change in files.items():
+            path = self._abs(rel)
+            current = _read(path)
+            if change.get("deleted"):
+                self._write(path, None)
+                continue
+            ops = change.get("ops", [])
+            if _text_hash(current) == change.get("before"):
+                self._write(path, apply_diff(current, ops))
+            elif (len(ops) == 1 and ops[0][0] == ops[0][1] == change.get("before_lines")):
+                # Reines Anhaengen (typischer Handoff-Eintrag): auch auf abweichendem Stand
+                text = current or ""
+                if text and not text.endswith("\n"):
+                    text += "\n"
+                self._write(path, text + "".join(ops[0][2]))
+            else:
+                diverged.append(rel)
+        return diverged
+
+    async def run(self, runner, prompt, overrides):
+        """Liefert das aufgezeichnete Ergebnis (Aufruf aus ClaudeRunner._run)."""
+        model = overrides.get("model", runner.model)
+        match = "prompt"
+        offset = self._take(self._by_prompt.get((prompt_hash(prompt), model), deque()), self._used)
+        if offset is None:
+            match = "model"
+            offset = self._take(self._by_model.get(model, deque()), self._used)
+        if offset is None:
+            self.missing += 1
+            return _result(-3, "", f"REPLAY: kein aufgezeichneter Aufruf fuer Modell {model}", 0, model)
+        self._used.add(offset)
+        record = self._load(offset)
+        result = dict(record["result"])
+        if self.time_scale > 0:
+            await asyncio.sleep((result.get("duration_s") or 0.0) * self.time_scale)
+        diverged = self._apply_files(record.get("files", {}))
+        self.served += 1
+        self.diverged += len(diverged)
+
+        if overrides.get("stream", runner.stream) and (overrides.get("log_file") or overrides.get("on_line")):
+            capture = _StreamCapture(overrides.get("log_file"), overrides.get("on_line"), runner.tail_lines)
+            try:
+                for stream_name in ("stdout", "stderr"):
+                    text = result.get("output" if stream_name == "stdout" else "stderr") or ""
+                    for line in text.splitlines():
+                        capture.feed(stream_name, line)
+            finally:
+                capture.close()
+        result.update(replayed=True, replay_match=match, replay_seq=record.get("seq"))
+        if diverged:
+            result["replay_diverged"] = diverged
+        return result
+
+    def summary(self):
+        return (f"{self.served} Aufrufe abgespielt, {self.missing} ohne Aufzeichnung, "
+                f"{self.diverged} Datei-Aenderungen nicht anwendbar ({self.path})")
+
+
+def make_replay(config, watch=(), root=None):
+    """Recorder/Player aus ``{"mode", "archive", "time_scale"}`` oder None.
+
+    Raises: ValueError bei unbekanntem Modus oder fehlendem Archiv
+    """
+    config = config or {}
+    mode = config.get("mode") or ""
+    if not mode:
+        return None
+    if mode not in REPLAY_MODES:
+        raise ValueError(f"unbekannter Modus '{mode}' (erlaubt: {', '.join(REPLAY_MODES)})")
+    archive = config.get("archive")
+    if not archive:
+        raise ValueError("kein Archiv angegeben")
+    if mode == "record":
+        return Recorder(archive, watch, root)
+    if not Path(archive).exists():
+        raise ValueError(f"Archiv nicht gefunden: {archive}")
+    return Player(archive, watch, root, time_scale=float(config.get("time_scale") or 0.0))
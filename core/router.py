@@ -0,0 +1,181 @@
+"""
+llmauto.core.router -- Modell-Routing nach Gesundheitszustand
+===============================================================
+Fuehrt pro Modell ein rollierendes Fenster aus Erfolg und Latenz der letzten
+Aufrufe. Nach ``failure_threshold`` Fehlschlaegen (Fehler, Timeout,
+voruebergehende Fehler) in Folge gilt ein Modell als gestoert: Links mit
+diesem Modell laufen auf dem naechsten gesunden Modell der Ausweichliste
+(z.B. Opus -> Sonnet -> Haiku). Nach ``probe_after_seconds`` bekommt das
+primaere Modell einen Probe-Aufruf; gelingt er, ist es wieder freigegeben.
+
+Der Zustand gilt pro Prozess und wird von allen Links (und Ketten im
+Supervisor) geteilt.
+"""
+import threading
+import time
+from collections import deque, namedtuple
+
+from .backoff import ERROR, OK, TIMEOUT, TRANSIENT, classify
+
+
+DEFAULT_FALLBACKS = {
+    "claude-opus-4-6": ["claude-sonnet-4-6", "claude-haiku-4-5"],
+    "claude-sonnet-4-6": ["claude-haiku-4-5"],
+}
+
+# Ergebnis-Klassen, die als Fehlschlag des Modells zaehlen. Dauerhafte Fehler
+# (CLI fehlt, Login) und Hard-Stops sagen nichts ueber das Modell aus.
+FAILURE_KINDS = (TRANSIENT, ERROR, TIMEOUT)
+
+# model: zu verwendendes Modell, reason: "primary" | "fallback" | "probe"
+Route = namedtuple("Route", ["model", "reason"])
+
+
+class ModelHealth:
+    """Rollierendes Fenster und Stoerungszustand eines Modells."""
+
+    def __init__(self, window=20):
+        self.window = deque(maxlen=max(1, window))  # (erfolg, dauer_s)
+        self.consecutive_failures = 0
+        self.tripped = False
+        self.probe_at = 0.0
+        self.downgrades = 0
+
+    def success_rate(self):
+        if not self.window:
+            return None
+        return sum(1 for ok, _ in self.window if ok) / len(self.window)
+
+    def avg_latency(self):
+        durations = [d for ok, d in self.window if ok]
+        return sum(durations) / len(durations) if durations else None
+
+
+class HealthBook:
+    """Gesundheitszustand aller Modelle (thread-sicher, prozessweit geteilt)."""
+
+    def __init__(self):
+        self._models = {}
+        self.lock = threading.Lock()
+
+    def get(self, model, window=20):
+        """ModelHealth fuer ``model`` (wird bei Bedarf angelegt). Nur unter ``lock``."""
+        health = self._models.get(model)
+        if health is None:
+            health = self._models[model] = ModelHealth(window)
+        return health
+
+    def models(self):
+        with self.lock:
+            return dict(self._models)
+
+    def clear(self):
+        with self.lock:
+            self._models.clear()
+
+
+SHARED_HEALTH = HealthBook()
+
+
+class ModelRouter:
+    """Waehlt pro Aufruf das Modell und wertet Ergebnisse aus.
+
+    ``fallbacks``: dict Modell -> Liste von Ausweichmodellen (bestes zuerst).
+    Ein beim Link gesetztes ``fallback_model`` steht vor dieser Liste.
+    """
+
+    def __init__(self, fallbacks=None, failure_threshold=3, window=20,
+                 probe_after_seconds=900, health=None, clock=None):
+        self.fallbacks = DEFAULT_FALLBACKS if fallbacks is None else dict(fallbacks)
+        self.failure_threshold = max(1, failure_threshold)
+        self.window = window
+        self.probe_after_seconds = probe_after_seconds
+        self.health = health if health is not None else SHARED_HEALTH
+        self._clock = clock or time.monotonic
+
+    def candidates(self, model, link_fallback=None):
+        """Ausweichmodelle fuer ``model`` in Reihenfolge (ohne Duplikate)."""
+        result = []
+        for candidate in [link_fallback] + list(self.fallbacks.get(model, [])):
+            if candidate and candidate != model and candidate not in result:
+                result.append(candidate)
+        return result
+
+    def _usable(self, model, now):
+        """(nutzbar, probe): gestoerte Modelle nur, wenn ein Probe-Aufruf faellig ist."""
+        health = self.health.get(model, self.window)
+        if not health.tripped:
+            return True, False
+        if now >= health.probe_at:
+            # Nur ein Probe-Aufruf gleichzeitig: naechster erst nach Ablauf
+            health.probe_at = now + self.probe_after_seconds
+            return True, True
+        return False, False
+
+    def select(self, model, link_fallback=None):
+        """Modell fuer den naechsten Aufruf. Returns: Route(model, reason)"""
+        now = self._clock()
+        with self.health.lock:
+            usable, probe = self._usable(model, now)
+            if usable:
+                return Route(model, "probe" if probe else "primary")
+            for candidate in self.candidates(model, link_fallback):
+                usable, probe = self._usable(candidate, now)
+                if usable:
+                    return Route(candidate, "fallback")
+        # Alle Ausweichmodelle ebenfalls gestoert: beim primaeren Modell bleiben
+        return Route(model, "primary")
+
+    def record(self, model, result):
+        """Wertet ein Ergebnis aus.
+
+        Returns: "tripped" (Modell gerade als gestoert markiert), "restored"
+        (gestoertes Modell wieder gesund) oder None.
+        """
+        kind = classify(result)
+        if kind != OK and kind not in FAILURE_KINDS:
+            return None
+        with self.health.lock:
+            health = self.health.get(model, self.window)
+            health.window.append((kind == OK, result.get("duration_s") or 0.0))
+            if kind == OK:
+                health.consecutive_failures = 0
+                if health.tripped:
+                    health.tripped = False
+                    return "restored"
+                return None
+            health.consecutive_failures += 1
+            if health.tripped:
+                # Probe fehlgeschlagen: naechster Versuch nach erneuter Wartezeit
+                health.probe_at = self._clock() + self.probe_after_seconds
+                return None
+            if health.consecutive_failures >= self.failure_threshold:
+                health.tripped = True
+                health.downgrades += 1
+                health.probe_at = self._clock() + self.probe_after_seconds
+                return "tripped"
+        return None
+
+    def snapshot(self):
+        """Zustand: dict Modell -> {"success_rate", "avg_latency_s", "calls", "tripped"}"""
+        result = {}
+        for model, health in sorted(self.health.models().items()):
+            result[model] = {
+                "success_rate": health.success_rate(),
+                "avg_latency_s": health.avg_latency(),
+                "calls": len(health.window),
+                "consecutive_failures": health.consecutive_failures,
+                "tripped": health.tripped,
+            }
+        return result
+
+
+def make_router(config=None):
+    """Erstellt den Router aus dem ``model_router``-Abschnitt der Config.
+
+    Opt-in: ohne ``"enabled": true`` (oder ohne Abschnitt) gibt es keinen Router.
+    """
+    options = dict(config or {})
+    if not options.pop("enabled", False):
+        return None
+    return ModelRouter(**options)
@@ -3,26 +3,347 @@ llmauto.core.runner -- Claude CLI Wrapper
 ==========================================
 Zentraler Baustein: Startet Claude-Prozesse mit konfigurierbaren Parametern.
 Handhabt Environment, Fallback, Timeout, Output-Capture.
+Optional mit Streaming: Zeilen laufen live ins Log und an einen Callback,
+im Speicher bleibt nur ein begrenzter Tail. Mit ``output_format`` json/stream-json
+liefert die CLI strukturierte Ausgabe; Ergebnistext, Token-Verbrauch, Kosten,
+Zahl der Turns und Session-ID landen im Ergebnis-Dict. Optional ueber warme Sitzungen
+(core.session_pool) statt eines neuen Prozesses pro Aufruf. Optional werden Aufrufe
+aufgezeichnet oder aus einem Archiv abgespielt (core.replay). Prozesse laufen ueber asyncio,
+run() ist der synchrone Wrapper um run_async().
 """
-import subprocess
+import asyncio
+import json
 import os
+import shlex
+import signal
 import sys
+import threading
+from collections import deque
 from pathlib import Path
 from datetime import datetime
 
+from . import tracing
+
+
+# Max. Zeilen pro Stream (stdout/stderr), die im Streaming-Modus im Speicher bleiben
+STREAM_TAIL_LINES = 2000
+# Max. Laenge einer einzelnen Zeile fuer den asyncio-Reader
+STREAM_LINE_LIMIT = 16 * 1024 * 1024
+# Abbruch laufender Aufrufe (Hard-Stop): Pruef-Intervall und Wartezeit nach SIGTERM
+ABORT_POLL_SECONDS = 2
+ABORT_GRACE_SECONDS = 10
+# Wartezeit auf Restausgabe nach Prozessende (Pipes ggf. von Enkelprozessen gehalten)
+PIPE_DRAIN_SECONDS = 2
+# Ersatz fuer das "claude"-Kommando (z.B. scripts/fake_claude.py fuer Benchmarks)
+CLAUDE_CMD_ENV = "LLMAUTO_CLAUDE_CMD"
+# Ausgabeformate der CLI; json/stream-json liefern Token-Verbrauch und Kosten
+OUTPUT_FORMATS = ("text", "json", "stream-json")
+# Token-Arten im usage-Block des Ergebnis-Events
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+
+def claude_command(configured=None):
+    """CLI-Kommando als Liste: $LLMAUTO_CLAUDE_CMD, sonst ``claude_cmd`` der Config, sonst "claude".
+
+    Zeichenketten werden wie in einer Shell zerlegt (Pfade mit Leerzeichen in
+    Anfuehrungszeichen), Listen unveraendert uebernommen.
+    """
+    value = os.environ.get(CLAUDE_CMD_ENV) or configured or "claude"
+    if isinstance(value, str):
+        value = shlex.split(value, posix=sys.platform != "win32")
+    return [str(part) for part in value]
+
+
+def usage_from_event(event):
+    """Verbrauch aus dem Ergebnis-Event der CLI (``"type": "result"``).
+
+    Returns: dict mit usage (Token je Art), cost_usd, num_turns, session_id
+             (nur die Felder, die das Event enthaelt)
+    """
+    fields = {}
+    usage = event.get("usage")
+    if isinstance(usage, dict):
+        fields["usage"] = {k: int(usage.get(k) or 0) for k in USAGE_FIELDS}
+    cost = event.get("total_cost_usd", event.get("cost_usd"))
+    if isinstance(cost, (int, float)):
+        fields["cost_usd"] = float(cost)
+    if isinstance(event.get("num_turns"), int):
+        fields["num_turns"] = event["num_turns"]
+    if event.get("session_id"):
+        fields["session_id"] = str(event["session_id"])
+    return fields
+
+
+def event_error(event):
+    """Fehlertext eines fehlgeschlagenen Ergebnis-Events, None bei Erfolg.
+
+    Mit ``is_error`` und subtype "success" steht die Meldung der CLI/API
+    (z.B. "Invalid API key") in ``result``; bei anderen subtypes (z.B.
+    error_max_turns) kann ``result`` die Antwort des Modells sein und zaehlt
+    nicht als Fehlertext.
+    """
+    subtype = event.get("subtype") or "success"
+    if not event.get("is_error") and subtype == "success":
+        return None
+    parts = []
+    if subtype != "success":
+        parts.append(subtype)
+    elif isinstance(event.get("result"), str):
+        parts.append(event["result"])
+    if isinstance(event.get("errors"), list):
+        parts.extend(str(error) for error in event["errors"])
+    return "\n".join(parts) or "is_error"
+
+
+def _assistant_texts(event):
+    """Textbloecke einer Assistent-Nachricht (stream-json)."""
+    return [block.get("text", "") for block in (event.get("message") or {}).get("content") or []
+            if isinstance(block, dict) and block.get("type") == "text"]
+
+
+def parse_structured_output(text):
+    """Zerlegt die Ausgabe von ``--output-format json`` bzw. ``stream-json``.
+
+    Versteht ein einzelnes Ergebnis-Objekt, eine Liste von Events (json mit
+    --verbose) und ein Event pro Zeile (stream-json).
+
+    Returns: (Ergebnis-Event oder None, Assistent-Text oder None wenn die
+              Ausgabe kein JSON war)
+    """
+    try:
+        parsed = json.loads(text)
+        events = parsed if isinstance(parsed, list) else [parsed]
+    except ValueError:
+        events = []
+        for line in text.splitlines():
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    events = [event for event in events if isinstance(event, dict)]
+    if not events:
+        return None, None
+    result_event, texts = None, []
+    for event in events:
+        if event.get("type") == "assistant":
+            texts.extend(_assistant_texts(event))
+        elif event.get("type") == "result":
+            result_event = event
+    return result_event, "\n".join(texts)
+
+
+def _apply_result_event(result, event, text=None):
+    """Uebernimmt Ergebnistext, Fehlerstatus und Verbrauch aus dem Ergebnis-Event.
+
+    Ohne Event (Timeout, Abbruch) bleibt das Ergebnis bis auf den bis dahin
+    gelesenen Assistent-Text (``text``) unveraendert.
+    """
+    if event is None:
+        if text is not None:
+            result["output"] = text.strip()
+        return result
+    output = event.get("result")
+    if not isinstance(output, str):
+        output = text or ""
+    result["output"] = output.strip()
+    error = event_error(event)
+    if error is not None:
+        # Fehlertext fuer core.backoff (klassifiziert nie die Modell-Antwort)
+        result["error"] = error
+        if result["returncode"] == 0:
+            result.update(success=False, returncode=1)
+    result.update(usage_from_event(event))
+    return result
+
+
+class _StreamCapture:
+    """Sammelt gestreamte Ausgabe: Tee in Log-Datei und Callback, begrenzter Tail.
+
+    Mit ``structured`` (stream-json) wird stdout als Event-Strom gelesen: Log,
+    Tail und Callback erhalten den Assistent-Text und Tool-Aufrufe, das
+    Ergebnis-Event wird in ``result_event`` gehalten.
+    """
+
+    def __init__(self, log_file=None, on_line=None, tail_lines=STREAM_TAIL_LINES, structured=False):
+        self.on_line = on_line
+        self.structured = structured
+        self.result_event = None
+        self.tails = {
+            "stdout": deque(maxlen=tail_lines),
+            "stderr": deque(maxlen=tail_lines),
+        }
+        self.line_counts = {"stdout": 0, "stderr": 0}
+        self.byte_counts = {"stdout": 0, "stderr": 0}
+        self._lock = threading.Lock()
+        self._fh = open(log_file, "a", encoding="utf-8") if log_file else None
+
+    def feed(self, stream_name, line):
+        line = line.rstrip("\r\n")
+        if self.structured and stream_name == "stdout":
+            for text in self._readable(line):
+                self._feed_line(stream_name, text)
+        else:
+            self._feed_line(stream_name, line)
+
+    def _readable(self, line):
+        """stream-json: lesbare Zeilen eines Events (Ergebnis-Event wird gemerkt)."""
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return [line]
+        if not isinstance(event, dict):
+            return [line]
+        if event.get("type") == "result":
+            self.result_event = event
+            return []
+        if event.get("type") != "assistant":
+            return []  # system/user-Events (Init, Tool-Ergebnisse) nicht ins Log
+        lines = []
+        for block in (event.get("message") or {}).get("content") or []:
+            if not isinstance(block, dict):
+                continue
+            if block.get("type") == "text":
+                lines.extend(block.get("text", "").splitlines())
+            elif block.get("type") == "tool_use":
+                lines.append(f"[Tool: {block.get('name')}]")
+        return lines
+
+    def _feed_line(self, stream_name, line):
+        with self._lock:
+            self.tails[stream_name].append(line)
+            self.line_counts[stream_name] += 1
+            self.byte_counts[stream_name] += len(line.encode("utf-8")) + 1
+            if self._fh:
+                prefix = "[stderr] " if stream_name == "stderr" else ""
+                self._fh.write(f"{prefix}{line}\n")
+                self._fh.flush()
+        if self.on_line:
+            try:
+                self.on_line(stream_name, line)
+            except Exception:
+                pass  # Callback-Fehler duerfen den Lauf nicht abbrechen
+
+    def text(self, stream_name):
+        with self._lock:
+            return "\n".join(self.tails[stream_name]).strip()
+
+    def close(self):
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+
+def _decode(data):
+    return data.decode("utf-8", errors="replace") if data else ""
+
+
+def _result(returncode, output, stderr, duration, model):
+    """Einheitliches Ergebnis-Dict eines CLI-Aufrufs."""
+    return {
+        "success": returncode == 0,
+        "output": output,
+        "stderr": stderr,
+        "returncode": returncode,
+        "duration_s": duration,
+        "model": model,
+    }
+
+
+async def _read_lines(stream, stream_name, capture):
+    """Liest einen Prozess-Stream zeilenweise in den Capture."""
+    while True:
+        try:
+            line = await stream.readline()
+        except ValueError:
+            # Zeile laenger als STREAM_LINE_LIMIT: Rest des Puffers uebernehmen
+            line = await stream.read(STREAM_LINE_LIMIT)
+        if not line:
+            break
+        capture.feed(stream_name, _decode(line))
+
+
+async def _watch_abort(abort_check, interval):
+    """Prueft periodisch, ob der laufende Aufruf abgebrochen werden soll."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if abort_check():
+                return True
+        except Exception:
+            pass  # Fehlerhafte Pruefung bricht nichts ab
+
+
+def _signal(proc, sig):
+    """Sendet ein Signal an den Prozess und (POSIX) seine ganze Prozessgruppe.
+
+    Die CLI startet eigene Tool-Prozesse (Bash etc.); ohne Gruppen-Signal
+    wuerden diese weiterlaufen und die Ausgabe-Pipes offen halten.
+    """
+    try:
+        if sys.platform != "win32":
+            os.killpg(proc.pid, sig)
+        elif sig == signal.SIGTERM:
+            proc.terminate()
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _terminate(proc, grace):
+    """Beendet einen Prozess sanft (SIGTERM), nach ``grace`` Sekunden hart."""
+    if proc.returncode is not None:
+        return
+    _signal(proc, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(proc.wait(), timeout=grace)
+    except asyncio.TimeoutError:
+        await _kill(proc)
+
+
+async def _cancel(task):
+    """Bricht einen Task ab und holt das Ergebnis ab (keine 'never retrieved'-Warnung)."""
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
+
+
+async def _kill(proc):
+    """Beendet einen Prozess (samt Prozessgruppe) hart und wartet auf das Ende."""
+    _signal(proc, signal.SIGKILL if sys.platform != "win32" else signal.SIGTERM)
+    await proc.wait()
+
 
 class ClaudeRunner:
     """Wrapper um die Claude CLI fuer automatisierte Aufrufe."""
 
     def __init__(self, model="claude-sonnet-4-6", fallback_model=None,
                  permission_mode="dontAsk", allowed_tools=None, timeout=1800,
-                 cwd=None):
+                 cwd=None, stream=False, tail_lines=STREAM_TAIL_LINES, governor=None,
+                 session_pool=None, claude_cmd=None, replay=None, output_format=None):
         self.model = model
         self.fallback_model = fallback_model
         self.permission_mode = permission_mode
         self.allowed_tools = allowed_tools or ["Read", "Edit", "Write", "Bash", "Glob", "Grep"]
         self.timeout = timeout
         self.cwd = cwd
+        self.stream = stream
+        self.tail_lines = tail_lines
+        # Optionaler ModelGovernor: Slots/Budget pro Modell ueber Prozesse hinweg
+        self.governor = governor
+        # Optionaler SessionPool: Prompts an warme CLI-Prozesse statt Neustart
+        self.session_pool = session_pool
+        # Kommando der CLI (siehe claude_command)
+        self.claude_cmd = claude_command(claude_cmd)
+        # Optionaler Recorder/Player (core.replay): Aufrufe archivieren bzw. abspielen
+        self.replay = replay
+        # Ausgabeformat der CLI (siehe OUTPUT_FORMATS)
+        self.output_format = output_format or "text"
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"unbekanntes output_format '{self.output_format}' "
+                             f"(erlaubt: {', '.join(OUTPUT_FORMATS)})")
 
     def _build_env(self):
         """Environment vorbereiten: CLAUDECODE entfernen, Encoding setzen."""
@@ -36,85 +357,242 @@ class ClaudeRunner:
         model = overrides.get("model", self.model)
         continue_conv = overrides.get("continue_conversation", False)
 
-        cmd = ["claude"]
+        cmd = list(self.claude_cmd)
         if continue_conv:
             cmd.append("--continue")
+        cmd.extend(["--model", model, "-p"])
+        if prompt is not None:
+            cmd.append(prompt)
         cmd.extend([
-            "--model", model,
-            "-p", prompt,
             "--permission-mode", self.permission_mode,
             "--allowedTools", ",".join(self.allowed_tools),
         ])
         fallback = overrides.get("fallback_model", self.fallback_model)
         if fallback:
             cmd.extend(["--fallback-model", fallback])
+        output_format = self._output_format(overrides)
+        if output_format != "text":
+            cmd.extend(["--output-format", output_format])
+            if output_format == "stream-json":
+                cmd.append("--verbose")  # von der CLI bei -p mit stream-json verlangt
         return cmd
 
+    def _output_format(self, overrides):
+        """Wirksames Ausgabeformat: json wird im Streaming-Modus zu stream-json."""
+        output_format = overrides.get("output_format", self.output_format) or "text"
+        if output_format == "json" and overrides.get("stream", self.stream):
+            return "stream-json"
+        return output_format
+
+    def _build_session_cmd(self, **overrides):
+        """Kommando fuer eine warme Sitzung: Prompts kommen als stream-json ueber stdin."""
+        from .session_pool import SESSION_FLAGS
+        return self._build_cmd(None, **dict(overrides, output_format="text")) + SESSION_FLAGS
+
     def run(self, prompt, **overrides):
         """
-        Fuehrt einen Claude-Aufruf aus.
+        Fuehrt einen Claude-Aufruf aus (synchroner Wrapper um run_async).
+
+        Overrides (zusaetzlich zu den _build_cmd-Optionen):
+            stream:   Ausgabe zeilenweise lesen statt am Ende gepuffert
+            log_file: Streaming-Zeilen sofort an diese Datei anhaengen
+            on_line:  Callback(stream_name, line) fuer jede gelesene Zeile
+            abort_check: Callable ohne Argumente; True beendet den laufenden
+                         Prozess vorzeitig (z.B. Hard-Stop einer Kette)
+            abort_poll:  Pruef-Intervall fuer abort_check in Sekunden
+            governor: ModelGovernor; vor dem Start wird ein Slot fuer das
+                      Modell belegt (Wartezeit zaehlt nicht zum Timeout)
+            limiter:  asyncio.Semaphore fuer eine Obergrenze im Prozess
+            session_pool: SessionPool; Prompt in einer warmen Sitzung
+                      ausfuehren statt einen neuen Prozess zu starten
+                      (nicht mit stream/continue_conversation)
+            replay:   Recorder/Player aus core.replay (None = direkt ausfuehren)
+            output_format: text, json oder stream-json (siehe OUTPUT_FORMATS)
 
         Returns:
             dict mit keys: success, output, stderr, returncode, duration_s
+            (strukturierte Ausgabe zusaetzlich: usage, cost_usd, num_turns,
+            session_id und bei Fehlschlag error)
+            returncode: -1 Timeout, -2 CLI fehlt, -3 sonstiger Fehler, -4 abgebrochen
         """
+        return asyncio.run(self.run_async(prompt, **overrides))
+
+    async def run_async(self, prompt, **overrides):
+        """Wie run(), aber als Coroutine fuer eine laufende Event-Loop.
+
+        Nutzt asyncio.create_subprocess_exec, damit viele Aufrufe (parallele
+        Links, mehrere Ketten im Supervisor) in einem Prozess laufen koennen.
+        """
+        governor = overrides.get("governor", self.governor)
+        if governor is None:
+            return await self._limited(prompt, overrides)
+        model = overrides.get("model", self.model)
+        with tracing.span("Modell-Slot", "wait", model=model):
+            lease = await governor.acquire(model, abort_check=overrides.get("abort_check"))
+        if lease is None:
+            return _result(-4, "", "ABGEBROCHEN: Hard-Stop beim Warten auf Modell-Slot", 0, model)
+        try:
+            return await self._limited(prompt, overrides)
+        finally:
+            await lease.release()
+
+    async def _limited(self, prompt, overrides):
+        """Prozess-lokale Obergrenze (``limiter``) erst nach dem Governor-Slot belegen.
+
+        So blockiert ein Aufruf, der auf ein ausgelastetes Modell wartet,
+        keinen Platz fuer Aufrufe anderer Modelle.
+        """
+        limiter = overrides.get("limiter")
+        if limiter is None:
+            return await self._run(prompt, overrides)
+        with tracing.span("Limiter", "wait"):
+            await limiter.acquire()
+        try:
+            return await self._run(prompt, overrides)
+        finally:
+            limiter.release()
+
+    async def _run(self, prompt, overrides):
+        """Ein CLI-Aufruf (Streaming, gepuffert oder in einer warmen Sitzung)."""
+        model = overrides.get("model", self.model)
+        with tracing.span("CLI", "cli", model=model) as args:
+            result = await self._dispatch(prompt, overrides)
+            args.update(returncode=result["returncode"], replayed=bool(result.get("replayed")))
+        return result
+
+    async def _dispatch(self, prompt, overrides):
+        replay = overrides.get("replay", self.replay)
+        if replay is not None:
+            return await replay.run(self, prompt, overrides)
+        session_pool = overrides.get("session_pool", self.session_pool)
+        if (session_pool is not None and not overrides.get("stream", self.stream)
+                and not overrides.get("continue_conversation")):
+            return await session_pool.run(self, prompt, overrides)
         cmd = self._build_cmd(prompt, **overrides)
         env = self._build_env()
         cwd = overrides.get("cwd", self.cwd)
         timeout = overrides.get("timeout", self.timeout)
+        model = overrides.get("model", self.model)
+        abort = {
+            "abort_check": overrides.get("abort_check"),
+            "abort_poll": overrides.get("abort_poll", ABORT_POLL_SECONDS),
+        }
+
+        output_format = self._output_format(overrides)
+
+        if overrides.get("stream", self.stream):
+            capture = _StreamCapture(
+                log_file=overrides.get("log_file"),
+                on_line=overrides.get("on_line"),
+                tail_lines=self.tail_lines,
+                structured=output_format == "stream-json",
+            )
+            try:
+                result = await self._exec(cmd, env, cwd, timeout, model, capture, **abort)
+                # Gesamtgroesse der Ausgabe (der Tail in "output" ist begrenzt)
+                result["output_bytes"] = capture.byte_counts["stdout"]
+                if capture.structured:
+                    _apply_result_event(result, capture.result_event)
+                return result
+            finally:
+                capture.close()
+        result = await self._exec(cmd, env, cwd, timeout, model, **abort)
+        if output_format != "text" and result["output"]:
+            event, text = parse_structured_output(result["output"])
+            _apply_result_event(result, event, text)
+        return result
+
+    async def _exec(self, cmd, env, cwd, timeout, model, capture=None,
+                    abort_check=None, abort_poll=ABORT_POLL_SECONDS):
+        """Startet den CLI-Prozess und wartet mit Timeout auf das Ende.
+
+        Mit ``capture`` werden stdout/stderr zeilenweise gelesen (Streaming);
+        bei Timeout bleibt die bis dahin gelesene Ausgabe im Ergebnis (Tail)
+        und in der Log-Datei erhalten. Ohne ``capture`` wird gepuffert gelesen.
 
+        ``abort_check`` wird alle ``abort_poll`` Sekunden aufgerufen; liefert
+        er True, wird der Prozess beendet (returncode -4, Hard-Stop).
+        """
         start = datetime.now()
         try:
-            result = subprocess.run(
-                cmd,
-                env=env,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                timeout=timeout,
-                cwd=str(cwd) if cwd else None
+            with tracing.span("Prozessstart", "cli"):
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    env=env,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=str(cwd) if cwd else None,
+                    limit=STREAM_LINE_LIMIT,
+                    # Eigene Prozessgruppe (POSIX), damit Abbruch auch Tool-Prozesse erfasst
+                    start_new_session=sys.platform != "win32",
+                )
+        except FileNotFoundError:
+            return _result(-2, "", "claude CLI nicht gefunden. Ist Claude Code installiert?", 0, model)
+        except Exception as e:
+            return _result(-3, "", str(e), (datetime.now() - start).total_seconds(), model)
+
+        if capture is not None:
+            collect = asyncio.gather(
+                _read_lines(proc.stdout, "stdout", capture),
+                _read_lines(proc.stderr, "stderr", capture),
+                proc.wait(),
             )
-            duration = (datetime.now() - start).total_seconds()
-            return {
-                "success": result.returncode == 0,
-                "output": result.stdout.strip(),
-                "stderr": result.stderr.strip() if result.stderr else "",
-                "returncode": result.returncode,
-                "duration_s": duration,
-                "model": overrides.get("model", self.model),
-            }
-
-        except subprocess.TimeoutExpired:
-            duration = (datetime.now() - start).total_seconds()
-            return {
-                "success": False,
-                "output": "",
-                "stderr": f"TIMEOUT nach {timeout}s",
-                "returncode": -1,
-                "duration_s": duration,
-                "model": overrides.get("model", self.model),
-            }
+        else:
+            collect = proc.communicate()
 
-        except FileNotFoundError:
-            return {
-                "success": False,
-                "output": "",
-                "stderr": "claude CLI nicht gefunden. Ist Claude Code installiert?",
-                "returncode": -2,
-                "duration_s": 0,
-                "model": overrides.get("model", self.model),
-            }
+        collect_task = asyncio.ensure_future(collect)
+        watch_task = None
+        if abort_check is not None:
+            watch_task = asyncio.ensure_future(_watch_abort(abort_check, abort_poll))
+        waiting = {collect_task} if watch_task is None else {collect_task, watch_task}
+        try:
+            await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            await _cancel(collect_task)
+            await _kill(proc)
+            raise
+        finally:
+            if watch_task is not None:
+                watch_task.cancel()
 
-        except Exception as e:
+        aborted = (watch_task is not None and watch_task.done()
+                   and not watch_task.cancelled() and not collect_task.done())
+        if aborted:
+            # Hard-Stop: Prozess zuerst sanft beenden, damit die CLI aufraeumen kann
+            await _terminate(proc, ABORT_GRACE_SECONDS)
+            try:
+                # Restausgabe einsammeln; Enkelprozesse koennen die Pipes offen halten
+                await asyncio.wait_for(asyncio.shield(collect_task), timeout=PIPE_DRAIN_SECONDS)
+            except Exception:
+                await _cancel(collect_task)
+        elif not collect_task.done():
+            await _cancel(collect_task)
+            await _kill(proc)
             duration = (datetime.now() - start).total_seconds()
-            return {
-                "success": False,
-                "output": "",
-                "stderr": str(e),
-                "returncode": -3,
-                "duration_s": duration,
-                "model": overrides.get("model", self.model),
-            }
+            output, stderr = "", ""
+            if capture is not None:
+                output, stderr = capture.text("stdout"), capture.text("stderr")
+            stderr = f"TIMEOUT nach {timeout}s" + (f"\n{stderr}" if stderr else "")
+            return _result(-1, output, stderr, duration, model)
+
+        duration = (datetime.now() - start).total_seconds()
+        finished = collect_task.done() and not collect_task.cancelled()
+        if finished and collect_task.exception() is not None and not aborted:
+            await _kill(proc)
+            return _result(-3, "", str(collect_task.exception()), duration, model)
+
+        output, stderr = "", ""
+        if capture is not None:
+            output, stderr = capture.text("stdout"), capture.text("stderr")
+        elif finished and collect_task.exception() is None:
+            stdout_data, stderr_data = collect_task.result()
+            output, stderr = _decode(stdout_data).strip(), _decode(stderr_data).strip()
+
+        if aborted:
+            stderr = "ABGEBROCHEN: Hard-Stop angefordert" + (f"\n{stderr}" if stderr else "")
+            return _result(-4, output, stderr, duration, model)
+        return _result(proc.returncode, output, stderr, duration, model)
 
     def pipe(self, prompt, **overrides):
         """Kurzform: Prompt rein, Text raus. Wirft Exception bei Fehler."""
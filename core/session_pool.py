@@ -0,0 +1,310 @@
+"""
+llmauto.core.session_pool -- Warme Claude-Sitzungen
+=====================================================
+Haelt einige langlebige ``claude``-Prozesse im Streaming-Eingabemodus
+(``--input-format stream-json --output-format stream-json``) offen und
+reicht Prompts an sie weiter. Spart pro Aufruf den Start der CLI (Node,
+Login, Tool-Initialisierung) -- bei kurzen Prompts ein Grossteil der Laufzeit.
+
+Eine Sitzung behaelt den Gespraechsverlauf: jeder weitere Prompt sieht die
+vorherigen. Deshalb wird eine Sitzung nach ``max_prompts`` Prompts, ab
+``max_context_tokens`` Kontext, nach einem Fehler oder nach ``idle_seconds``
+ohne Nutzung beendet und bei Bedarf neu gestartet. Geeignet fuer viele
+unabhaengige, kurze Prompts (z.B. ``pipe --batch --warm``), nicht fuer
+Ketten-Links, die bewusst mit frischem Kontext starten.
+"""
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from datetime import datetime
+
+from . import tracing
+from .runner import (
+    ABORT_POLL_SECONDS, STREAM_LINE_LIMIT, _cancel, _decode, _kill, _result, _watch_abort,
+    _assistant_texts, event_error, usage_from_event,
+)
+
+
+SESSION_FLAGS = ["--input-format", "stream-json", "--output-format", "stream-json", "--verbose"]
+# Wartezeit beim Schliessen einer Sitzung (stdin zu -> CLI beendet sich selbst)
+CLOSE_GRACE_SECONDS = 5
+STDERR_TAIL_LINES = 200
+
+
+def user_message(prompt):
+    """Eine Eingabezeile im stream-json-Format der CLI."""
+    return json.dumps({
+        "type": "user",
+        "message": {"role": "user", "content": [{"type": "text", "text": prompt}]},
+    }, ensure_ascii=False)
+
+
+def context_tokens(usage):
+    """Kontextgroesse aus dem ``usage``-Block eines Ergebnis-Events."""
+    if not usage:
+        return 0
+    return sum(usage.get(k) or 0 for k in (
+        "input_tokens", "cache_read_input_tokens", "cache_creation_input_tokens", "output_tokens",
+    ))
+
+
+class WarmSession:
+    """Ein laufender CLI-Prozess im Streaming-Eingabemodus."""
+
+    def __init__(self, key, cmd, env, cwd, model):
+        self.key = key
+        self.cmd = cmd
+        self.env = env
+        self.cwd = cwd
+        self.model = model
+        self.proc = None
+        self.prompts = 0
+        self.context_tokens = 0
+        self.last_used = time.monotonic()
+        self._stderr = deque(maxlen=STDERR_TAIL_LINES)
+        self._stderr_task = None
+
+    @property
+    def alive(self):
+        return self.proc is not None and self.proc.returncode is None
+
+    async def start(self):
+        """Startet den Prozess. Returns: None oder Fehler-Ergebnis (rc -2/-3)."""
+        try:
+            with tracing.span("Prozessstart (Sitzung)", "cli"):
+                self.proc = await asyncio.create_subprocess_exec(
+                    *self.cmd,
+                    env=self.env,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=str(self.cwd) if self.cwd else None,
+                    limit=STREAM_LINE_LIMIT,
+                    start_new_session=sys.platform != "win32",
+                )
+        except FileNotFoundError:
+            return _result(-2, "", "claude CLI nicht gefunden. Ist Claude Code installiert?", 0, self.model)
+        except Exception as e:
+            return _result(-3, "", str(e), 0, self.model)
+        self._stderr_task = asyncio.ensure_future(self._drain_stderr())
+        return None
+
+    async def _drain_stderr(self):
+        while True:
+            line = await self.proc.stderr.readline()
+            if not line:
+                return
+            self._stderr.append(_decode(line).rstrip("\r\n"))
+
+    async def _read_result(self):
+        """Liest Events bis zum Ergebnis-Event. Returns: (event | None, Assistent-Text)"""
+        texts = []
+        while True:
+            try:
+                line = await self.proc.stdout.readline()
+            except ValueError:
+                line = await self.proc.stdout.read(STREAM_LINE_LIMIT)
+            if not line:
+                return None, "\n".join(texts)
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(event, dict):
+                continue
+            if event.get("type") == "assistant":
+                texts.extend(_assistant_texts(event))
+            elif event.get("type") == "result":
+                return event, "\n".join(texts)
+
+    async def ask(self, prompt, timeout, abort_check=None, abort_poll=ABORT_POLL_SECONDS):
+        """Sendet einen Prompt und wartet auf das Ergebnis (Format wie ClaudeRunner.run)."""
+        start = datetime.now()
+        self.prompts += 1
+        self._stderr.clear()
+        try:
+            self.proc.stdin.write((user_message(prompt) + "\n").encode("utf-8"))
+            await self.proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            await self.close()
+            return _result(-3, "", f"Sitzung beendet: {e}", 0, self.model)
+
+        read_task = asyncio.ensure_future(self._read_result())
+        watch_task = None
+        if abort_check is not None:
+            watch_task = asyncio.ensure_future(_watch_abort(abort_check, abort_poll))
+        waiting = {read_task} if watch_task is None else {read_task, watch_task}
+        try:
+            await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            await _cancel(read_task)
+            await self.close(force=True)
+            raise
+        finally:
+            if watch_task is not None:
+                watch_task.cancel()
+        duration = (datetime.now() - start).total_seconds()
+        self.last_used = time.monotonic()
+
+        if not read_task.done():
+            # Timeout oder Hard-Stop: Sitzung ist unbrauchbar (Antwort laeuft noch)
+            aborted = watch_task is not None and watch_task.done() and not watch_task.cancelled()
+            await _cancel(read_task)
+            await self.close(force=True)
+            if aborted:
+                return _result(-4, "", "ABGEBROCHEN: Hard-Stop angefordert", duration, self.model)
+            return _result(-1, "", f"TIMEOUT nach {timeout}s", duration, self.model)
+        if read_task.exception() is not None:
+            await self.close(force=True)
+            return _result(-3, "", str(read_task.exception()), duration, self.model)
+
+        event, text = read_task.result()
+        stderr = "\n".join(self._stderr).strip()
+        if event is None:
+            # Prozess hat sich ohne Ergebnis beendet
+            returncode = await self.proc.wait()
+            return _result(returncode or -3, text.strip(), stderr, duration, self.model)
+        self.context_tokens = max(self.context_tokens, context_tokens(event.get("usage")))
+        output = event.get("result")
+        if not isinstance(output, str):
+            output = text
+        error = event_error(event)
+        result = _result(0 if error is None else 1, output.strip(), stderr, duration, self.model)
+        if error is not None:
+            result["error"] = error
+        result["output_bytes"] = len(output.encode("utf-8"))
+        result["session_prompt"] = self.prompts
+        result.update(usage_from_event(event))
+        return result
+
+    async def close(self, force=False):
+        """Beendet die Sitzung (stdin schliessen, bei ``force`` sofort hart)."""
+        if self.proc is None:
+            return
+        if self.proc.returncode is None:
+            if not force:
+                try:
+                    self.proc.stdin.close()
+                    await asyncio.wait_for(self.proc.wait(), timeout=CLOSE_GRACE_SECONDS)
+                except (asyncio.TimeoutError, BrokenPipeError, ConnectionResetError):
+                    pass
+            if self.proc.returncode is None:
+                await _kill(self.proc)
+        if self._stderr_task is not None:
+            await _cancel(self._stderr_task)
+            self._stderr_task = None
+
+
+class SessionPool:
+    """Begrenzter Pool warmer Sitzungen, getrennt nach CLI-Parametern.
+
+    Sitzungen mit gleichem Kommando (Modell, Tools, Berechtigungen) und
+    Arbeitsverzeichnis werden wiederverwendet; insgesamt laufen hoechstens
+    ``size`` Prozesse.
+    """
+
+    def __init__(self, size=2, max_prompts=20, max_context_tokens=150000, idle_seconds=300):
+        self.size = max(1, size)
+        self.max_prompts = max_prompts
+        self.max_context_tokens = max_context_tokens
+        self.idle_seconds = idle_seconds
+        self._idle = []
+        self._count = 0
+        self._cond = None
+
+    def _condition(self):
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    def _expired(self, session, now):
+        return (not session.alive
+                or (self.idle_seconds and now - session.last_used > self.idle_seconds)
+                or (self.max_prompts and session.prompts >= self.max_prompts)
+                or (self.max_context_tokens and session.context_tokens >= self.max_context_tokens))
+
+    async def _checkout(self, key):
+        """Freie passende Sitzung oder None (dann darf eine neue gestartet werden).
+
+        Ausgemusterte Sitzungen werden erst nach Freigabe des Locks beendet,
+        damit andere Aufrufe nicht auf deren Prozessende warten.
+        """
+        cond = self._condition()
+        retired = []
+        try:
+            async with cond:
+                while True:
+                    now = time.monotonic()
+                    stale = [s for s in self._idle if self._expired(s, now)]
+                    for session in stale:
+                        self._idle.remove(session)
+                        self._count -= 1
+                    retired.extend(stale)
+                    for session in self._idle:
+                        if session.key == key:
+                            self._idle.remove(session)
+                            return session
+                    if self._count < self.size:
+                        self._count += 1
+                        return None
+                    if self._idle:
+                        # Pool voll mit Sitzungen anderer Parameter: aelteste ersetzen
+                        oldest = min(self._idle, key=lambda s: s.last_used)
+                        self._idle.remove(oldest)
+                        retired.append(oldest)
+                        return None
+                    await cond.wait()
+        finally:
+            for session in retired:
+                await session.close()
+
+    async def _checkin(self, session, keep):
+        """Gibt den Platz zurueck; ``session`` None = Start fehlgeschlagen oder nie erfolgt."""
+        cond = self._condition()
+        async with cond:
+            keep = keep and session is not None and not self._expired(session, time.monotonic())
+            if keep:
+                self._idle.append(session)
+            else:
+                self._count -= 1
+            cond.notify()
+        if not keep and session is not None:
+            await session.close()
+
+    async def run(self, runner, prompt, overrides):
+        """Fuehrt einen Prompt in einer warmen Sitzung aus (Aufruf aus ClaudeRunner._run)."""
+        cmd = runner._build_session_cmd(**overrides)
+        cwd = overrides.get("cwd", runner.cwd)
+        model = overrides.get("model", runner.model)
+        key = (tuple(cmd), str(cwd or ""))
+        session = await self._checkout(key)
+        try:
+            if session is None:
+                session = WarmSession(key, cmd, runner._build_env(), cwd, model)
+                error = await session.start()
+                if error is not None:
+                    await self._checkin(None, keep=False)
+                    session = None
+                    return error
+            result = await session.ask(
+                prompt, overrides.get("timeout", runner.timeout),
+                abort_check=overrides.get("abort_check"),
+                abort_poll=overrides.get("abort_poll", ABORT_POLL_SECONDS),
+            )
+        except BaseException:
+            # Auch ohne gestartete Sitzung den reservierten Platz freigeben
+            await self._checkin(session, keep=False)
+            raise
+        await self._checkin(session, keep=result["success"])
+        return result
+
+    async def close(self):
+        """Beendet alle freien Sitzungen."""
+        cond = self._condition()
+        async with cond:
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+        for session in idle:
+            await session.close()
@@ -2,21 +2,240 @@
 llmauto.core.state -- State-Management
 ========================================
 Verwaltet Laufzeit-State pro aktiver Kette: Runden, Handoff, Shutdown.
+
+Der State wird einmal geladen und im Speicher gehalten. Persistiert wird
+atomar (Temp-Datei + Rename) in ein kompaktes ``state.json``; die
+Einzeldateien (status.txt, round_counter.txt, start_time.txt) werden
+optional als Kompatibilitaets-Spiegel mitgeschrieben. Externe Aenderungen
+(Agents schreiben z.B. status.txt) werden ueber die mtime erkannt.
 """
 import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 
 
+# In-Prozess-Benachrichtigung bei Statuswechseln (z.B. fuer den Ketten-Scheduler).
+# Callbacks werden mit (chain_name, alter_status, neuer_status) aufgerufen.
+_STATUS_LISTENERS = []
+
+# Lock-Dateien (file_lock): Wartezeit und Alter, ab dem ein Lock als verwaist gilt
+LOCK_TIMEOUT_SECONDS = 30
+LOCK_STALE_SECONDS = 60
+
+# Praefix in der STOP-Datei fuer einen Hard-Stop (laufendes Glied abbrechen)
+HARD_STOP_MARKER = "[HARD]"
+
+# Handoff-Abschnitte beginnen mit einer H1-Ueberschrift ("# Handoff - Runde N")
+_HANDOFF_SECTION_RE = re.compile(r"^# ", re.MULTILINE)
+_HANDOFF_ROUND_RE = re.compile(r"(?:Runde|Round)\s*\[?(\d+)", re.IGNORECASE)
+HANDOFF_SUMMARY_TITLE = "# Zusammenfassung aelterer Runden"
+
+# Glied-Status im Checkpoint, die beim Fortsetzen nicht wiederholt werden
+LINK_FINISHED_STATUSES = ("done", "failed", "skipped")
+
+# Verbrauchs-Zaehler (strukturierte CLI-Ausgabe) und Zahl der Runden mit eigenem Eintrag
+USAGE_COUNTERS = ("calls", "input_tokens", "output_tokens", "cache_creation_input_tokens",
+                  "cache_read_input_tokens", "num_turns", "cost_usd")
+USAGE_ROUNDS_KEPT = 50
+
+# Felder des State-Records und ihre Einzeldateien (Kompatibilitaets-Spiegel)
+_LEGACY_FILES = {
+    "status": "status.txt",
+    "round": "round_counter.txt",
+    "start_time": "start_time.txt",
+}
+
+
+def add_status_listener(callback):
+    """Registriert einen Callback fuer Statuswechsel aller Ketten im Prozess."""
+    _STATUS_LISTENERS.append(callback)
+
+
+def remove_status_listener(callback):
+    """Entfernt einen mit add_status_listener registrierten Callback."""
+    if callback in _STATUS_LISTENERS:
+        _STATUS_LISTENERS.remove(callback)
+
+
+def atomic_write_text(path, text, retries=5):
+    """Schreibt eine Datei atomar (Temp-Datei im selben Ordner + os.replace).
+
+    Leser sehen immer entweder den alten oder den neuen Inhalt, nie eine
+    halb geschriebene Datei. Unter Windows kann os.replace kurzzeitig
+    scheitern (Datei von Agent/OneDrive geoeffnet) -> Retry, zuletzt
+    direktes Schreiben.
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    for attempt in range(retries):
+        try:
+            os.replace(tmp, path)
+            return
+        except PermissionError:
+            time.sleep(0.05 * (attempt + 1))
+    path.write_text(text, encoding="utf-8")
+    tmp.unlink(missing_ok=True)
+
+
+@contextmanager
+def file_lock(path, timeout=LOCK_TIMEOUT_SECONDS, stale=LOCK_STALE_SECONDS):
+    """Exklusiver Lock ueber eine Lock-Datei (O_EXCL, plattformunabhaengig).
+
+    Lock-Dateien aelter als ``stale`` Sekunden (abgestuerzter Prozess)
+    werden uebernommen.
+    """
+    path = Path(path)
+    deadline = time.time() + timeout
+    while True:
+        try:
+            fd = os.open(str(path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, str(os.getpid()).encode("ascii"))
+            os.close(fd)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - path.stat().st_mtime > stale:
+                    path.unlink()
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.time() > deadline:
+                raise TimeoutError(f"Lock nicht erhalten: {path}")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _mtime_ns(path):
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _reversed_lines(text):
+    """Liefert die Zeilen eines Texts von hinten, ohne den ganzen Text zu splitten."""
+    end = len(text)
+    while end > 0:
+        start = text.rfind("\n", 0, end)
+        yield text[start + 1:end]
+        end = start if start >= 0 else 0
+
+
+def split_handoff(content, max_bytes=0, max_lines=0):
+    """Teilt einen Handoff in behaltenen und zu archivierenden Teil.
+
+    Der Handoff wird an H1-Ueberschriften in Abschnitte zerlegt. Die neuesten
+    Abschnitte werden behalten, solange sie ins Budget passen; der neueste
+    Abschnitt bleibt immer erhalten (wird nie gekuerzt). Neueste zuerst oder
+    zuletzt wird an den Runden-Nummern in den Ueberschriften erkannt
+    (Standard: Agents haengen an, der neueste Abschnitt steht am Ende).
+
+    Returns: (behalten, archiviert, neueste_zuerst)
+    """
+    def over_budget(size, lines):
+        return (max_bytes and size > max_bytes) or (max_lines and lines > max_lines)
+
+    if not (max_bytes or max_lines) or not over_budget(len(content.encode("utf-8")),
+                                                        content.count("\n")):
+        return content, "", False
+    starts = [m.start() for m in _HANDOFF_SECTION_RE.finditer(content)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    sections = [content[a:b] for a, b in zip(starts, starts[1:] + [len(content)])]
+    if len(sections) < 2:
+        return content, "", False
+
+    rounds = []
+    for section in sections:
+        match = _HANDOFF_ROUND_RE.search(section.split("\n", 1)[0])
+        if match:
+            rounds.append(int(match.group(1)))
+    newest_first = len(rounds) >= 2 and rounds[0] > rounds[-1]
+    newest = sections if newest_first else sections[::-1]
+
+    kept, size, lines = 0, 0, 0
+    for section in newest:
+        size += len(section.encode("utf-8"))
+        lines += section.count("\n")
+        if kept and over_budget(size, lines):
+            break
+        kept += 1
+    if kept == len(sections):
+        return content, "", newest_first
+    if newest_first:
+        return "".join(sections[:kept]), "".join(sections[kept:]), True
+    return "".join(sections[-kept:]), "".join(sections[:-kept]), False
+
+
+def add_usage(totals, result):
+    """Addiert Verbrauch eines Runner-Ergebnisses (usage, cost_usd, num_turns) auf ``totals``."""
+    for key in USAGE_COUNTERS:
+        totals.setdefault(key, 0)
+    totals["calls"] += 1
+    for key, value in (result.get("usage") or {}).items():
+        if key in totals:
+            totals[key] += value or 0
+    totals["num_turns"] += result.get("num_turns") or 0
+    totals["cost_usd"] = round(totals["cost_usd"] + (result.get("cost_usd") or 0.0), 6)
+    return totals
+
+
+def cache_hit_rate(totals):
+    """Anteil der Eingabe-Token aus dem Prompt-Cache (0..1)."""
+    read = totals.get("cache_read_input_tokens", 0)
+    prompt = totals.get("input_tokens", 0) + read + totals.get("cache_creation_input_tokens", 0)
+    return read / prompt if prompt else 0.0
+
+
+def _parse_field(field, text):
+    text = text.strip()
+    if field == "round":
+        return int(text or 0)
+    if field == "start_time":
+        return text or None
+    return text
+
+
 class ChainState:
-    """State-Manager fuer eine laufende Kette."""
+    """State-Manager fuer eine laufende Kette.
 
-    def __init__(self, chain_name, base_dir=None):
+    Args:
+        chain_name: Name der Kette (Unterordner in state/)
+        base_dir: Basisverzeichnis (Standard: Paket-Verzeichnis)
+        mirror_legacy: Einzeldateien status.txt etc. zusaetzlich pflegen
+    """
+
+    def __init__(self, chain_name, base_dir=None, mirror_legacy=True):
         self.chain_name = chain_name
         if base_dir is None:
             base_dir = Path(__file__).parent.parent
         self.state_dir = base_dir / "state" / chain_name
         self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.mirror_legacy = mirror_legacy
+        self._record = {"status": "UNKNOWN", "round": 0, "start_time": None}
+        self._record_mtime = None   # mtime von state.json beim letzten Laden/Schreiben
+        self._legacy_seen = {}      # Feld -> zuletzt gesehene mtime der Einzeldatei
+        self._legacy_mirrored = {}  # Feld -> (geschriebener Text, mtime) des Spiegels
+        self._handoff_cache = None  # (mtime_ns, size, inhalt)
+        self._batch_depth = 0
+        self._dirty = False
+        self._load()
+
+    @property
+    def state_file(self):
+        return self.state_dir / "state.json"
 
     @property
     def status_file(self):
@@ -38,48 +257,228 @@ class ChainState:
     def stop_file(self):
         return self.state_dir / "STOP"
 
+    # --- Laden / Persistieren ---
+
+    def _load(self):
+        """Laedt state.json; ohne state.json werden die Einzeldateien migriert."""
+        mtime = _mtime_ns(self.state_file)
+        if mtime is not None:
+            try:
+                self._record.update(json.loads(self.state_file.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                pass  # Defekter Record: Einzeldateien bleiben Quelle
+            self._record_mtime = mtime
+        self._legacy_seen = {}
+        self._sync_legacy(force=mtime is None)
+
+    def _sync_legacy(self, force=False):
+        """Uebernimmt extern geaenderte Einzeldateien (z.B. status.txt vom Agent)."""
+        if not (self.mirror_legacy or force):
+            return
+        for field, filename in _LEGACY_FILES.items():
+            path = self.state_dir / filename
+            mtime = _mtime_ns(path)
+            if mtime is None or mtime == self._legacy_seen.get(field):
+                continue
+            self._legacy_seen[field] = mtime
+            if force or self._record_mtime is None or mtime >= self._record_mtime:
+                try:
+                    self._record[field] = _parse_field(field, path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    pass
+
+    def refresh(self):
+        """Erkennt externe Aenderungen (state.json anderer Prozesse, Einzeldateien)."""
+        if self._dirty:
+            return
+        mtime = _mtime_ns(self.state_file)
+        if mtime is not None and mtime != self._record_mtime:
+            self._load()
+        else:
+            self._sync_legacy()
+
+    @contextmanager
+    def batch(self):
+        """Fasst mehrere Aenderungen zu einem Schreibvorgang zusammen (Write-Behind)."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self.flush()
+
+    def _persist(self):
+        self._dirty = True
+        if self._batch_depth == 0:
+            self.flush()
+
+    def flush(self):
+        """Schreibt den State-Record atomar (und optional die Einzeldateien)."""
+        atomic_write_text(self.state_file, json.dumps(self._record, ensure_ascii=False, indent=1))
+        self._record_mtime = _mtime_ns(self.state_file)
+        if self.mirror_legacy:
+            for field, filename in _LEGACY_FILES.items():
+                path = self.state_dir / filename
+                value = self._record.get(field)
+                text = None if value is None else str(value)
+                # Nur geaenderte Felder spiegeln (unveraendert + nicht extern angefasst)
+                mirrored = self._legacy_mirrored.get(field)
+                if mirrored == (text, _mtime_ns(path)) and self._legacy_seen.get(field) == mirrored[1]:
+                    continue
+                if text is None:
+                    path.unlink(missing_ok=True)
+                else:
+                    atomic_write_text(path, text)
+                self._legacy_seen[field] = _mtime_ns(path)
+                self._legacy_mirrored[field] = (text, self._legacy_seen[field])
+        self._dirty = False
+
     # --- Status ---
 
     def get_status(self):
-        if self.status_file.exists():
-            return self.status_file.read_text(encoding="utf-8").strip()
-        return "UNKNOWN"
+        self.refresh()
+        return self._record.get("status") or "UNKNOWN"
 
     def set_status(self, status):
-        self.status_file.write_text(status, encoding="utf-8")
+        previous = self.get_status()
+        self._record["status"] = status
+        self._persist()
+        if status != previous:
+            for callback in list(_STATUS_LISTENERS):
+                try:
+                    callback(self.chain_name, previous, status)
+                except Exception:
+                    pass  # Listener-Fehler duerfen den Ketten-Lauf nicht stoeren
 
     # --- Runden ---
 
     def get_round(self):
-        if self.round_file.exists():
-            return int(self.round_file.read_text(encoding="utf-8").strip())
-        return 0
+        self.refresh()
+        return int(self._record.get("round") or 0)
 
     def increment_round(self):
         current = self.get_round() + 1
-        self.round_file.write_text(str(current), encoding="utf-8")
+        self._record["round"] = current
+        # Checkpoint gehoert zur abgeschlossenen Runde
+        self._record.pop("cursor", None)
+        self._persist()
         return current
 
+    # --- Checkpoint (Fortschritt innerhalb der laufenden Runde) ---
+
+    def get_cursor(self):
+        """Checkpoint der laufenden Runde: {"round": n, "links": {index: {...}}} oder None.
+
+        ``round`` ist die Zahl der abgeschlossenen Runden beim Schreiben; ein
+        Checkpoint einer anderen Runde gilt als veraltet.
+        """
+        self.refresh()
+        cursor = self._record.get("cursor")
+        if not cursor or cursor.get("round") != self.get_round():
+            return None
+        return cursor
+
+    def _cursor_link(self, index):
+        cursor = self.get_cursor()
+        if cursor is None:
+            cursor = self._record["cursor"] = {"round": self.get_round(), "links": {}}
+        return cursor["links"].setdefault(str(index), {})
+
+    def link_started(self, index, name):
+        """Vermerkt den Start eines Glieds (Status "running")."""
+        entry = self._cursor_link(index)
+        entry.clear()
+        entry.update(name=name, status="running", started=datetime.now().isoformat())
+        self._persist()
+
+    def link_finished(self, index, status):
+        """Vermerkt das Ende eines Glieds (done, failed, skipped, aborted)."""
+        entry = self._cursor_link(index)
+        entry.update(status=status, finished=datetime.now().isoformat())
+        self._persist()
+
+    def finished_links(self):
+        """Indizes der Glieder, die in der laufenden Runde schon beendet wurden.
+
+        "running" (Prozess abgestuerzt) und "aborted" (Hard-Stop) zaehlen
+        nicht als beendet und laufen beim Fortsetzen erneut.
+        """
+        cursor = self.get_cursor()
+        if cursor is None:
+            return set()
+        return {int(index) for index, entry in cursor["links"].items()
+                if entry.get("status") in LINK_FINISHED_STATUSES}
+
+    def clear_cursor(self):
+        if self._record.pop("cursor", None) is not None:
+            self._persist()
+
+    # --- Verbrauch (Token, Kosten) ---
+
+    def record_usage(self, link_name, result):
+        """Summiert den Verbrauch eines Aufrufs je Kette, Link und Runde.
+
+        Nur Ergebnisse strukturierter CLI-Ausgabe (``usage``/``cost_usd``)
+        zaehlen; gehalten werden die letzten ``USAGE_ROUNDS_KEPT`` Runden.
+        """
+        if "usage" not in result and "cost_usd" not in result:
+            return
+        self.refresh()
+        usage = self._record.setdefault("usage", {})
+        add_usage(usage.setdefault("total", {}), result)
+        add_usage(usage.setdefault("links", {}).setdefault(link_name, {}), result)
+        rounds = usage.setdefault("rounds", {})
+        add_usage(rounds.setdefault(str(self.get_round() + 1), {}), result)
+        for old in sorted(rounds, key=int)[:-USAGE_ROUNDS_KEPT]:
+            del rounds[old]
+        self._persist()
+
+    def get_usage(self):
+        """Verbrauch: {"total": {...}, "links": {name: {...}}, "rounds": {n: {...}}} oder {}."""
+        self.refresh()
+        return self._record.get("usage") or {}
+
     # --- Laufzeit ---
 
-    def record_start(self):
-        self.start_time_file.write_text(datetime.now().isoformat(), encoding="utf-8")
+    def record_start(self, resume=False):
+        """Setzt die Startzeit; mit ``resume`` bleibt eine vorhandene Startzeit erhalten."""
+        if resume and self.get_start_time():
+            return
+        self._record["start_time"] = datetime.now().isoformat()
+        self._persist()
+
+    def get_start_time(self):
+        """Startzeit als ISO-String oder None."""
+        self.refresh()
+        return self._record.get("start_time")
 
     def get_runtime_hours(self):
-        if not self.start_time_file.exists():
+        start = self.get_start_time()
+        if not start:
             return 0.0
-        start = datetime.fromisoformat(self.start_time_file.read_text(encoding="utf-8").strip())
-        return (datetime.now() - start).total_seconds() / 3600
+        return (datetime.now() - datetime.fromisoformat(start)).total_seconds() / 3600
 
     # --- Handoff ---
 
     def get_handoff(self):
-        if self.handoff_file.exists():
-            return self.handoff_file.read_text(encoding="utf-8")
-        return ""
+        """Liest handoff.md; erneutes Lesen nur wenn mtime/Groesse sich aendern."""
+        try:
+            st = self.handoff_file.stat()
+        except FileNotFoundError:
+            self._handoff_cache = None
+            return ""
+        cache = self._handoff_cache
+        if cache and cache[0] == st.st_mtime_ns and cache[1] == st.st_size:
+            return cache[2]
+        content = self.handoff_file.read_text(encoding="utf-8")
+        self._handoff_cache = (st.st_mtime_ns, st.st_size, content)
+        return content
 
     def write_handoff(self, content):
-        self.handoff_file.write_text(content, encoding="utf-8")
+        atomic_write_text(self.handoff_file, content)
+        st = self.handoff_file.stat()
+        self._handoff_cache = (st.st_mtime_ns, st.st_size, content)
 
     def get_link_handoff_file(self, link_name):
         """Gibt den Pfad zur per-Link Handoff-Datei zurueck."""
@@ -94,7 +493,7 @@ class ChainState:
         """
         current = self.get_handoff()
         link_file = self.get_link_handoff_file(link_name)
-        link_file.write_text(current, encoding="utf-8")
+        atomic_write_text(link_file, current)
         return current
 
     def protect_handoff_from_skip(self, link_name, handoff_before):
@@ -116,7 +515,7 @@ class ChainState:
         if is_skip and handoff_before.strip():
             # Per-Link Datei bekommt den Skip-Inhalt
             link_file = self.get_link_handoff_file(link_name)
-            link_file.write_text(current, encoding="utf-8")
+            atomic_write_text(link_file, current)
             # Haupt-Handoff wiederherstellen
             self.write_handoff(handoff_before)
             return True
@@ -124,17 +523,78 @@ class ChainState:
         self.save_link_handoff(link_name)
         return False
 
+    @property
+    def handoff_archive_dir(self):
+        return self.state_dir / "handoff_archive"
+
+    def compact_handoff(self, max_bytes=0, max_lines=0, summarize=None):
+        """Haelt handoff.md im Budget: aeltere Runden wandern ins Archiv.
+
+        Der abgeschnittene Teil wird unter ``handoff_archive/`` gespeichert;
+        im Handoff bleibt ein Verweis darauf. ``summarize`` (optional) erhaelt
+        den archivierten Text und liefert eine kurze Zusammenfassung, die
+        zusammen mit dem Verweis im Handoff bleibt.
+
+        Returns: Pfad der Archiv-Datei oder None (nichts zu tun)
+        """
+        kept, archived, newest_first = split_handoff(self.get_handoff(), max_bytes, max_lines)
+        if not archived:
+            return None
+        self.handoff_archive_dir.mkdir(exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        archive_file = self.handoff_archive_dir / f"handoff_r{self.get_round():04d}_{stamp}.md"
+        atomic_write_text(archive_file, archived)
+
+        summary = ""
+        if summarize is not None:
+            try:
+                summary = (summarize(archived) or "").strip()
+            except Exception:
+                summary = ""
+        section = (
+            f"{HANDOFF_SUMMARY_TITLE}\n"
+            f"Archiv: state/{self.chain_name}/handoff_archive/{archive_file.name}\n"
+        )
+        if summary:
+            section += f"\n{summary}\n"
+        section += "\n"
+        # Zusammenfassung steht auf der Seite der aelteren Runden
+        if newest_first:
+            new_content = kept.rstrip("\n") + "\n\n" + section
+        else:
+            new_content = section + kept
+        self.write_handoff(new_content)
+        return archive_file
+
     # --- Shutdown ---
 
-    def request_stop(self, reason="Manuell gestoppt"):
-        self.stop_file.write_text(reason, encoding="utf-8")
+    def request_stop(self, reason="Manuell gestoppt", hard=False):
+        """Fordert das Stoppen der Kette an.
+
+        Soft-Stop (Standard): Kette stoppt nach dem aktuellen Glied.
+        Hard-Stop: Zusaetzlich wird das laufende Glied abgebrochen.
+        """
+        content = f"{HARD_STOP_MARKER} {reason}" if hard else reason
+        self.stop_file.write_text(content, encoding="utf-8")
 
     def is_stop_requested(self):
         return self.stop_file.exists()
 
+    def is_hard_stop_requested(self):
+        """True wenn ein Hard-Stop angefordert wurde (guenstig: nur stat ohne STOP-Datei)."""
+        if not self.stop_file.exists():
+            return False
+        try:
+            return self.stop_file.read_text(encoding="utf-8").startswith(HARD_STOP_MARKER)
+        except OSError:
+            return False
+
     def get_stop_reason(self):
         if self.stop_file.exists():
-            return self.stop_file.read_text(encoding="utf-8").strip()
+            reason = self.stop_file.read_text(encoding="utf-8").strip()
+            if reason.startswith(HARD_STOP_MARKER):
+                reason = reason[len(HARD_STOP_MARKER):].strip()
+            return reason
         return None
 
     # --- Shutdown-Checks ---
@@ -144,7 +604,9 @@ class ChainState:
         if self.is_stop_requested():
             return True, f"MANUAL_STOP: {self.get_stop_reason()}"
 
-        if self.get_status() == "ALL_DONE":
+        # Ein Refresh fuer alle folgenden Pruefungen (statt Dateizugriff pro Feld)
+        self.refresh()
+        if self._record.get("status") == "ALL_DONE":
             return True, "ALL_TASKS_DONE"
 
         deadline = config.get("deadline", "")
@@ -152,18 +614,21 @@ class ChainState:
             return True, f"DEADLINE_REACHED: {deadline}"
 
         runtime_hours = config.get("runtime_hours", 0)
-        if runtime_hours > 0 and self.get_runtime_hours() >= runtime_hours:
-            return True, f"RUNTIME_EXCEEDED: {self.get_runtime_hours():.1f}h / {runtime_hours}h"
+        if runtime_hours > 0:
+            hours = self.get_runtime_hours()
+            if hours >= runtime_hours:
+                return True, f"RUNTIME_EXCEEDED: {hours:.1f}h / {runtime_hours}h"
 
         max_rounds = config.get("max_rounds", 0)
-        if max_rounds > 0 and self.get_round() >= max_rounds:
-            return True, f"MAX_ROUNDS: {self.get_round()}/{max_rounds}"
+        current_round = int(self._record.get("round") or 0)
+        if max_rounds > 0 and current_round >= max_rounds:
+            return True, f"MAX_ROUNDS: {current_round}/{max_rounds}"
 
         max_blocks = config.get("max_consecutive_blocks", 5)
         handoff = self.get_handoff()
         if handoff:
             block_count = 0
-            for line in reversed(handoff.strip().split("\n")):
+            for line in _reversed_lines(handoff):
                 if "BLOCKED" in line.upper():
                     block_count += 1
                 elif line.strip():
@@ -176,11 +641,14 @@ class ChainState:
     # --- Reset ---
 
     def reset(self):
-        self.set_status("READY")
-        self.round_file.write_text("0", encoding="utf-8")
-        for f in [self.start_time_file, self.stop_file]:
-            if f.exists():
-                f.unlink()
+        with self.batch():
+            self.set_status("READY")
+            self._record["round"] = 0
+            self._record["start_time"] = None
+            self._record.pop("cursor", None)
+            self._record.pop("usage", None)
+            self._persist()
+        self.stop_file.unlink(missing_ok=True)
         self.write_handoff(
             f"# Handoff - Runde 0\n"
             f"## Datum: {datetime.now().strftime('%Y-%m-%d')}\n"
@@ -0,0 +1,294 @@
+"""
+llmauto.core.taskpool -- Aufgabenpools
+========================================
+Verteilt Aufgaben aus ``task_pools`` der Chain-Config an die Kettenglieder.
+Jeder Pool ist eine Warteschlange mit Claim/Lease/Complete und Prioritaeten;
+der Zustand liegt unter ``state/<chain>/pools/<pool>.json``. Zugriffe sind
+ueber eine Lock-Datei geschuetzt, damit mehrere Links (und Prozesse) aus
+einem Pool ziehen koennen, ohne eine Aufgabe doppelt zu vergeben.
+
+Pool-Typen:
+    file:       Aufgabenliste, eine Aufgabe pro Zeile ("- [ ] ..." / "- [x] ...")
+    directory:  Jede Datei (``pattern``) im Ordner ist eine Aufgabe
+    list:       Aufgaben direkt in der Config (``tasks``)
+"""
+import hashlib
+import json
+import re
+import time
+from collections import Counter
+from pathlib import Path
+
+from .state import atomic_write_text, file_lock
+
+
+SUPPORTED_POOL_TYPES = ("file", "directory", "list")
+DEFAULT_PRIORITY = 5
+DEFAULT_LEASE_SECONDS = 3600
+DEFAULT_MAX_ATTEMPTS = 3
+
+_CHECKBOX_RE = re.compile(r"^\s*[-*]\s*\[([ xX])\]\s*(.+?)\s*$")
+# "[P1]" in der Aufgabe: kleinere Zahl = hoehere Prioritaet
+_PRIORITY_RE = re.compile(r"\[P(\d+)\]", re.IGNORECASE)
+
+
+def task_id(text, occurrence=1):
+    """Stabile Kurz-ID einer Aufgabe aus ihrem Text.
+
+    Gleichlautende Aufgaben werden ueber ``occurrence`` (1 = erstes
+    Vorkommen) unterschieden; das erste Vorkommen behaelt die reine Text-ID.
+    """
+    key = text.strip() if occurrence == 1 else f"{text.strip()}\0{occurrence}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:10]
+
+
+def _numbered_ids(titles):
+    """IDs fuer eine Titelfolge; doppelte Titel bekommen eigene IDs."""
+    seen = Counter()
+    ids = []
+    for title in titles:
+        seen[title.strip()] += 1
+        ids.append(task_id(title, seen[title.strip()]))
+    return ids
+
+
+def _priority(text, default=DEFAULT_PRIORITY):
+    match = _PRIORITY_RE.search(text)
+    return int(match.group(1)) if match else default
+
+
+def parse_task_file(text):
+    """Liest Aufgaben aus einer Textdatei.
+
+    Enthaelt die Datei Checkbox-Zeilen ("- [ ] ..."), zaehlen nur diese
+    (``[x]`` = erledigt). Sonst ist jede nicht-leere Zeile ausser
+    Ueberschriften (#) eine offene Aufgabe.
+
+    Returns: Liste von (id, titel, prioritaet, erledigt)
+    """
+    lines = text.splitlines()
+    boxes = [m for m in (_CHECKBOX_RE.match(line) for line in lines) if m]
+    if boxes:
+        entries = [(m.group(2), m.group(1) != " ") for m in boxes]
+    else:
+        entries = [(line.strip(), False) for line in lines
+                   if line.strip() and not line.lstrip().startswith("#")]
+    ids = _numbered_ids(title for title, _ in entries)
+    return [(tid, title, _priority(title), done) for tid, (title, done) in zip(ids, entries)]
+
+
+class TaskPool:
+    """Ein Aufgabenpool einer Kette (Zustand unter state/<chain>/pools/)."""
+
+    def __init__(self, name, pool_config, state_dir, base_dir=None):
+        self.name = name
+        self.config = pool_config or {}
+        self.type = self.config.get("type", "file")
+        if self.type not in SUPPORTED_POOL_TYPES:
+            raise ValueError(f"Pool '{name}': Typ '{self.type}' wird nicht unterstuetzt "
+                             f"(moeglich: {', '.join(SUPPORTED_POOL_TYPES)})")
+        self.base_dir = Path(base_dir) if base_dir else Path.cwd()
+        self.max_attempts = self.config.get("max_attempts", DEFAULT_MAX_ATTEMPTS)
+        pools_dir = Path(state_dir) / "pools"
+        pools_dir.mkdir(parents=True, exist_ok=True)
+        self.path = pools_dir / f"{name}.json"
+        self.lock_path = pools_dir / f"{name}.lock"
+        self._tasks = {}  # id -> Aufgabe (dict)
+        self._source_mtime = None
+        self._file_mtime = None
+
+    @staticmethod
+    def resolve_path(raw, base_dir):
+        """Pool-Pfad; relative Pfade gelten ab dem llmauto-Verzeichnis."""
+        path = Path(raw)
+        return path if path.is_absolute() else Path(base_dir) / path
+
+    @property
+    def source_path(self):
+        return self.resolve_path(self.config.get("path", ""), self.base_dir)
+
+    # --- Persistenz ---
+
+    def _load(self):
+        """Laedt den Pool-Zustand neu, wenn ein anderer Prozess ihn geaendert hat."""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._file_mtime:
+            return
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        self._tasks = {task["id"]: task for task in data.get("tasks", [])}
+        self._source_mtime = data.get("source_mtime")
+        self._file_mtime = mtime
+
+    def _save(self):
+        data = {"pool": self.name, "source_mtime": self._source_mtime,
+                "tasks": list(self._tasks.values())}
+        atomic_write_text(self.path, json.dumps(data, ensure_ascii=False, indent=1))
+        self._file_mtime = self.path.stat().st_mtime_ns
+
+    # --- Quelle ---
+
+    def _source_entries(self):
+        """Liefert (id, titel, prioritaet, erledigt, quelle) oder None wenn unveraendert."""
+        if self.type == "list":
+            items = [item if isinstance(item, dict) else {"title": item}
+                     for item in self.config.get("tasks", [])]
+            ids = _numbered_ids(item.get("title", "") for item in items)
+            return [(item.get("id") or tid, item.get("title", ""),
+                     item.get("priority", _priority(item.get("title", ""))), False, "")
+                    for tid, item in zip(ids, items)]
+
+        source = self.source_path
+        try:
+            mtime = source.stat().st_mtime
+        except FileNotFoundError:
+            return []
+        if self.type == "file":
+            if mtime == self._source_mtime:
+                return None
+            self._source_mtime = mtime
+            text = source.read_text(encoding="utf-8")
+            return [(tid, title, prio, done, "") for tid, title, prio, done in parse_task_file(text)]
+
+        # directory: Ordner-mtime aendert sich beim Anlegen/Entfernen von Dateien
+        if mtime == self._source_mtime:
+            return None
+        self._source_mtime = mtime
+        entries = []
+        for task_file in sorted(source.glob(self.config.get("pattern", "*"))):
+            if not task_file.is_file():
+                continue
+            tid = task_file.name
+            if tid in self._tasks:
+                title = self._tasks[tid]["title"]
+            else:
+                first = next((line.strip().lstrip("# ") for line in
+                              task_file.read_text(encoding="utf-8", errors="replace").splitlines()
+                              if line.strip()), task_file.stem)
+                title = first or task_file.stem
+            entries.append((tid, title, _priority(title), False, str(task_file)))
+        return entries
+
+    def _sync(self):
+        """Uebernimmt neue/erledigte Aufgaben aus der Quelle.
+
+        Aufgaben, die nicht mehr in der Quelle stehen (Zeile/Datei entfernt
+        oder umformuliert), werden als erledigt ausgemustert; tauchen sie
+        wieder auf, sind sie erneut offen.
+        """
+        entries = self._source_entries()
+        if entries is None:
+            return False
+        changed = False
+        seen = set()
+        seq = max((t.get("seq", 0) for t in self._tasks.values()), default=0)
+        for tid, title, prio, done, source in entries:
+            seen.add(tid)
+            task = self._tasks.get(tid)
+            if task is None:
+                seq += 1
+                self._tasks[tid] = {
+                    "id": tid, "title": title, "priority": prio, "seq": seq,
+                    "status": "done" if done else "open", "source": source,
+                    "holder": None, "lease_until": None, "attempts": 0,
+                }
+                changed = True
+            elif done and task["status"] != "done":
+                task.update(status="done", holder=None, lease_until=None, retired=False)
+                changed = True
+            elif not done and task.get("retired"):
+                task.update(status="open", retired=False)
+                changed = True
+        for tid, task in self._tasks.items():
+            if tid not in seen and task["status"] in ("open", "claimed"):
+                task.update(status="done", holder=None, lease_until=None, retired=True)
+                changed = True
+        return changed
+
+    # --- Queue ---
+
+    def claim(self, holder, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Vergibt die dringendste offene Aufgabe an ``holder``.
+
+        Aufgaben mit abgelaufener Lease (Link abgestuerzt) gelten als offen.
+
+        Returns: Kopie der Aufgabe (dict) oder None wenn nichts offen ist
+        """
+        with file_lock(self.lock_path):
+            self._load()
+            self._sync()
+            now = time.time()
+            candidates = [
+                t for t in self._tasks.values()
+                if t["status"] == "open"
+                or (t["status"] == "claimed" and (t["lease_until"] or 0) < now)
+            ]
+            if not candidates:
+                self._save()
+                return None
+            task = min(candidates, key=lambda t: (t["priority"], t["seq"]))
+            task.update(status="claimed", holder=holder, lease_until=now + lease_seconds)
+            self._save()
+            return dict(task)
+
+    def complete(self, tid, success=True):
+        """Schliesst eine Aufgabe ab; bei Fehlschlag zurueck in die Queue.
+
+        Nach ``max_attempts`` Fehlschlaegen wird die Aufgabe als failed markiert.
+        """
+        with file_lock(self.lock_path):
+            self._load()
+            task = self._tasks.get(tid)
+            if task is None:
+                return None
+            if success:
+                task.update(status="done", retired=False)
+            else:
+                task["attempts"] += 1
+                task["status"] = "failed" if task["attempts"] >= self.max_attempts else "open"
+            task.update(holder=None, lease_until=None)
+            self._save()
+            return task["status"]
+
+    def release(self, tid):
+        """Gibt eine Aufgabe ohne Fehlversuch zurueck (z.B. nach Hard-Stop)."""
+        with file_lock(self.lock_path):
+            self._load()
+            task = self._tasks.get(tid)
+            if task is not None and task["status"] == "claimed":
+                task.update(status="open", holder=None, lease_until=None)
+                self._save()
+
+    @staticmethod
+    def _count(tasks):
+        result = {"open": 0, "claimed": 0, "done": 0, "failed": 0}
+        for task in tasks:
+            result[task["status"]] = result.get(task["status"], 0) + 1
+        return result
+
+    def counts(self):
+        """Anzahl Aufgaben je Status (open, claimed, done, failed)."""
+        with file_lock(self.lock_path):
+            self._load()
+            if self._sync():
+                self._save()
+        return self._count(self._tasks.values())
+
+    def read_counts(self):
+        """Wie ``counts``, aber nur lesend: ohne Lock, ohne Abgleich mit der Quelle.
+
+        Fuer Statusabfragen, die laufende Links nicht ausbremsen und keinen
+        Zustand schreiben duerfen (die Pool-Datei wird atomar ersetzt).
+        """
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            data = {}
+        return self._count(data.get("tasks", []))
+
+    def is_exhausted(self):
+        """True wenn keine Aufgabe mehr offen oder in Bearbeitung ist."""
+        counts = self.counts()
+        return counts["open"] == 0 and counts["claimed"] == 0
@@ -0,0 +1,232 @@
+"""
+llmauto.core.tracing -- Zeitleiste eines Ketten-Laufs
+=======================================================
+Spans um die Phasen eines Laufs (Runde, Link, Prompt, Modell-Slot, CLI-Start,
+Modellzeit, Wartezeiten, Handoff-I/O, Historie, Telegram) im Trace-Event-Format
+von Chrome/Perfetto. Pro Lauf entsteht ``state/<kette>/traces/<lauf>.jsonl``
+(ein Event pro Zeile, sofort geschrieben -- bricht der Lauf ab, bleibt alles
+bis dahin erhalten). ``llmauto chain trace <kette>`` erzeugt daraus eine
+JSON-Datei fuer https://ui.perfetto.dev oder chrome://tracing.
+
+Aktiv ist ein Tracer ueber eine ContextVar: ``span()`` kostet ohne Tracer
+nichts ausser dem Nachschlagen. Jeder Link bekommt eine eigene Spur (tid),
+parallele Links erscheinen so nebeneinander.
+"""
+import contextvars
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+
+TRACE_DIR_NAME = "traces"
+DEFAULT_KEEP_RUNS = 20
+# (Tracer, tid) des laufenden Kontexts
+_CURRENT = contextvars.ContextVar("llmauto_trace", default=None)
+
+
+class Tracer:
+    """Schreibt Trace-Events zeilenweise in eine Datei."""
+
+    def __init__(self, path, process_name):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Zeilengepuffert: ein Schreibvorgang pro Event, nichts bleibt im Puffer haengen
+        self._fh = open(self.path, "a", encoding="utf-8", buffering=1)
+        self._wall0 = time.time()
+        self._perf0 = time.perf_counter()
+        self._lanes = set()
+        self.pid = os.getpid()
+        self._emit({"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0,
+                    "args": {"name": process_name}})
+        self.lane_name(0, process_name)
+
+    def now(self):
+        """Zeitstempel in Mikrosekunden (Wanduhr-Anker, monotone Fortschreibung)."""
+        return (self._wall0 + time.perf_counter() - self._perf0) * 1e6
+
+    def _emit(self, event):
+        if self._fh is not None:
+            self._fh.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+
+    def lane_name(self, tid, name):
+        if tid not in self._lanes:
+            self._lanes.add(tid)
+            self._emit({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+                        "args": {"name": name}})
+
+    def complete(self, name, cat, start, end, tid=0, args=None):
+        event = {"name": name, "cat": cat, "ph": "X", "ts": round(start, 1),
+                 "dur": round(max(end - start, 0.0), 1), "pid": self.pid, "tid": tid}
+        if args:
+            event["args"] = args
+        self._emit(event)
+
+    def instant(self, name, cat="chain", tid=0, args=None):
+        event = {"name": name, "cat": cat, "ph": "i", "s": "t", "ts": round(self.now(), 1),
+                 "pid": self.pid, "tid": tid}
+        if args:
+            event["args"] = args
+        self._emit(event)
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+@contextmanager
+def span(name, cat="chain", **args):
+    """Misst den Block als Span. Liefert das args-dict (nachtraeglich ergaenzbar)."""
+    current = _CURRENT.get()
+    if current is None:
+        yield args
+        return
+    tracer, tid = current
+    start = tracer.now()
+    try:
+        yield args
+    finally:
+        tracer.complete(name, cat, start, tracer.now(), tid, args)
+
+
+def instant(name, cat="chain", **args):
+    """Einzelnes Ereignis ohne Dauer (z.B. Router-Wechsel, Shutdown)."""
+    current = _CURRENT.get()
+    if current is not None:
+        tracer, tid = current
+        tracer.instant(name, cat, tid, args)
+
+
+@contextmanager
+def activate(tracer):
+    """Setzt den Tracer fuer den Block (None = kein Tracing)."""
+    token = _CURRENT.set((tracer, 0) if tracer is not None else None)
+    try:
+        yield tracer
+    finally:
+        _CURRENT.reset(token)
+
+
+@contextmanager
+def lane(tid, name):
+    """Eigene Spur fuer den Block (z.B. ein Link; gilt nur im laufenden Task)."""
+    current = _CURRENT.get()
+    if current is None:
+        yield
+        return
+    tracer = current[0]
+    tracer.lane_name(tid, name)
+    token = _CURRENT.set((tracer, tid))
+    try:
+        yield
+    finally:
+        _CURRENT.reset(token)
+
+
+def trace_dir(state_dir):
+    return Path(state_dir) / TRACE_DIR_NAME
+
+
+def list_traces(state_dir):
+    """Trace-Dateien eines Ketten-State-Verzeichnisses, aelteste zuerst."""
+    directory = trace_dir(state_dir)
+    if not directory.is_dir():
+        return []
+    return sorted(directory.glob("*.jsonl"))
+
+
+def start_trace(chain_name, state_dir, keep=DEFAULT_KEEP_RUNS):
+    """Neuer Tracer fuer einen Lauf; aeltere Laeufe ueber ``keep`` hinaus werden geloescht."""
+    run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = trace_dir(state_dir) / f"{run_id}-{os.getpid()}.jsonl"
+    tracer = Tracer(path, f"llmauto {chain_name}")
+    if keep and keep > 0:
+        for old in list_traces(state_dir)[:-keep]:
+            old.unlink(missing_ok=True)
+    return tracer
+
+
+def load_events(path):
+    """Events einer Trace-Datei (defekte Zeilen, z.B. nach Absturz, werden ausgelassen)."""
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(event, dict):
+                events.append(event)
+    return events
+
+
+def summarize(events, top=5):
+    """Kennzahlen: Gesamtdauer, Modellzeit (CLI), Wartezeiten, langsamste Links."""
+    spans = [e for e in events if e.get("ph") == "X"]
+    if not spans:
+        return {"spans": 0, "wall_s": 0.0, "cli_s": 0.0, "wait_s": 0.0, "slowest_links": []}
+    start = min(e["ts"] for e in spans)
+    end = max(e["ts"] + e["dur"] for e in spans)
+
+    def total(cat):
+        return sum(e["dur"] for e in spans if e.get("cat") == cat) / 1e6
+
+    links = sorted((e for e in spans if e.get("cat") == "link"), key=lambda e: e["dur"], reverse=True)
+    return {
+        "spans": len(spans),
+        "wall_s": round((end - start) / 1e6, 3),
+        "cli_s": round(total("cli"), 3),
+        "wait_s": round(total("wait"), 3),
+        "slowest_links": [
+            {"name": e["name"], "round": (e.get("args") or {}).get("round"),
+             "duration_s": round(e["dur"] / 1e6, 3)}
+            for e in links[:top]
+        ],
+    }
+
+
+def export_trace(path, output):
+    """Schreibt eine Trace-Datei als Chrome-JSON (``{"traceEvents": [...]}``). Returns: Events"""
+    events = load_events(path)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+    return events
+
+
+def show_trace(chain_name, run=None, output=None, base_dir=None):
+    """CLI: ``llmauto chain trace <kette> [--run ID] [-o datei.json]``.
+
+    Ohne ``run`` wird der letzte Lauf exportiert; ``run`` ist ein Praefix der
+    Lauf-ID (Dateiname ohne Endung) oder ``list`` fuer eine Uebersicht.
+    """
+    base_dir = Path(base_dir) if base_dir else Path(__file__).parent.parent
+    traces = list_traces(base_dir / "state" / chain_name)
+    if not traces:
+        print(f"Keine Traces fuer '{chain_name}' vorhanden (tracing.enabled in config.json?).")
+        return 1
+    if run == "list":
+        for path in traces:
+            print(f"  {path.stem}  ({path.stat().st_size // 1024} KiB)")
+        return 0
+    if run:
+        matches = [path for path in traces if path.stem.startswith(run)]
+        if not matches:
+            print(f"Fehler: kein Lauf '{run}' fuer '{chain_name}' (verfuegbar: --run list).")
+            return 1
+        path = matches[-1]
+    else:
+        path = traces[-1]
+    output = Path(output) if output else Path(f"{chain_name}-{path.stem}.trace.json")
+    events = export_trace(path, output)
+    info = summarize(events)
+    print(f"Trace exportiert: {output} ({info['spans']} Spans)")
+    print(f"  Lauf:       {path.stem}")
+    print(f"  Dauer:      {info['wall_s']:.1f}s (CLI-Zeit {info['cli_s']:.1f}s, "
+          f"Wartezeiten {info['wait_s']:.1f}s, summiert ueber alle Links)")
+    for link in info["slowest_links"]:
+        print(f"  langsam:    {link['name']} (Runde {link['round']}): {link['duration_s']:.1f}s")
+    print("Ansehen: https://ui.perfetto.dev oder chrome://tracing (Datei laden)")
+    return 0
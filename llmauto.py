@@ -11,17 +11,26 @@ Verwendung:
     python llmauto.py chain list                 Alle Ketten anzeigen
     python llmauto.py chain status [name]        Status anzeigen
     python llmauto.py chain stop <name> [grund]  Kette stoppen
+    python llmauto.py chain stop <name> --hard   Laufendes Glied sofort abbrechen
     python llmauto.py chain log <name> [N]       Log anzeigen
+    python llmauto.py chain log <name> --follow  Log live verfolgen
     python llmauto.py chain reset <name>         State zuruecksetzen
+    python llmauto.py chain validate <name>      Kette pruefen (Prompts, Links)
     python llmauto.py chain create                Neue Kette interaktiv erstellen
 
+    python llmauto.py supervisor <name> <name>   Mehrere Ketten in einem Prozess
+
     python llmauto.py pipe "prompt"              Einzelner Claude-Aufruf
     python llmauto.py pipe -f prompt.txt         Prompt aus Datei
+    python llmauto.py pipe --cache "prompt"      Mit Ergebnis-Cache
+    python llmauto.py pipe --batch in.jsonl -j 8 Viele Prompts parallel
 
+    python llmauto.py stats [--chain X]          Latenz-/Fehlerstatistiken
     python llmauto.py status                     Globaler Status
     python llmauto.py version                    Version anzeigen
 """
 import argparse
+import os
 import sys
 from pathlib import Path
 
@@ -41,61 +50,62 @@ VERSION = "0.1.0"
 
 def cmd_chain(args):
     """Chain-Modus Subkommandos."""
-    from llmauto.modes.chain import (
-        run_chain, show_status, stop_chain, show_log, reset_chain
-    )
-    from llmauto.core.config import list_chains
-
     action = args.chain_action
 
+    # Schneller Pfad: status/list/log laden nur State, Config und Logs (haeufig gepollt)
+    if action in ("status", "list", "log"):
+        from llmauto.modes.status import show_status, show_chain_list, show_log
+        if action == "status":
+            return show_status(args.name, as_json=args.json, field=args.field)
+        if action == "list":
+            return show_chain_list(as_json=args.json)
+        if not args.name:
+            print("Fehler: Ketten-Name erforderlich.")
+            return 1
+        lines = int(args.extra[0]) if args.extra else 20
+        return show_log(args.name, lines, follow_log=args.follow, link=args.link)
+
+    if action == "trace":
+        if not args.name:
+            print("Fehler: Ketten-Name erforderlich.")
+            return 1
+        from llmauto.core.tracing import show_trace
+        return show_trace(args.name, run=args.run, output=args.output)
+
+    from llmauto.modes.chain import run_chain, stop_chain, reset_chain, validate_chain
+    from llmauto.core.config import list_chains
+
     if action == "start":
         if not args.name:
             print("Fehler: Ketten-Name erforderlich.")
             print("Verfuegbar:", ", ".join(list_chains()) or "(keine)")
             return 1
-        return run_chain(args.name, background=args.bg)
-
-    elif action == "list":
-        chains = list_chains()
-        if not chains:
-            print("Keine gespeicherten Ketten gefunden.")
-            print(f"Ketten-Verzeichnis: {PACKAGE_DIR / 'chains'}")
-            return 0
-        print("Gespeicherte Ketten:")
-        for name in sorted(chains):
-            try:
-                from llmauto.core.config import load_chain
-                config = load_chain(name)
-                desc = config.get("description", "")
-                links = len(config.get("links", []))
-                mode = config.get("mode", "loop")
-                print(f"  {name:25s}  {links} Glieder, {mode:8s}  {desc}")
-            except Exception:
-                print(f"  {name:25s}  (Fehler beim Laden)")
-        return 0
-
-    elif action == "status":
-        return show_status(args.name)
+        replay = None
+        if args.replay:
+            replay = {"mode": "replay", "archive": os.path.abspath(args.replay),
+                      "time_scale": args.replay_speed}
+        elif args.record is not None:
+            replay = {"mode": "record", "archive": os.path.abspath(args.record) if args.record else ""}
+        return run_chain(args.name, background=args.bg, resume=args.resume, replay=replay)
 
     elif action == "stop":
         if not args.name:
             print("Fehler: Ketten-Name erforderlich.")
             return 1
         reason = " ".join(args.extra) if args.extra else None
-        return stop_chain(args.name, reason)
+        return stop_chain(args.name, reason, hard=args.hard)
 
-    elif action == "log":
+    elif action == "reset":
         if not args.name:
             print("Fehler: Ketten-Name erforderlich.")
             return 1
-        lines = int(args.extra[0]) if args.extra else 20
-        return show_log(args.name, lines)
+        return reset_chain(args.name)
 
-    elif action == "reset":
+    elif action == "validate":
         if not args.name:
             print("Fehler: Ketten-Name erforderlich.")
             return 1
-        return reset_chain(args.name)
+        return validate_chain(args.name)
 
     elif action == "create":
         from llmauto.core.chain_creator import create_chain
@@ -112,6 +122,12 @@ def cmd_pipe(args):
     from llmauto.core.runner import ClaudeRunner
     from llmauto.core.config import load_global_config
 
+    if args.batch:
+        from llmauto.modes.batch import run_batch
+        return run_batch(args.batch, output_path=args.output, jobs=args.jobs, model=args.model,
+                         fallback_model=args.fallback, timeout=args.timeout,
+                         use_cache=args.cache, warm=args.warm, quiet=args.quiet)
+
     global_config = load_global_config()
 
     # Prompt ermitteln
@@ -135,18 +151,47 @@ def cmd_pipe(args):
         return 1
 
     model = args.model or global_config.get("default_model", "claude-sonnet-4-6")
+    governor = None
+    if global_config.get("model_limits"):
+        from llmauto.core.governor import ModelGovernor
+        governor = ModelGovernor(global_config["model_limits"])
     runner = ClaudeRunner(
         model=model,
         fallback_model=args.fallback,
         permission_mode=global_config.get("default_permission_mode", "dontAsk"),
         allowed_tools=global_config.get("default_allowed_tools"),
         timeout=args.timeout or global_config.get("default_timeout_seconds", 1800),
+        governor=governor,
+        claude_cmd=global_config.get("claude_cmd"),
+        output_format=global_config.get("output_format"),
     )
 
     if not args.quiet:
         print(f"[llmauto pipe] Modell: {model}", file=sys.stderr)
 
-    result = runner.run(prompt)
+    # Ergebnis-Cache (opt-in): --cache/--no-cache ueberstimmen "pipe_cache.enabled"
+    cache_config = dict(global_config.get("pipe_cache") or {})
+    enabled = cache_config.pop("enabled", False)
+    use_cache = enabled if args.cache is None else args.cache
+    cache = key = result = None
+    if use_cache:
+        from llmauto.core.cache import ResultCache, cache_key
+        cache = ResultCache(**cache_config)
+        key = cache_key(prompt, model, fallback_model=runner.fallback_model,
+                        permission_mode=runner.permission_mode,
+                        allowed_tools=runner.allowed_tools, cwd=os.getcwd(),
+                        output_format=runner.output_format)
+        result = cache.get(key)
+        if result is not None and not args.quiet:
+            print("[llmauto pipe] Cache-Treffer", file=sys.stderr)
+
+    if result is None:
+        result = runner.run(prompt)
+        if cache is not None:
+            cache.put(key, result)
+        if global_config.get("history_enabled", True):
+            from llmauto.core.history import record_result
+            record_result(result, link="pipe")
 
     if result["success"]:
         print(result["output"])
@@ -157,11 +202,43 @@ def cmd_pipe(args):
         return 1
 
 
+def cmd_supervisor(args):
+    """Supervisor: mehrere Ketten in einer Event-Loop."""
+    from llmauto.modes.supervisor import run_supervisor
+    return run_supervisor(args.names, max_concurrent=args.max_concurrent, with_deps=args.with_deps)
+
+
+def cmd_stats(args):
+    """Latenz- und Fehlerstatistiken aus der Lauf-Historie."""
+    from llmauto.core.history import show_stats
+    return show_stats(chain=args.chain, since_hours=args.since)
+
+
 def cmd_status(args):
     """Globaler Status ueber alle Modi."""
-    from llmauto.modes.chain import show_status
+    from llmauto.modes.status import show_status, chain_names, chain_status
+    from llmauto.core.config import load_global_config
+    model_limits = load_global_config().get("model_limits")
+    slots = {}
+    if model_limits:
+        from llmauto.core.governor import ModelGovernor
+        slots = ModelGovernor(model_limits).snapshot()
+    if args.json:
+        import json
+        print(json.dumps({
+            "version": VERSION,
+            "model_slots": slots,
+            "chains": [chain_status(name) for name in chain_names()],
+        }, ensure_ascii=False, indent=2))
+        return 0
     print(f"llmauto v{VERSION}")
     print()
+    if slots:
+        print("Modell-Slots:")
+        for model, usage in slots.items():
+            used = f"{usage['active']}/{usage['max']}" if usage["max"] else f"{usage['active']}"
+            print(f"  {model:<28} aktiv {used}, wartend {usage['waiting']}")
+        print()
     return show_status()
 
 
@@ -181,11 +258,31 @@ def main():
 
     # --- chain ---
     chain_parser = subparsers.add_parser("chain", help="Ketten-Modus (Marble-Run)")
-    chain_parser.add_argument("chain_action", choices=["start", "list", "status", "stop", "log", "reset", "create"],
+    chain_parser.add_argument("chain_action", choices=["start", "list", "status", "stop", "log", "trace", "reset", "validate", "create"],
                               help="Aktion")
     chain_parser.add_argument("name", nargs="?", default=None, help="Ketten-Name")
     chain_parser.add_argument("extra", nargs="*", help="Zusaetzliche Argumente (Grund bei stop, Zeilenanzahl bei log)")
     chain_parser.add_argument("--bg", action="store_true", help="Im Hintergrund starten")
+    chain_parser.add_argument("--resume", action="store_true",
+                              help="Bei start: am ersten nicht beendeten Glied der Runde fortsetzen")
+    chain_parser.add_argument("--record", nargs="?", const="", metavar="ARCHIV",
+                              help="Bei start: CLI-Aufrufe aufzeichnen (Standard: state/_replay/<kette>.jsonl)")
+    chain_parser.add_argument("--replay", metavar="ARCHIV",
+                              help="Bei start: CLI-Aufrufe aus Archiv abspielen statt claude aufzurufen")
+    chain_parser.add_argument("--replay-speed", type=float, default=0.0, metavar="FAKTOR",
+                              help="Bei --replay: aufgezeichnete Dauer x FAKTOR warten (Standard 0 = sofort)")
+    chain_parser.add_argument("--hard", action="store_true",
+                              help="Bei stop: laufendes Glied sofort abbrechen statt danach zu stoppen")
+    chain_parser.add_argument("--follow", action="store_true",
+                              help="Bei log: neue Zeilen laufend anzeigen (Strg+C beendet)")
+    chain_parser.add_argument("--link", help="Bei log: Ausgabe-Log dieses Links statt Ketten-Log")
+    chain_parser.add_argument("--json", action="store_true",
+                              help="Bei status/list: maschinenlesbare JSON-Ausgabe")
+    chain_parser.add_argument("--field", metavar="FELD",
+                              help="Bei status: nur den Wert dieses Feldes ausgeben (z.B. status)")
+    chain_parser.add_argument("--run", help="Bei trace: Lauf-ID (Praefix) oder 'list' (Standard: letzter Lauf)")
+    chain_parser.add_argument("--output", "-o",
+                              help="Bei trace: Ziel-Datei (Standard: <kette>-<lauf>.trace.json)")
     chain_parser.set_defaults(func=cmd_chain)
 
     # --- pipe ---
@@ -196,10 +293,38 @@ def main():
     pipe_parser.add_argument("--fallback", help="Fallback-Modell")
     pipe_parser.add_argument("--timeout", type=int, help="Timeout in Sekunden")
     pipe_parser.add_argument("--quiet", "-q", action="store_true", help="Keine Status-Meldungen")
+    pipe_parser.add_argument("--cache", dest="cache", action="store_true", default=None,
+                             help="Ergebnis-Cache verwenden (gleicher Prompt/Modell/Tools/CWD)")
+    pipe_parser.add_argument("--no-cache", dest="cache", action="store_false",
+                             help="Ergebnis-Cache nicht verwenden")
+    pipe_parser.add_argument("--batch", metavar="JSONL", help="Viele Prompts aus einer JSONL-Datei")
+    pipe_parser.add_argument("--jobs", "-j", type=int, default=4,
+                             help="Bei --batch: gleichzeitige Aufrufe (default: 4)")
+    pipe_parser.add_argument("--output", "-o", help="Bei --batch: Ausgabe-JSONL (default: <eingabe>.results.jsonl)")
+    pipe_parser.add_argument("--warm", dest="warm", action="store_true", default=None,
+                             help="Bei --batch: Prompts ueber warme CLI-Sitzungen ausfuehren")
+    pipe_parser.add_argument("--no-warm", dest="warm", action="store_false",
+                             help="Bei --batch: keine warmen Sitzungen")
     pipe_parser.set_defaults(func=cmd_pipe)
 
+    # --- supervisor ---
+    supervisor_parser = subparsers.add_parser("supervisor", help="Mehrere Ketten in einem Prozess ausfuehren")
+    supervisor_parser.add_argument("names", nargs="+", help="Ketten-Namen")
+    supervisor_parser.add_argument("--max-concurrent", "-j", type=int, default=None,
+                                   help="Max. gleichzeitige Claude-Aufrufe ueber alle Ketten (0 = unbegrenzt)")
+    supervisor_parser.add_argument("--with-deps", action="store_true",
+                                   help="Vorgaenger-Ketten (after) automatisch mitstarten")
+    supervisor_parser.set_defaults(func=cmd_supervisor)
+
+    # --- stats ---
+    stats_parser = subparsers.add_parser("stats", help="Latenz- und Fehlerstatistiken")
+    stats_parser.add_argument("--chain", "-c", help="Nur diese Kette")
+    stats_parser.add_argument("--since", type=float, help="Nur die letzten N Stunden")
+    stats_parser.set_defaults(func=cmd_stats)
+
     # --- status ---
     status_parser = subparsers.add_parser("status", help="Globaler Status")
+    status_parser.add_argument("--json", action="store_true", help="Maschinenlesbare JSON-Ausgabe")
     status_parser.set_defaults(func=cmd_status)
 
     # --- version ---
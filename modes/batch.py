@@ -0,0 +1,306 @@
+"""
+llmauto.modes.batch -- Viele Prompts aus einer JSONL-Datei
+============================================================
+``llmauto pipe --batch eingabe.jsonl --jobs N`` liest Prompts zeilenweise
+(ohne die ganze Datei zu laden), fuehrt sie mit N gleichzeitigen
+ClaudeRunner-Aufrufen aus und schreibt jedes Ergebnis sofort als Zeile in die
+Ausgabe-JSONL (Reihenfolge der Fertigstellung).
+
+Eingabezeile: ``{"id": "a1", "prompt": "...", "model": "...",
+"fallback_model": "...", "timeout": 600}`` -- nur ``prompt`` ist Pflicht;
+ohne ``id`` gilt ``line-<Zeilennummer>``. Eine reine JSON-Zeichenkette ist
+ebenfalls ein Prompt.
+
+Fortsetzen: IDs, die in der Ausgabe bereits erfolgreich stehen, werden
+uebersprungen. Fehlgeschlagene Eintraege laufen erneut (die letzte Zeile je
+ID zaehlt).
+
+Mit ``--warm`` laufen die Prompts ueber warme CLI-Sitzungen
+(core.session_pool) statt je eines neuen Prozesses.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from ..core.backoff import make_policy
+from ..core.config import load_global_config
+from ..core.runner import OUTPUT_FORMATS, ClaudeRunner
+
+
+DEFAULT_JOBS = 4
+
+
+def default_output_path(input_path):
+    """``eingabe.jsonl`` -> ``eingabe.results.jsonl``"""
+    path = Path(input_path)
+    return path.with_name(f"{path.stem}.results.jsonl")
+
+
+def load_done(output_path):
+    """IDs, die in einer vorhandenen Ausgabe zuletzt erfolgreich waren."""
+    status = {}
+    try:
+        with open(output_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # z.B. abgeschnittene letzte Zeile nach Abbruch
+                if isinstance(record, dict) and "id" in record:
+                    status[str(record["id"])] = bool(record.get("success"))
+    except FileNotFoundError:
+        pass
+    return {item_id for item_id, ok in status.items() if ok}
+
+
+def item_error(item):
+    """Prueft die optionalen Felder eines Eintrags. Returns: Fehlertext oder None"""
+    for key in ("model", "fallback_model"):
+        if item.get(key) is not None and not isinstance(item[key], str):
+            return f"'{key}' muss ein String sein"
+    timeout = item.get("timeout")
+    if timeout is not None and (isinstance(timeout, bool)
+                                or not isinstance(timeout, (int, float)) or timeout <= 0):
+        return "'timeout' muss eine positive Zahl sein"
+    return None
+
+
+def read_items(input_path, done=(), counts=None):
+    """Liest Eintraege zeilenweise (Generator); erledigte IDs werden uebersprungen.
+
+    Ungueltige Zeilen ergeben einen Eintrag mit ``error``. Ist ``counts``
+    angegeben, wird dort ``skipped`` je uebersprungenem Eintrag erhoeht.
+    """
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                yield {"id": f"line-{line_no}", "error": f"Ungueltiges JSON: {e}"}
+                continue
+            if isinstance(item, str):
+                item = {"prompt": item}
+            if not isinstance(item, dict):
+                yield {"id": f"line-{line_no}", "error": "Eintrag muss ein Objekt oder String sein"}
+                continue
+            item_id = str(item.get("id", f"line-{line_no}"))
+            if item_id in done:
+                if counts is not None:
+                    counts["skipped"] += 1
+                continue
+            if not str(item.get("prompt") or "").strip():
+                yield {"id": item_id, "error": "Leerer Prompt"}
+                continue
+            error = item_error(item)
+            if error is not None:
+                yield {"id": item_id, "error": error}
+                continue
+            yield dict(item, id=item_id)
+
+
+class BatchRunner:
+    """Fuehrt Batch-Eintraege aus (Runner-Defaults, Cache, Backoff, Historie)."""
+
+    def __init__(self, global_config, model=None, fallback_model=None, timeout=None,
+                 cache=None, governor=None, session_pool=None):
+        self.global_config = global_config
+        self.model = model or global_config.get("default_model", "claude-sonnet-4-6")
+        self.fallback_model = fallback_model
+        self.timeout = timeout or global_config.get("default_timeout_seconds", 1800)
+        self.cache = cache
+        self.governor = governor
+        self.session_pool = session_pool
+        self.backoff = make_policy(global_config.get("backoff"))
+
+    def _runner(self, item):
+        return ClaudeRunner(
+            model=item.get("model") or self.model,
+            fallback_model=item.get("fallback_model", self.fallback_model),
+            permission_mode=self.global_config.get("default_permission_mode", "dontAsk"),
+            allowed_tools=self.global_config.get("default_allowed_tools"),
+            timeout=item.get("timeout") or self.timeout,
+            governor=self.governor,
+            session_pool=self.session_pool,
+            claude_cmd=self.global_config.get("claude_cmd"),
+            output_format=self.global_config.get("output_format"),
+        )
+
+    async def run_item(self, item):
+        """Fuehrt einen Eintrag aus. Returns: Ausgabe-Record (dict)"""
+        if "error" in item:
+            return {"id": item["id"], "success": False, "error": item["error"]}
+        runner = self._runner(item)
+        prompt = item["prompt"]
+        key = None
+        if self.cache is not None:
+            from ..core.cache import cache_key
+            key = cache_key(prompt, runner.model, fallback_model=runner.fallback_model,
+                            permission_mode=runner.permission_mode,
+                            allowed_tools=runner.allowed_tools, cwd=runner.cwd or os.getcwd(),
+                            output_format=runner.output_format)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return self._record(item, cached, attempts=0, cached=True)
+
+        attempt = 0
+        while True:
+            wait = self.backoff.cooldown_remaining(runner.model)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            result = await runner.run_async(prompt)
+            decision = self.backoff.record(result, runner.model)
+            if self.global_config.get("history_enabled", True):
+                from ..core.history import record_result
+                await asyncio.to_thread(record_result, result, link="batch")
+            if not decision.retry or attempt >= self.backoff.max_retries:
+                break
+            attempt += 1
+            await asyncio.sleep(decision.delay)
+
+        if self.cache is not None:
+            self.cache.put(key, result)
+        return self._record(item, result, attempts=attempt + 1, cached=False)
+
+    async def close(self):
+        """Beendet warme Sitzungen am Ende des Batches."""
+        if self.session_pool is not None:
+            await self.session_pool.close()
+
+    @staticmethod
+    def _record(item, result, attempts, cached):
+        record = {
+            "id": item["id"],
+            "success": result["success"],
+            "returncode": result["returncode"],
+            "model": result.get("model"),
+            "duration_s": round(result.get("duration_s") or 0.0, 3),
+            "attempts": attempts,
+            "cached": cached,
+            "output": result.get("output", ""),
+            "stderr": result.get("stderr", ""),
+        }
+        # Verbrauch bei strukturierter CLI-Ausgabe (output_format json)
+        for key in ("usage", "cost_usd", "num_turns"):
+            if key in result:
+                record[key] = result[key]
+        return record
+
+
+async def run_batch_async(input_path, output_path, batch_runner, jobs=DEFAULT_JOBS, quiet=False):
+    """Arbeitet die Eingabe mit ``jobs`` Workern ab.
+
+    Returns: dict mit Zaehlern ok/failed/skipped
+    """
+    done = load_done(output_path)
+    counts = {"ok": 0, "failed": 0, "skipped": 0}
+    jobs = max(1, jobs)
+    # Begrenzte Queue: die Eingabe wird nur so weit gelesen, wie Worker frei werden
+    queue = asyncio.Queue(maxsize=jobs * 2)
+    start = time.monotonic()
+
+    async def produce():
+        for item in read_items(input_path, done, counts):
+            await queue.put(item)
+        for _ in range(jobs):
+            await queue.put(None)
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        async def work():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                try:
+                    record = await batch_runner.run_item(item)
+                except Exception as e:
+                    # Ein defekter Eintrag darf den restlichen Batch nicht abbrechen
+                    record = {"id": item["id"], "success": False,
+                              "error": f"{type(e).__name__}: {e}"}
+                # Sofort schreiben: bei Abbruch bleibt jedes fertige Ergebnis erhalten
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                counts["ok" if record["success"] else "failed"] += 1
+                if not quiet:
+                    reason = record.get("error") or f"rc={record.get('returncode')}"
+                    status = "OK" if record["success"] else f"FEHLER ({reason})"
+                    cached = " [Cache]" if record.get("cached") else ""
+                    print(f"[{counts['ok'] + counts['failed']}] {record['id']}: {status}{cached} "
+                          f"({time.monotonic() - start:.0f}s)", file=sys.stderr)
+
+        producer = asyncio.ensure_future(produce())
+        workers = [asyncio.ensure_future(work()) for _ in range(jobs)]
+        try:
+            await asyncio.gather(producer, *workers)
+        finally:
+            for task in [producer] + workers:
+                task.cancel()
+            await batch_runner.close()
+    return counts
+
+
+def run_batch(input_path, output_path=None, jobs=DEFAULT_JOBS, model=None,
+              fallback_model=None, timeout=None, use_cache=None, warm=None, quiet=False):
+    """CLI-Einstieg fuer ``llmauto pipe --batch``."""
+    input_path = Path(input_path)
+    if not input_path.exists():
+        print(f"Fehler: Datei nicht gefunden: {input_path}")
+        return 1
+    output_path = Path(output_path) if output_path else default_output_path(input_path)
+
+    global_config = load_global_config()
+    cache_config = dict(global_config.get("pipe_cache") or {})
+    enabled = cache_config.pop("enabled", False)
+    cache = None
+    if enabled if use_cache is None else use_cache:
+        from ..core.cache import ResultCache
+        cache = ResultCache(**cache_config)
+    governor = None
+    if global_config.get("model_limits"):
+        from ..core.governor import ModelGovernor
+        governor = ModelGovernor(global_config["model_limits"])
+    # Warme Sitzungen (--warm/--no-warm ueberstimmen "session_pool.enabled")
+    pool_config = dict(global_config.get("session_pool") or {})
+    enabled = pool_config.pop("enabled", False)
+    session_pool = None
+    if enabled if warm is None else warm:
+        from ..core.session_pool import SessionPool
+        pool_config["size"] = pool_config.get("size") or jobs
+        session_pool = SessionPool(**pool_config)
+    if cache is not None and session_pool is not None:
+        # Warme Sitzungen behalten den Verlauf: Antworten haengen von frueheren
+        # Prompts ab und duerfen nicht als Ergebnis des einzelnen Prompts gecacht werden
+        print("Fehler: --warm und der Ergebnis-Cache schliessen sich aus "
+              "(--no-cache oder --no-warm angeben).")
+        return 1
+    try:
+        batch_runner = BatchRunner(global_config, model=model, fallback_model=fallback_model,
+                                   timeout=timeout, cache=cache, governor=governor,
+                                   session_pool=session_pool)
+    except (ValueError, TypeError) as e:
+        print(f"Fehler: backoff-Konfiguration ungueltig: {e}")
+        return 1
+    # Sonst scheitert erst jeder einzelne Eintrag beim Erstellen seines Runners
+    if (global_config.get("output_format") or "text") not in OUTPUT_FORMATS:
+        print(f"Fehler: output_format '{global_config['output_format']}' ungueltig "
+              f"(erlaubt: {', '.join(OUTPUT_FORMATS)})")
+        return 1
+
+    if not quiet:
+        warm_info = f", {session_pool.size} warme Sitzungen" if session_pool else ""
+        print(f"[llmauto pipe] Batch: {input_path} -> {output_path} ({jobs} parallel{warm_info})",
+              file=sys.stderr)
+    try:
+        counts = asyncio.run(run_batch_async(input_path, output_path, batch_runner,
+                                             jobs=jobs, quiet=quiet))
+    except KeyboardInterrupt:
+        print("Batch abgebrochen (Ctrl+C). Erneuter Aufruf setzt fort.", file=sys.stderr)
+        return 130
+    print(f"[llmauto pipe] Batch fertig: {counts['ok']} OK, {counts['failed']} Fehler, "
+          f"{counts['skipped']} bereits erledigt -> {output_path}", file=sys.stderr)
+    return 0 if counts["failed"] == 0 else 1
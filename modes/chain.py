@@ -2,78 +2,70 @@
 llmauto.modes.chain -- Ketten-Modus (Marble-Run)
 ==================================================
 Sequentielle Agent-Ketten: Link1 -> Link2 -> ... -> LinkN -> (loop)
+Links mit gleicher parallel_group laufen gleichzeitig (Fan-out/Fan-in).
 Portiert aus BACH_Dev/marble_run/marble.py, nutzt core-Module.
 """
 import os
 import sys
-import time
+import asyncio
+import threading
 import subprocess
 from pathlib import Path
 from datetime import datetime
 
-from ..core.runner import ClaudeRunner
-from ..core.config import load_chain, list_chains, load_global_config, _ACTUAL_HOME
-from ..core.state import ChainState
+from ..core.runner import OUTPUT_FORMATS, ClaudeRunner
+from ..core.config import load_chain, list_chains, load_global_config
+from ..core.prompts import PromptRegistry, UNTIL_FULL_SUFFIX, extract_verdict  # noqa: F401
+from ..core.state import ChainState, add_status_listener, remove_status_listener
+from ..core.history import record_result
+from ..core.logfiles import rotate_if_needed
+from ..core.taskpool import TaskPool, SUPPORTED_POOL_TYPES
+from ..core.backoff import make_policy, PERMANENT
+from ..core.governor import ModelGovernor
+from ..core.router import make_router
+from ..core.replay import make_replay
+from ..core import tracing
+from .status import show_status, show_log  # noqa: F401 -- frueher hier definiert
 
 
 LOG_DIR = Path(__file__).parent.parent / "logs"
 
+# Endzustaende einer Kette (fuer Abhaengigkeiten zwischen Ketten)
+TERMINAL_STATUSES = ("COMPLETED", "STOPPED", "FAILED", "ALL_DONE", "SKIPPED")
+# Poll-Intervall fuer Ketten, die ausserhalb dieses Prozesses laufen
+DEPENDENCY_POLL_SECONDS = 5
+_LOG_LOCK = threading.Lock()
+
+# Supervisor: mehrere Ketten teilen sich eine Konsole -> Ketten-Name voranstellen
+CONSOLE_CHAIN_PREFIX = False
+# Log-Rotation (aus config.json: log_max_bytes / log_backups, 0 = aus)
+LOG_MAX_BYTES = 0
+LOG_BACKUPS = 3
+
 
 def log(msg, chain_name="default", also_print=True):
     """Schreibt in Log-Datei und optional stdout."""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     line = f"[{timestamp}] {msg}"
     if also_print:
-        print(line)
+        print(f"[{chain_name}] {line}" if CONSOLE_CHAIN_PREFIX else line)
     LOG_DIR.mkdir(exist_ok=True)
     log_file = LOG_DIR / f"{chain_name}.log"
-    with open(log_file, "a", encoding="utf-8") as f:
-        f.write(line + "\n")
+    # Lock: parallele Links schreiben in dasselbe Ketten-Log
+    with _LOG_LOCK:
+        if LOG_MAX_BYTES:
+            rotate_if_needed(log_file, LOG_MAX_BYTES, LOG_BACKUPS)
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
 
 
 def resolve_prompt(link, chain_config):
-    """Liest den Prompt-Text fuer ein Kettenglied."""
-    prompt_key = link.get("prompt", "")
-    prompts_section = chain_config.get("prompts", {})
-    base_dir = Path(__file__).parent.parent
-
-    # 1. Prompt in der prompts-Sektion der Chain-Config nachschlagen
-    if prompt_key in prompts_section:
-        prompt_def = prompts_section[prompt_key]
-        if isinstance(prompt_def, dict) and prompt_def.get("type") == "file":
-            prompt_path = Path(prompt_def["path"])
-            if not prompt_path.is_absolute():
-                prompt_path = base_dir / prompt_path
-            if prompt_path.exists():
-                return prompt_path.read_text(encoding="utf-8")
-            return f"Lies die Datei {prompt_path} und fuehre die darin beschriebene Aufgabe aus."
-        elif isinstance(prompt_def, str):
-            return prompt_def
-
-    # 2. Direkt als Datei im prompts/ Ordner suchen
-    prompt_file = base_dir / "prompts" / prompt_key
-    if prompt_file.exists():
-        return prompt_file.read_text(encoding="utf-8")
-
-    # 3. Als .txt versuchen
-    prompt_file_txt = base_dir / "prompts" / f"{prompt_key}.txt"
-    if prompt_file_txt.exists():
-        return prompt_file_txt.read_text(encoding="utf-8")
-
-    # 4. Fallback: Prompt-Key als Datei-Referenz verwenden
-    if Path(prompt_key).exists():
-        return f"Lies die Datei {prompt_key} und fuehre die darin beschriebene Aufgabe aus."
-
-    # 5. Als inline-Prompt verwenden
-    return prompt_key if prompt_key else "Fuehre die naechste Aufgabe aus."
-
-
-UNTIL_FULL_SUFFIX = (
-    "\n\nWICHTIG: Dein Kontext ist deine Begrenzung. Arbeite so viele Aufgaben ab "
-    "wie moeglich. Erst wenn du merkst, dass dein Kontext knapp wird oder eine "
-    "Komprimierung stattfindet, schliesse die aktuelle Aufgabe sauber ab, "
-    "schreibe ein vollstaendiges Handoff und beende dich."
-)
+    """Liest den Prompt-Text fuer ein Kettenglied (ohne Template-Variablen)."""
+    registry = PromptRegistry(chain_config, Path(__file__).parent.parent)
+    source = registry.resolve(link.get("prompt", ""))
+    if source.path is not None:
+        return source.path.read_text(encoding="utf-8")
+    return source.text
 
 
 def send_telegram_update(chain_name, state):
@@ -108,278 +100,895 @@ def send_telegram_update(chain_name, state):
         url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
         data = json.dumps({"chat_id": chat_id, "text": text}).encode("utf-8")
         req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
-        urllib.request.urlopen(req, timeout=10)
+        with tracing.span("Telegram", "net"):
+            urllib.request.urlopen(req, timeout=10)
     except Exception:
         pass  # Telegram ist optional
 
 
-def run_chain(chain_name, background=False):
-    """Startet eine Kette (Hauptfunktion)."""
+TASK_PROMPT = (
+    "\n\n=== ZUGEWIESENE AUFGABE (Pool: {pool}, ID: {id}) ===\n"
+    "{title}\n"
+    "{source}"
+    "Bearbeite genau diese Aufgabe; die Aufgabe wurde dir exklusiv zugeteilt.\n"
+)
+# Puffer auf den Link-Timeout, bevor eine Aufgabe wieder vergeben werden darf
+TASK_LEASE_MARGIN_SECONDS = 300
+
+
+def _task_pool(ctx, pool_name):
+    """Liefert den (gecachten) TaskPool einer Kette oder None bei Konfig-Fehler."""
+    pools = ctx.setdefault("pools", {})
+    if pool_name in pools:
+        return pools[pool_name]
+    pool_config = ctx["config"].get("task_pools", {}).get(pool_name)
+    pool = None
+    if pool_config is None:
+        log(f"WARNUNG: Aufgabenpool '{pool_name}' nicht in task_pools definiert", ctx["chain_name"])
+    else:
+        try:
+            pool = TaskPool(pool_name, pool_config, ctx["state"].state_dir, ctx["base_dir"])
+        except ValueError as e:
+            log(f"WARNUNG: {e}", ctx["chain_name"])
+    pools[pool_name] = pool
+    return pool
+
+
+def _all_pools_exhausted(ctx):
+    """True wenn alle von Links genutzten Pools keine Aufgaben mehr haben."""
+    names = {link.get("task_pool") for link in ctx["config"].get("links", []) if link.get("task_pool")}
+    pools = [_task_pool(ctx, name) for name in names]
+    pools = [pool for pool in pools if pool is not None]
+    return bool(pools) and all(pool.is_exhausted() for pool in pools)
+
+
+def plan_steps(links):
+    """Gruppiert Kettenglieder zu Ausfuehrungs-Schritten.
+
+    Aufeinanderfolgende Links mit gleicher ``parallel_group`` bilden einen
+    gemeinsamen Schritt (Fan-out), alle anderen Links laufen einzeln.
+    Vor dem naechsten Schritt wird auf alle Links der Gruppe gewartet (Fan-in).
+
+    Returns: Liste von Schritten, jeder Schritt eine Liste von (index, link).
+    """
+    steps = []
+    for i, link in enumerate(links):
+        group = link.get("parallel_group")
+        if group and steps and steps[-1][0][1].get("parallel_group") == group:
+            steps[-1].append((i, link))
+        else:
+            steps.append([(i, link)])
+    return steps
+
+
+async def _run_link(i, link, ctx):
+    """Fuehrt ein einzelnes Kettenglied aus (Runner, Prompt, Nachbearbeitung).
+
+    ``ctx`` ist der Laufzeit-Kontext der Kette (siehe run_chain_async).
+    ``ctx["handoff"]`` ist der letzte gueltige Handoff fuer den
+    Skip-Pattern-Schutz und wird zwischen parallelen Links geteilt. Die
+    Nachbearbeitung nach dem Aufruf enthaelt bis zum Abschluss der Aufgabe
+    kein ``await`` und laeuft damit ohne Unterbrechung durch parallele Links.
+    Eine vergebene Aufgabe geht bei jedem Fehler sofort an den Pool zurueck.
+    """
+    chain_name, config, state = ctx["chain_name"], ctx["config"], ctx["state"]
+    global_config, base_dir = ctx["global_config"], ctx["base_dir"]
+    link_name = link.get("name", f"link-{i+1}")
+    role = link.get("role", "worker")
+    model = link.get("model") or global_config.get("default_model", "claude-sonnet-4-6")
+    fallback = link.get("fallback_model")
+
+    # Continue-Modus: Dediziertes CWD damit --continue
+    # immer die eigene letzte Session fortsetzt
+    use_continue = link.get("continue", False)
+    if use_continue:
+        link_cwd = state.state_dir / f"{link_name}-workspace"
+        link_cwd.mkdir(parents=True, exist_ok=True)
+        marker = link_cwd / ".session_marker"
+        is_continuation = marker.exists()
+        runner_cwd = str(link_cwd)
+    else:
+        is_continuation = False
+        runner_cwd = str(base_dir)
+
+    # Runner erstellen
+    runner = ClaudeRunner(
+        model=model,
+        fallback_model=fallback,
+        permission_mode=global_config.get("default_permission_mode", "dontAsk"),
+        allowed_tools=global_config.get("default_allowed_tools"),
+        timeout=global_config.get("default_timeout_seconds", 1800),
+        cwd=runner_cwd,
+        governor=ctx.get("governor"),
+        claude_cmd=global_config.get("claude_cmd"),
+        replay=ctx.get("replay"),
+        output_format=global_config.get("output_format"),
+    )
+
+    # Aufgabenpool: Link bekommt eine konkrete Aufgabe zugeteilt
+    task, pool = None, None
+    pool_name = link.get("task_pool")
+    if pool_name:
+        pool = _task_pool(ctx, pool_name)
+    if pool is not None:
+        lease = global_config.get("default_timeout_seconds", 1800) + TASK_LEASE_MARGIN_SECONDS
+        with tracing.span("Aufgabe holen", "io", pool=pool_name):
+            # Lock-Datei und JSON-Zugriff im Thread: blockiert nicht die Event-Loop
+            task = await asyncio.to_thread(pool.claim, link_name, lease_seconds=lease)
+        if task is None:
+            log(f"{link_name}: keine offene Aufgabe in Pool '{pool_name}' -> uebersprungen", chain_name)
+            if state.get_status() != "ALL_DONE" and await asyncio.to_thread(_all_pools_exhausted, ctx):
+                log("ALLE AUFGABENPOOLS ABGEARBEITET", chain_name)
+                state.set_status("ALL_DONE")
+            return None
+        log(f"  Aufgabe [{task['id']}] aus Pool '{pool_name}': {task['title'][:80]}", chain_name)
+
+    # Ab hier ist die Aufgabe vergeben: bei jedem Fehler (Prompt-Render, Runner,
+    # Abbruch) sofort zurueckgeben statt sie bis zum Lease-Ende zu blockieren
+    try:
+        # Prompt aus der Registry (beim Kettenstart vorkompiliert, mtime-gecacht)
+        with tracing.span("Prompt", "chain"):
+            template = ctx["prompts"].template(link)
+            prompt_text = template.render({
+                "ROUND": state.get_round() + 1,
+                "LAST_VERDICT": lambda: extract_verdict(ctx["handoff"]),
+                "TASK": task["title"] if task else "",
+                "TASK_ID": task["id"] if task else "",
+            })
+        if task and "TASK" not in template.variables:
+            prompt_text += TASK_PROMPT.format(
+                pool=pool_name, id=task["id"], title=task["title"],
+                source=f"Aufgaben-Datei: {task['source']}\n" if task.get("source") else "",
+            )
+
+        # Modell-Routing: gestoertes Modell -> naechstes gesundes Ausweichmodell
+        primary_model = model
+        router = ctx.get("router")
+        route = router.select(primary_model, fallback) if router else None
+        if route is not None:
+            model = route.model
+            if route.reason != "primary":
+                log(f"  ROUTER: {primary_model} gestoert -> {model}" if route.reason == "fallback"
+                    else f"  ROUTER: Probe-Aufruf fuer {model}", chain_name)
+
+        # Output-Log: stdout/stderr jedes Glieds in eigene Datei schreiben.
+        # Im Streaming-Modus landen die Zeilen live im Log (auch bei Timeout).
+        output_log = LOG_DIR / f"{chain_name}_{link_name}.log"
+        stream = global_config.get("stream_output", True)
+        try:
+            LOG_DIR.mkdir(exist_ok=True)
+            # Rotation vor dem Lauf: Link-Logs enthalten die volle Modell-Ausgabe
+            rotate_if_needed(output_log, global_config.get("log_max_bytes", 0),
+                             global_config.get("log_backups", 3))
+            with open(output_log, "a", encoding="utf-8") as f:
+                ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                f.write(f"\n{'='*60}\n")
+                f.write(f"[{ts}] Runde {state.get_round()+1} | {link_name} | {model}\n")
+                f.write(f"{'='*60}\n")
+        except Exception as e:
+            log(f"  WARNUNG: Output-Log fehlgeschlagen: {e}", chain_name)
+
+        if is_continuation:
+            log(f"{link_name} ({role}): CONTINUE {model}...", chain_name)
+        else:
+            log(f"{link_name} ({role}): Starte {model}...", chain_name)
+        # Hard-Stop-Watcher: bricht das laufende Glied ab, sobald
+        # "llmauto chain stop <name> --hard" die STOP-Datei schreibt
+        run_kwargs = {
+            "continue_conversation": is_continuation,
+            "abort_check": state.is_hard_stop_requested,
+            "abort_poll": global_config.get("stop_poll_seconds", 2),
+            # Globale Obergrenze gleichzeitiger CLI-Prozesse (Supervisor)
+            "limiter": ctx.get("limiter"),
+        }
+        if stream:
+            run_kwargs.update(stream=True, log_file=output_log)
+        backoff = ctx["backoff"]
+        attempt = 0
+        while True:
+            run_kwargs["model"] = model
+            run_kwargs["fallback_model"] = fallback if fallback != model else None
+            # Modell-Cooldown (z.B. nach Rate-Limit eines anderen Links) abwarten
+            wait = backoff.cooldown_remaining(model)
+            if wait > 0 and not state.is_stop_requested():
+                log(f"  COOLDOWN {model}: warte {wait:.0f}s", chain_name)
+                await _pause(ctx, wait, "cooldown")
+            result = await runner.run_async(prompt_text, **run_kwargs)
+            result["fallback_used"] = model != primary_model
+            decision = backoff.record(result, model)
+            if router is not None:
+                change = router.record(model, result)
+                if change == "tripped":
+                    log(f"  ROUTER: {model} nach {router.failure_threshold} Fehlschlaegen "
+                        f"in Folge als gestoert markiert", chain_name)
+                elif change == "restored":
+                    log(f"  ROUTER: {model} wieder verfuegbar", chain_name)
+            if not decision.retry or attempt >= backoff.max_retries or state.is_stop_requested():
+                break
+            attempt += 1
+            if router is not None:
+                route = router.select(primary_model, fallback)
+                if route.model != model:
+                    log(f"  ROUTER: {link_name} wechselt {model} -> {route.model}", chain_name)
+                model = route.model
+            log(f"{link_name}: voruebergehender Fehler (rc={result['returncode']}) -> "
+                f"Wiederholung {attempt}/{backoff.max_retries} in {decision.delay:.0f}s", chain_name)
+            _record_usage(ctx, link_name, result)
+            if global_config.get("history_enabled", True) and not result.get("replayed"):
+                await asyncio.to_thread(record_result, result, chain=chain_name,
+                                        round_no=state.get_round() + 1, link=link_name)
+            # Backoff selbst abwarten: nach einem Router-Wechsel greift der Cooldown
+            # des fehlgeschlagenen Modells nicht mehr
+            if not state.is_stop_requested():
+                await _pause(ctx, decision.delay, "backoff")
+
+        # Skip-Pattern-Schutz: Handoff wiederherstellen wenn Worker
+        # nur "SKIPPED" geschrieben hat (loest den Overwrite-Bug)
+        with tracing.span("Handoff pruefen", "io"):
+            was_skip = state.protect_handoff_from_skip(link_name, ctx["handoff"])
+            if not was_skip:
+                ctx["handoff"] = state.get_handoff()
+        if was_skip:
+            log(f"  SKIP-SCHUTZ: {link_name} hat Handoff mit SKIP ueberschrieben -> wiederhergestellt", chain_name)
+
+        # Gepufferter Modus: Ausgabe erst nach Prozessende ins Output-Log
+        if not stream:
+            try:
+                with open(output_log, "a", encoding="utf-8") as f:
+                    if result["output"]:
+                        f.write(result["output"])
+                        f.write("\n")
+                    if result["stderr"]:
+                        f.write(f"\n--- STDERR ---\n{result['stderr']}\n")
+            except Exception as e:
+                log(f"  WARNUNG: Output-Log fehlgeschlagen: {e}", chain_name)
+
+        # Nach erstem erfolgreichen Run: Marker setzen
+        if use_continue and result["success"] and not is_continuation:
+            marker.touch()
+
+        _record_usage(ctx, link_name, result)
+        if result["success"]:
+            log(f"{link_name}: OK ({result['duration_s']:.0f}s{_usage_note(result)})", chain_name)
+        else:
+            log(f"{link_name}: FEHLER (rc={result['returncode']}, {result['duration_s']:.0f}s"
+                f"{_usage_note(result)})", chain_name)
+            stderr_short = result["stderr"][:200] if result["stderr"] else ""
+            if stderr_short:
+                log(f"  stderr: {stderr_short}", chain_name)
+
+        # Aufgabe abschliessen (Fehlschlag: zurueck in den Pool, Hard-Stop: ohne Fehlversuch)
+        if task is not None:
+            if result["returncode"] == -4:
+                await asyncio.to_thread(pool.release, task["id"])
+            else:
+                task_status = await asyncio.to_thread(pool.complete, task["id"], success=result["success"])
+                log(f"  Aufgabe [{task['id']}]: {task_status}", chain_name)
+    except BaseException:
+        if task is not None:
+            await asyncio.to_thread(pool.release, task["id"])
+        raise
+
+    # Status-Schutz: Worker darf RUNNING nicht ueberschreiben
+    # (LLMs schreiben manchmal COMPLETED/DONE in status.txt)
+    current_status = state.get_status()
+    if current_status not in ("RUNNING", "ALL_DONE"):
+        log(f"  STATUS-KORREKTUR: '{current_status}' -> 'RUNNING' (Worker hat status.txt manipuliert)", chain_name)
+        state.set_status("RUNNING")
+
+    # Lauf-Historie (llmauto stats); abgespielte Aufrufe verfaelschen sie nicht
+    if global_config.get("history_enabled", True) and not result.get("replayed"):
+        with tracing.span("Historie", "io"):
+            await asyncio.to_thread(
+                record_result, result, chain=chain_name, round_no=state.get_round() + 1, link=link_name,
+                skip_protected=was_skip, fallback_used=result.get("fallback_used", False),
+            )
+
+    # Dauerhafter Fehler (z.B. CLI fehlt): Kette nach diesem Schritt abbrechen
+    if decision.kind == PERMANENT:
+        ctx["fatal"] = f"{link_name}: rc={result['returncode']} {(result['stderr'] or '')[:200]}"
+    elif decision.delay > 0 and not state.is_stop_requested():
+        log(f"  BACKOFF: warte {decision.delay:.0f}s ({decision.kind})", chain_name)
+        await _pause(ctx, decision.delay, "backoff")
+
+    # Telegram-Update wenn fuer dieses Glied aktiviert
+    if link.get("telegram_update", False):
+        await asyncio.to_thread(send_telegram_update, chain_name, state)
+
+    return result
+
+
+def _record_usage(ctx, link_name, result):
+    """Verbrauch im State summieren (abgespielte Aufrufe zaehlen wie in der Historie nicht)."""
+    if not result.get("replayed"):
+        ctx["state"].record_usage(link_name, result)
+
+
+def _usage_note(result):
+    """Log-Zusatz mit Token und Kosten (nur bei strukturierter CLI-Ausgabe)."""
+    usage = result.get("usage")
+    if not usage:
+        return ""
+    tokens_in = (usage.get("input_tokens", 0) + usage.get("cache_read_input_tokens", 0)
+                 + usage.get("cache_creation_input_tokens", 0))
+    note = f", {tokens_in}/{usage.get('output_tokens', 0)} Token"
+    if result.get("cost_usd") is not None:
+        note += f", {result['cost_usd']:.4f}$"
+    return note
+
+
+async def _pause(ctx, seconds, reason):
+    """Wartezeit der Kette; beim Abspielen (core.replay) mit dessen time_scale skaliert."""
+    player = ctx.get("replay")
+    scale = getattr(player, "time_scale", 1.0)
+    if seconds * scale > 0:
+        with tracing.span(f"Warten ({reason})", "wait", seconds=round(seconds * scale, 3)):
+            await asyncio.sleep(seconds * scale)
+
+
+def _link_status(result):
+    """Checkpoint-Status eines beendeten Links (siehe ChainState.link_finished)."""
+    if result is None:
+        return "skipped"
+    if result["returncode"] == -4:
+        return "aborted"
+    return "done" if result["success"] else "failed"
+
+
+async def _run_tracked(i, link, ctx):
+    """``_run_link`` mit Checkpoint im State (Grundlage fuer ``chain start --resume``).
+
+    Bricht der Prozess waehrend des Links ab, bleibt der Link "running" und
+    wird beim Fortsetzen erneut ausgefuehrt.
+    """
+    state = ctx["state"]
+    link_name = link.get("name", f"link-{i+1}")
+    state.link_started(i, link_name)
+    # Eigene Spur pro Link im Trace (parallele Links nebeneinander)
+    with tracing.lane(i + 1, link_name), \
+            tracing.span(link_name, "link", round=state.get_round() + 1, index=i) as args:
+        result = await _run_link(i, link, ctx)
+        status = _link_status(result)
+        args.update(status=status, model=(result or {}).get("model"))
+    state.link_finished(i, status)
+    return result
+
+
+async def _run_step(step, ctx):
+    """Fuehrt einen Schritt aus: Einzel-Link direkt, Gruppe nebenlaeufig.
+
+    Die Anzahl gleichzeitiger Links einer Gruppe ist durch ``max_parallel``
+    der Chain-Config begrenzt (0 = alle Links der Gruppe gleichzeitig).
+    Kehrt erst zurueck wenn alle Links des Schritts beendet sind (Join-Barriere).
+    """
+    if len(step) == 1:
+        i, link = step[0]
+        return [await _run_tracked(i, link, ctx)]
+
+    chain_name = ctx["chain_name"]
+    max_parallel = ctx["config"].get("max_parallel", 0) or len(step)
+    workers = min(max_parallel, len(step))
+    names = ", ".join(link.get("name", f"link-{i+1}") for i, link in step)
+    log(f"PARALLEL-GRUPPE '{step[0][1].get('parallel_group')}': {names} ({workers} gleichzeitig)", chain_name)
+    pool = asyncio.Semaphore(workers)
+
+    async def _bounded(i, link):
+        async with pool:
+            return await _run_tracked(i, link, ctx)
+
+    return await asyncio.gather(*(_bounded(i, link) for i, link in step))
+
+
+def _start_background(chain_name, base_dir, resume=False, replay=None):
+    """Startet die Kette als eigenen Prozess (neues Konsolenfenster unter Windows)."""
+    env = os.environ.copy()
+    env.pop("CLAUDECODE", None)
+    env["PYTHONIOENCODING"] = "utf-8"
+    # PYTHONPATH muss das Parent-Verzeichnis enthalten, damit
+    # "python -m llmauto" das Paket findet (base_dir IST das Paket)
+    parent_dir = str(base_dir.parent)
+    env["PYTHONPATH"] = parent_dir
+    cmd = [sys.executable, "-m", "llmauto", "chain", "start", chain_name]
+    if resume:
+        cmd.append("--resume")
+    if replay and replay.get("mode") == "record":
+        cmd.extend(["--record", replay["archive"]] if replay.get("archive") else ["--record"])
+    elif replay and replay.get("mode") == "replay":
+        cmd.extend(["--replay", replay["archive"], "--replay-speed", str(replay.get("time_scale") or 0)])
+    subprocess.Popen(
+        cmd,
+        env=env,
+        creationflags=subprocess.CREATE_NEW_CONSOLE if sys.platform == "win32" else 0,
+        cwd=parent_dir
+    )
+    print(f"Kette '{chain_name}' im Hintergrund gestartet (neues Fenster).")
+    print(f"Status:  llmauto chain status {chain_name}")
+    print(f"Stoppen: llmauto chain stop {chain_name}")
+    return 0
+
+
+def run_chain(chain_name, background=False, resume=False, replay=None):
+    """Startet eine Kette (Hauptfunktion).
+
+    Mit ``resume`` setzt die Kette am ersten nicht beendeten Glied der
+    laufenden Runde fort, statt die Runde von vorn zu beginnen. ``replay``
+    (``{"mode": "record"|"replay", "archive", "time_scale"}``) ueberstimmt
+    "replay" aus config.json.
+    """
     base_dir = Path(__file__).parent.parent
 
-    # Chain-Config laden
+    # Chain-Config vorab pruefen, damit Fehler vor dem Hintergrund-Start auffallen
     config = load_chain(chain_name)
-    links = config.get("links", [])
-    if not links:
+    if not config.get("links", []):
         print(f"Fehler: Kette '{chain_name}' hat keine Glieder (links).")
         return 1
 
-    mode = config.get("mode", "loop")
-    state = ChainState(chain_name, base_dir)
-
     # Hintergrund-Start
     if background:
-        env = os.environ.copy()
-        env.pop("CLAUDECODE", None)
-        env["PYTHONIOENCODING"] = "utf-8"
-        # PYTHONPATH muss das Parent-Verzeichnis enthalten, damit
-        # "python -m llmauto" das Paket findet (base_dir IST das Paket)
-        parent_dir = str(base_dir.parent)
-        env["PYTHONPATH"] = parent_dir
-        subprocess.Popen(
-            [sys.executable, "-m", "llmauto", "chain", "start", chain_name],
-            env=env,
-            creationflags=subprocess.CREATE_NEW_CONSOLE if sys.platform == "win32" else 0,
-            cwd=parent_dir
-        )
-        print(f"Kette '{chain_name}' im Hintergrund gestartet (neues Fenster).")
-        print(f"Status:  llmauto chain status {chain_name}")
-        print(f"Stoppen: llmauto chain stop {chain_name}")
+        return _start_background(chain_name, base_dir, resume=resume, replay=replay)
+
+    try:
+        return asyncio.run(run_chain_async(chain_name, resume=resume, replay=replay))
+    except KeyboardInterrupt:
+        log("MANUELL GESTOPPT (Ctrl+C)", chain_name)
+        ChainState(chain_name, base_dir).set_status("STOPPED")
         return 0
 
-    # Startzeit + Status setzen
-    state.record_start()
-    state.set_status("RUNNING")
+
+async def run_chain_async(chain_name, limiter=None, resume=False, config=None, replay=None):
+    """Fuehrt eine Kette in der laufenden Event-Loop aus.
+
+    Args:
+        chain_name: Name der Kette (chains/<name>.json)
+        limiter: Optionales asyncio.Semaphore, das die Anzahl gleichzeitiger
+                 CLI-Aufrufe ueber mehrere Ketten hinweg begrenzt (Supervisor).
+        resume: In der laufenden Runde bereits beendete Glieder ueberspringen
+                und die bisherige Startzeit (Laufzeit-Limit) beibehalten.
+        config: Chain-Config statt chains/<name>.json (z.B. synthetische
+                Ketten im Benchmark, core.bench)
+        replay: Aufzeichnen/Abspielen der CLI-Aufrufe (core.replay), ergaenzt
+                "replay" aus config.json
+
+    Returns: Exit-Code (0 = regulaer beendet, 1 = Konfigurationsfehler)
+    """
+    base_dir = Path(__file__).parent.parent
+
+    # Chain-Config laden
+    if config is None:
+        config = load_chain(chain_name)
+    links = config.get("links", [])
+    if not links:
+        log(f"Fehler: Kette '{chain_name}' hat keine Glieder (links).", chain_name)
+        return 1
+
+    mode = config.get("mode", "loop")
+    global_config = load_global_config()
+    state = ChainState(chain_name, base_dir,
+                       mirror_legacy=global_config.get("state_legacy_files", True))
+    try:
+        backoff = make_policy(global_config.get("backoff"))
+    except (ValueError, TypeError) as e:
+        log(f"Fehler: backoff-Konfiguration ungueltig: {e}", chain_name)
+        return 1
+    try:
+        router = make_router(global_config.get("model_router"))
+    except TypeError as e:
+        log(f"Fehler: model_router-Konfiguration ungueltig: {e}", chain_name)
+        return 1
+    if (global_config.get("output_format") or "text") not in OUTPUT_FORMATS:
+        log(f"Fehler: output_format '{global_config['output_format']}' ungueltig "
+            f"(erlaubt: {', '.join(OUTPUT_FORMATS)})", chain_name)
+        return 1
+    # Aufzeichnen/Abspielen: Handoff und status.txt werden mit archiviert
+    replay_config = dict(global_config.get("replay") or {})
+    replay_config.update(replay or {})
+    if replay_config.get("mode") and not replay_config.get("archive"):
+        replay_config["archive"] = str(base_dir / "state" / "_replay" / f"{chain_name}.jsonl")
+    try:
+        player = make_replay(replay_config, watch=[state.handoff_file, state.status_file], root=base_dir)
+    except (ValueError, OSError) as e:
+        log(f"Fehler: replay: {e}", chain_name)
+        return 1
+    if player is not None:
+        player.start()
+    model_limits = global_config.get("model_limits") or {}
+    global LOG_MAX_BYTES, LOG_BACKUPS
+    LOG_MAX_BYTES = global_config.get("log_max_bytes", 0)
+    LOG_BACKUPS = global_config.get("log_backups", 3)
+
+    # Startzeit + Status setzen (ein Schreibvorgang)
+    with state.batch():
+        finished = state.finished_links() if resume else set()
+        if not resume:
+            state.clear_cursor()
+        state.record_start(resume=resume)
+        state.set_status("RUNNING")
+
+    steps = plan_steps(links)
+    # Fortsetzen: nur die erste Runde ohne bereits beendete Glieder
+    first_steps = steps
+    if finished:
+        first_steps = [kept for kept in ([(i, link) for i, link in step if i not in finished]
+                                         for step in steps) if kept]
 
     log("=" * 60, chain_name)
     log(f"CHAIN GESTARTET: {chain_name}", chain_name)
-    log(f"Modus: {mode} | Glieder: {len(links)} | Max-Runden: {config.get('max_rounds', '∞')}", chain_name)
+    log(f"Modus: {mode} | Glieder: {len(links)} | Schritte: {len(steps)} | Max-Runden: {config.get('max_rounds', '∞')}", chain_name)
     log(f"Runtime-Limit: {config.get('runtime_hours', 0)}h | Deadline: {config.get('deadline', '-')}", chain_name)
+    if player is not None:
+        log(f"REPLAY: {replay_config['mode']} {replay_config['archive']}", chain_name)
+    if resume:
+        log(f"FORTSETZEN: Runde {state.get_round() + 1}, {len(finished)} von {len(links)} "
+            f"Gliedern bereits beendet", chain_name)
     log("=" * 60, chain_name)
 
-    global_config = load_global_config()
-    telegram_interval = 0  # Zaehler fuer Telegram-Updates
+    ctx = {
+        "chain_name": chain_name,
+        "config": config,
+        "global_config": global_config,
+        "state": state,
+        "base_dir": base_dir,
+        "limiter": limiter,
+        "handoff": "",
+        "prompts": PromptRegistry(config, base_dir, chain_name=chain_name),
+        "backoff": backoff,
+        "governor": ModelGovernor(model_limits) if model_limits else None,
+        "router": router,
+        "replay": player,
+    }
+    for problem in ctx["prompts"].preload(links):
+        log(f"WARNUNG: {problem}", chain_name)
+
+    tracer = None
+    tracing_config = global_config.get("tracing") or {}
+    if tracing_config.get("enabled", False):
+        try:
+            tracer = tracing.start_trace(chain_name, state.state_dir,
+                                         keep=tracing_config.get("keep_runs", tracing.DEFAULT_KEEP_RUNS))
+        except OSError as e:
+            log(f"WARNUNG: Trace nicht moeglich: {e}", chain_name)
 
     try:
-        while True:
-            # Ein voller Zyklus (alle Links durchlaufen)
-            for i, link in enumerate(links):
-                # Shutdown-Check vor jedem Glied
-                should_stop, reason = state.check_shutdown(config)
+        with tracing.activate(tracer), tracing.span(f"Kette {chain_name}", "chain", mode=mode):
+            return await _run_rounds(ctx, steps, first_steps)
+    except asyncio.CancelledError:
+        log("KETTE ABGEBROCHEN", chain_name)
+        state.set_status("STOPPED")
+        raise
+    finally:
+        if player is not None:
+            log(f"REPLAY: {player.summary()}", chain_name)
+        if tracer is not None:
+            tracer.close()
+
+
+async def _run_rounds(ctx, steps, first_steps):
+    """Runden-Schleife der Kette. Returns: Exit-Code (siehe run_chain_async)"""
+    chain_name, config, state = ctx["chain_name"], ctx["config"], ctx["state"]
+    mode = config.get("mode", "loop")
+    backoff = ctx["backoff"]
+    while True:
+        # Ein voller Zyklus (alle Schritte durchlaufen)
+        cycle, first_steps = first_steps, steps
+        with tracing.span(f"Runde {state.get_round() + 1}", "round"):
+            for step in cycle:
+                # Shutdown-Check vor jedem Schritt
+                with tracing.span("Shutdown-Pruefung", "io"):
+                    should_stop, reason = state.check_shutdown(config)
                 if should_stop:
                     log(f"SHUTDOWN: {reason}", chain_name)
+                    tracing.instant("Shutdown", reason=reason)
                     state.set_status("STOPPED")
-                    send_telegram_update(chain_name, state)
+                    await asyncio.to_thread(send_telegram_update, chain_name, state)
                     return 0
 
-                link_name = link.get("name", f"link-{i+1}")
-                role = link.get("role", "worker")
-                model = link.get("model") or global_config.get("default_model", "claude-sonnet-4-6")
-                fallback = link.get("fallback_model")
-
-                # Continue-Modus: Dediziertes CWD damit --continue
-                # immer die eigene letzte Session fortsetzt
-                use_continue = link.get("continue", False)
-                if use_continue:
-                    link_cwd = state.state_dir / f"{link_name}-workspace"
-                    link_cwd.mkdir(parents=True, exist_ok=True)
-                    marker = link_cwd / ".session_marker"
-                    is_continuation = marker.exists()
-                    runner_cwd = str(link_cwd)
-                else:
-                    is_continuation = False
-                    runner_cwd = str(base_dir)
-
-                # Runner erstellen
-                runner = ClaudeRunner(
-                    model=model,
-                    fallback_model=fallback,
-                    permission_mode=global_config.get("default_permission_mode", "dontAsk"),
-                    allowed_tools=global_config.get("default_allowed_tools"),
-                    timeout=global_config.get("default_timeout_seconds", 1800),
-                    cwd=runner_cwd,
-                )
-
-                # Prompt aufloesen + {HOME} durch tatsaechliches User-Home ersetzen
-                prompt_text = resolve_prompt(link, config)
-                home_win = _ACTUAL_HOME.rstrip(os.sep)  # z.B. C:\Users\YourName
-                # C:\Users\YourName -> /c/Users/YourName (Laufwerksbuchstabe lowercase)
-                drive, rest = home_win.split(":", 1)
-                home_bash = "/" + drive.lower() + rest.replace("\\", "/")  # z.B. /c/Users/YourName
-                prompt_text = prompt_text.replace("{HOME}", home_win)
-                prompt_text = prompt_text.replace("{BASH_HOME}", home_bash)
-
-                # until_full: Kontext-Begrenzungs-Hinweis anhaengen
-                if link.get("until_full", False):
-                    prompt_text += UNTIL_FULL_SUFFIX
-
-                # Handoff VOR dem Link sichern (Skip-Pattern-Overwrite-Schutz)
-                handoff_before = state.get_handoff()
-
-                if is_continuation:
-                    log(f"{link_name} ({role}): CONTINUE {model}...", chain_name)
-                else:
-                    log(f"{link_name} ({role}): Starte {model}...", chain_name)
-                result = runner.run(prompt_text, continue_conversation=is_continuation)
+                # Handoff VOR dem Schritt sichern (Skip-Pattern-Overwrite-Schutz)
+                with tracing.span("Handoff lesen", "io"):
+                    ctx["handoff"] = state.get_handoff()
+                await _run_step(step, ctx)
 
-                # Skip-Pattern-Schutz: Handoff wiederherstellen wenn Worker
-                # nur "SKIPPED" geschrieben hat (loest den Overwrite-Bug)
-                was_skip = state.protect_handoff_from_skip(link_name, handoff_before)
-                if was_skip:
-                    log(f"  SKIP-SCHUTZ: {link_name} hat Handoff mit SKIP ueberschrieben -> wiederhergestellt", chain_name)
+                if ctx.get("fatal"):
+                    log(f"ABBRUCH: dauerhafter Fehler: {ctx['fatal']}", chain_name)
+                    state.set_status("FAILED")
+                    await asyncio.to_thread(send_telegram_update, chain_name, state)
+                    return 1
 
-                # Output-Log: stdout/stderr jedes Glieds in eigene Datei schreiben
-                output_log = LOG_DIR / f"{chain_name}_{link_name}.log"
-                try:
-                    with open(output_log, "a", encoding="utf-8") as f:
-                        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        f.write(f"\n{'='*60}\n")
-                        f.write(f"[{ts}] Runde {state.get_round()+1} | {link_name} | {model}\n")
-                        f.write(f"{'='*60}\n")
-                        if result["output"]:
-                            f.write(result["output"])
-                            f.write("\n")
-                        if result["stderr"]:
-                            f.write(f"\n--- STDERR ---\n{result['stderr']}\n")
-                except Exception as e:
-                    log(f"  WARNUNG: Output-Log fehlgeschlagen: {e}", chain_name)
-
-                # Nach erstem erfolgreichen Run: Marker setzen
-                if use_continue and result["success"] and not is_continuation:
-                    marker.touch()
-
-                if result["success"]:
-                    log(f"{link_name}: OK ({result['duration_s']:.0f}s)", chain_name)
-                else:
-                    log(f"{link_name}: FEHLER (rc={result['returncode']}, {result['duration_s']:.0f}s)", chain_name)
-                    stderr_short = result["stderr"][:200] if result["stderr"] else ""
-                    if stderr_short:
-                        log(f"  stderr: {stderr_short}", chain_name)
-                    time.sleep(30)  # Bei Fehler laenger warten
-
-                # Status-Schutz: Worker darf RUNNING nicht ueberschreiben
-                # (LLMs schreiben manchmal COMPLETED/DONE in status.txt)
-                current_status = state.get_status()
-                if current_status not in ("RUNNING", "ALL_DONE"):
-                    log(f"  STATUS-KORREKTUR: '{current_status}' -> 'RUNNING' (Worker hat status.txt manipuliert)", chain_name)
-                    state.set_status("RUNNING")
-
-                # Telegram-Update wenn fuer dieses Glied aktiviert
-                telegram_interval += 1
-                if link.get("telegram_update", False):
-                    send_telegram_update(chain_name, state)
-
-                # Kurze Pause zwischen Gliedern
-                time.sleep(5)
+                # Hard-Stop: abgebrochene Runde nicht als abgeschlossen zaehlen
+                if state.is_hard_stop_requested():
+                    log(f"SHUTDOWN: HARD_STOP: {state.get_stop_reason()}", chain_name)
+                    state.set_status("STOPPED")
+                    await asyncio.to_thread(send_telegram_update, chain_name, state)
+                    return 0
+
+                # Optionale Pause zwischen Schritten (Standard: keine)
+                if backoff.step_delay_seconds:
+                    await _pause(ctx, backoff.step_delay_seconds, "step_delay")
 
             # Nach vollem Zyklus
             current_round = state.increment_round()
             log(f"RUNDE {current_round} ABGESCHLOSSEN", chain_name)
 
-            # Bei mode "once" / "deadend": nach einem Durchlauf aufhoeren
-            if mode in ("once", "deadend"):
-                log(f"Modus '{mode}': Kette beendet nach einem Durchlauf.", chain_name)
-                state.set_status("COMPLETED")
-                send_telegram_update(chain_name, state)
-                return 0
+            # Handoff-Budget: aeltere Runden archivieren (optional zusammenfassen)
+            with tracing.span("Handoff kompaktieren", "io"):
+                await _compact_handoff(ctx)
 
-    except KeyboardInterrupt:
-        log("MANUELL GESTOPPT (Ctrl+C)", chain_name)
-        state.set_status("STOPPED")
-        return 0
+        # Bei mode "once" / "deadend": nach einem Durchlauf aufhoeren
+        if mode in ("once", "deadend"):
+            log(f"Modus '{mode}': Kette beendet nach einem Durchlauf.", chain_name)
+            state.set_status("COMPLETED")
+            await asyncio.to_thread(send_telegram_update, chain_name, state)
+            return 0
 
 
-def show_status(chain_name=None):
-    """Zeigt Status einer oder aller Ketten."""
-    base_dir = Path(__file__).parent.parent
-    state_dir = base_dir / "state"
+HANDOFF_SUMMARY_PROMPT = (
+    "Fasse die folgenden aelteren Handoff-Eintraege einer Agent-Kette knapp "
+    "zusammen (hoechstens 20 Zeilen Markdown, keine Ueberschrift der Ebene 1). "
+    "Behalte erledigte Aufgaben, offene Punkte, Entscheidungen und Blocker. "
+    "Antworte nur mit der Zusammenfassung.\n\n"
+)
 
-    if chain_name:
-        names = [chain_name]
-    else:
-        # Alle Ketten mit State-Verzeichnis
-        if state_dir.exists():
-            names = [d.name for d in state_dir.iterdir() if d.is_dir()]
-        else:
-            names = []
 
-    if not names:
-        print("Keine laufenden oder beendeten Ketten gefunden.")
-        return 0
+async def _compact_handoff(ctx):
+    """Haelt den Handoff im Budget der Kette (handoff_max_bytes/-lines).
+
+    Mit ``handoff_summary_model`` fasst ein guenstiges Modell die archivierten
+    Runden zusammen; ohne bleibt nur ein Verweis auf das Archiv.
+    """
+    chain_name, config, state = ctx["chain_name"], ctx["config"], ctx["state"]
+    max_bytes = config.get("handoff_max_bytes", 0)
+    max_lines = config.get("handoff_max_lines", 0)
+    if not (max_bytes or max_lines):
+        return None
+
+    summarize = None
+    summary_model = config.get("handoff_summary_model")
+    if summary_model:
+        global_config = ctx["global_config"]
+        runner = ClaudeRunner(
+            model=summary_model,
+            permission_mode=global_config.get("default_permission_mode", "dontAsk"),
+            allowed_tools=["Read"],
+            timeout=global_config.get("default_timeout_seconds", 1800),
+            cwd=str(ctx["base_dir"]),
+            governor=ctx.get("governor"),
+            claude_cmd=global_config.get("claude_cmd"),
+            replay=ctx.get("replay"),
+            output_format=global_config.get("output_format"),
+        )
 
-    for name in names:
-        state = ChainState(name, base_dir)
-        status = state.get_status()
-        runde = state.get_round()
-        runtime = f"{state.get_runtime_hours():.1f}h" if state.start_time_file.exists() else "-"
-
-        # Aus handoff lesen
-        handoff = state.get_handoff()
-        last_task, last_status, last_role = "-", "-", "-"
-        for line in handoff.split("\n"):
-            if line.startswith("## Task:"):
-                last_task = line.split(":", 1)[1].strip()
-            elif line.startswith("## Status:") or line.startswith("## Urteil:"):
-                last_status = line.split(":", 1)[1].strip()
-            elif line.startswith("## Rolle:"):
-                last_role = line.split(":", 1)[1].strip()
-
-        # Chain-Config laden fuer max_rounds/runtime_hours
+        def summarize(archived):
+            result = runner.run(HANDOFF_SUMMARY_PROMPT + archived)
+            if not result["success"]:
+                log(f"  Handoff-Zusammenfassung fehlgeschlagen (rc={result['returncode']})", chain_name)
+                return ""
+            return result["output"]
+
+    archive_file = await asyncio.to_thread(state.compact_handoff, max_bytes, max_lines, summarize)
+    if archive_file is not None:
+        log(f"HANDOFF KOMPAKTIERT: aeltere Runden -> {archive_file.name}", chain_name)
+    return archive_file
+
+
+def chain_dependencies(config):
+    """Liest die Abhaengigkeiten einer Kette aus der Config.
+
+    ``after``: Liste (oder einzelner Name) von Ketten, die vorher laufen muessen.
+    ``on_status``: Status (oder Liste), den jede dieser Ketten erreichen muss
+    (Standard: COMPLETED).
+
+    Returns: (after_liste, akzeptierte_status_menge)
+    """
+    after = config.get("after") or []
+    if isinstance(after, str):
+        after = [after]
+    on_status = config.get("on_status") or "COMPLETED"
+    if isinstance(on_status, str):
+        on_status = [on_status]
+    return list(after), set(on_status)
+
+
+def expand_dependencies(chain_names):
+    """Ergaenzt die Ketten-Liste transitiv um alle Vorgaenger-Ketten (after).
+
+    Vorgaenger ohne Config in chains/ bleiben extern (werden nur beobachtet).
+    """
+    known = set(list_chains())
+    result = []
+    pending = list(chain_names)
+    while pending:
+        name = pending.pop(0)
+        if name in result:
+            continue
+        result.append(name)
+        if name in known:
+            after, _ = chain_dependencies(load_chain(name))
+            pending.extend(up for up in after if up in known)
+    # Vorgaenger zuerst (stabile Reihenfolge fuer Ausgabe und Start)
+    return list(reversed(result))
+
+
+def check_dependency_cycles(dependencies):
+    """Prueft den Abhaengigkeits-Graphen auf Zyklen.
+
+    Args:
+        dependencies: dict {chain_name: [vorgaenger, ...]}
+
+    Raises: ValueError mit dem gefundenen Zyklus
+    """
+    visiting, done = [], set()
+
+    def _visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            cycle = visiting[visiting.index(name):] + [name]
+            raise ValueError(f"Zyklische Ketten-Abhaengigkeit: {' -> '.join(cycle)}")
+        visiting.append(name)
+        for upstream in dependencies.get(name, []):
+            _visit(upstream)
+        visiting.pop()
+        done.add(name)
+
+    for name in dependencies:
+        _visit(name)
+
+
+async def run_chain_graph(chain_names, limiter=None, poll_interval=DEPENDENCY_POLL_SECONDS):
+    """Fuehrt Ketten unter Beachtung ihrer ``after``-Abhaengigkeiten aus.
+
+    Ketten ohne offene Abhaengigkeiten starten sofort. Nachfolger starten in
+    dem Moment, in dem ChainState.set_status der Vorgaenger-Kette einen
+    akzeptierten Status meldet (In-Prozess-Benachrichtigung). Vorgaenger, die
+    nicht in diesem Prozess laufen, werden per Status-Datei beobachtet
+    (nur Dateizugriff, kein Interpreter-Start). Endet ein Vorgaenger mit einem
+    nicht akzeptierten Status, wird der Nachfolger uebersprungen (SKIPPED).
+
+    Returns: dict {chain_name: exit_code}
+    """
+    base_dir = Path(__file__).parent.parent
+    configs = {name: load_chain(name) for name in chain_names}
+    deps = {name: chain_dependencies(cfg) for name, cfg in configs.items()}
+    check_dependency_cycles({name: after for name, (after, _) in deps.items()})
+
+    loop = asyncio.get_running_loop()
+    observed = {}     # Status der in diesem Prozess verwalteten Ketten
+    waiters = set()   # asyncio.Events wartender Nachfolger
+    external_states = {}  # ChainState externer Vorgaenger (gecacht, erkennt Aenderungen per mtime)
+
+    def _record(name, status):
+        observed[name] = status
+        for event in waiters:
+            event.set()
+
+    def _on_status(name, previous, status):
+        if name in configs:
+            loop.call_soon_threadsafe(_record, name, status)
+
+    async def _await_upstream(name):
+        after, accepted = deps[name]
+        for upstream in after:
+            external = upstream not in configs
+            while True:
+                if external:
+                    if upstream not in external_states:
+                        external_states[upstream] = ChainState(upstream, base_dir)
+                    status = external_states[upstream].get_status()
+                else:
+                    status = observed.get(upstream)
+                if status in accepted:
+                    break
+                if status in TERMINAL_STATUSES:
+                    return f"{upstream}={status}"
+                event = asyncio.Event()
+                waiters.add(event)
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=poll_interval if external else None)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    waiters.discard(event)
+        return None
+
+    async def _run_node(name):
+        after, accepted = deps[name]
+        if after:
+            log(f"WARTE AUF: {', '.join(after)} (Status: {'/'.join(sorted(accepted))})", name)
+        blocker = await _await_upstream(name)
+        if blocker:
+            log(f"ABHAENGIGKEIT NICHT ERFUELLT ({blocker}) -> Kette wird nicht gestartet", name)
+            _record(name, "SKIPPED")
+            return 1
+        if after:
+            log(f"ABHAENGIGKEITEN ERFUELLT -> starte Kette", name)
         try:
-            config = load_chain(name)
-            max_rounds = config.get("max_rounds", "?")
-            max_runtime = f"{config.get('runtime_hours', '?')}h"
-        except FileNotFoundError:
-            max_rounds = "?"
-            max_runtime = "?"
-
-        print("=" * 50)
-        print(f"  KETTE: {name}")
-        print("=" * 50)
-        print(f"  Status:       {status}")
-        print(f"  Runde:        {runde} / {max_rounds}")
-        print(f"  Laufzeit:     {runtime} / {max_runtime} max")
-        print(f"  Letztes Glied: {last_role}")
-        print(f"  Letzter Task: {last_task}")
-        print(f"  Task-Status:  {last_status}")
-
-        if state.is_stop_requested():
-            print(f"  !!! STOP: {state.get_stop_reason()}")
-
-        print("=" * 50)
-        print()
-
-    return 0
+            return await run_chain_async(name, limiter=limiter)
+        finally:
+            # Kette ohne Endstatus (Konfigurationsfehler, Absturz) blockiert Nachfolger nicht ewig
+            if observed.get(name) not in TERMINAL_STATUSES:
+                _record(name, "FAILED")
 
-
-def stop_chain(chain_name, reason=None):
-    """Erstellt STOP-Datei fuer eine Kette."""
+    add_status_listener(_on_status)
+    try:
+        tasks = {name: asyncio.create_task(_run_node(name), name=name) for name in chain_names}
+        results = {}
+        for name, task in tasks.items():
+            try:
+                results[name] = await task
+            except Exception as e:
+                # Eine abgestuerzte Kette darf die anderen nicht mitreissen
+                log(f"SCHEDULER: Kette abgebrochen mit Fehler: {e}", name)
+                results[name] = 1
+        return results
+    finally:
+        remove_status_listener(_on_status)
+
+
+def stop_chain(chain_name, reason=None, hard=False):
+    """Erstellt STOP-Datei fuer eine Kette (hard: laufendes Glied abbrechen)."""
     base_dir = Path(__file__).parent.parent
     state = ChainState(chain_name, base_dir)
     reason = reason or "Manuell gestoppt via llmauto"
-    state.request_stop(reason)
+    state.request_stop(reason, hard=hard)
     print(f"STOP-Datei erstellt fuer '{chain_name}'.")
-    print(f"Pipeline stoppt nach aktuellem Glied.")
+    if hard:
+        print(f"HARD-STOP: Laufendes Glied wird abgebrochen.")
+    else:
+        print(f"Pipeline stoppt nach aktuellem Glied.")
     print(f"Grund: {reason}")
     return 0
 
 
-def show_log(chain_name, lines=20):
-    """Zeigt Log-Eintraege einer Kette."""
-    log_file = LOG_DIR / f"{chain_name}.log"
-    if not log_file.exists():
-        print(f"Kein Log fuer '{chain_name}' vorhanden.")
+def validate_chain(chain_name):
+    """Prueft eine Kette vor dem Start (Prompts, Links, Abhaengigkeiten).
+
+    Returns: 0 wenn alles in Ordnung ist, sonst 1
+    """
+    try:
+        config = load_chain(chain_name)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"FEHLER: {e}")
+        return 1
+    links = config.get("links", [])
+    problems = []
+    if not links:
+        problems.append("Kette hat keine Glieder (links)")
+    registry = PromptRegistry(config, Path(__file__).parent.parent, chain_name=chain_name)
+    problems.extend(registry.validate(links))
+    pools = config.get("task_pools", {}) or {}
+    for link in links:
+        pool_name = link.get("task_pool")
+        if pool_name and pool_name not in pools:
+            problems.append(f"{link.get('name', '?')}: Aufgabenpool '{pool_name}' nicht in task_pools definiert")
+    used = {link.get("task_pool") for link in links}
+    for pool_name, pool_config in pools.items():
+        if pool_name not in used:
+            continue
+        pool_type = pool_config.get("type", "file")
+        if pool_type not in SUPPORTED_POOL_TYPES:
+            problems.append(f"Aufgabenpool '{pool_name}': Typ '{pool_type}' wird nicht unterstuetzt")
+        elif pool_type != "list" and not TaskPool.resolve_path(
+                pool_config.get("path", ""), Path(__file__).parent.parent).exists():
+            problems.append(f"Aufgabenpool '{pool_name}': Pfad nicht gefunden: {pool_config.get('path', '')}")
+    after, _ = chain_dependencies(config)
+    known = set(list_chains())
+    for upstream in after:
+        if upstream not in known:
+            problems.append(f"after: Kette '{upstream}' nicht in chains/ (wird nur extern beobachtet)")
+
+    if not problems:
+        print(f"Kette '{chain_name}': OK ({len(links)} Glieder)")
         return 0
-    content = log_file.read_text(encoding="utf-8").strip().split("\n")
-    for line in content[-lines:]:
-        print(line)
-    return 0
+    print(f"Kette '{chain_name}': {len(problems)} Problem(e)")
+    for problem in problems:
+        print(f"  - {problem}")
+    return 1
 
 
 def reset_chain(chain_name):
     """Setzt State einer Kette zurueck."""
     base_dir = Path(__file__).parent.parent
-    state = ChainState(chain_name, base_dir)
+    state = ChainState(chain_name, base_dir,
+                       mirror_legacy=load_global_config().get("state_legacy_files", True))
     state.reset()
     print(f"Kette '{chain_name}' zurueckgesetzt auf Runde 0.")
     print(f"Starten mit: llmauto chain start {chain_name}")
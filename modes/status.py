@@ -0,0 +1,202 @@
+"""
+llmauto.modes.status -- Schnelle Statusabfragen
+=================================================
+``chain status``, ``chain list``, ``chain log`` und ``status`` ohne die
+Ketten-Engine: geladen werden nur State, Config und Logs (keine Runner, kein
+asyncio). Skripte, die regelmaessig pollen, nutzen ``--field status`` (nur der
+Wert) oder ``--json`` statt die Textausgabe zu zerlegen.
+"""
+import json
+import sys
+from pathlib import Path
+
+from ..core.catalog import chain_catalog
+from ..core.config import load_chain
+from ..core.logfiles import follow, tail_lines
+from ..core.state import ChainState, cache_hit_rate
+
+
+BASE_DIR = Path(__file__).parent.parent
+LOG_DIR = BASE_DIR / "logs"
+
+
+def chain_names(base_dir=None):
+    """Ketten mit State-Verzeichnis ("_"-Verzeichnisse sind interne Daten, z.B. _governor)."""
+    state_dir = (base_dir or BASE_DIR) / "state"
+    if not state_dir.exists():
+        return []
+    return sorted(d.name for d in state_dir.iterdir() if d.is_dir() and not d.name.startswith("_"))
+
+
+def _handoff_summary(handoff):
+    """Letzte Rolle, Task und Task-Status aus dem Handoff."""
+    last_task, last_status, last_role = None, None, None
+    for line in handoff.split("\n"):
+        if line.startswith("## Task:"):
+            last_task = line.split(":", 1)[1].strip()
+        elif line.startswith("## Status:") or line.startswith("## Urteil:"):
+            last_status = line.split(":", 1)[1].strip()
+        elif line.startswith("## Rolle:"):
+            last_role = line.split(":", 1)[1].strip()
+    return last_role, last_task, last_status
+
+
+def chain_status(name, base_dir=None):
+    """Status einer Kette als dict (Grundlage fuer Text- und JSON-Ausgabe)."""
+    base_dir = base_dir or BASE_DIR
+    info = {
+        "name": name, "status": "UNKNOWN", "round": 0, "max_rounds": None,
+        "runtime_hours": None, "max_runtime_hours": None, "start_time": None,
+        "last_role": None, "last_task": None, "last_status": None,
+        "stop_requested": False, "stop_reason": None, "pools": {}, "usage": {},
+    }
+    config = None
+    try:
+        config = load_chain(name)
+        info["max_rounds"] = config.get("max_rounds")
+        info["max_runtime_hours"] = config.get("runtime_hours")
+    except FileNotFoundError:
+        pass
+
+    # Ohne State-Verzeichnis: Kette lief noch nie (nichts anlegen)
+    if not (base_dir / "state" / name).is_dir():
+        return info
+    state = ChainState(name, base_dir)
+    info["status"] = state.get_status()
+    info["round"] = state.get_round()
+    info["start_time"] = state.get_start_time()
+    if info["start_time"]:
+        info["runtime_hours"] = round(state.get_runtime_hours(), 3)
+    info["last_role"], info["last_task"], info["last_status"] = _handoff_summary(state.get_handoff())
+    info["usage"] = state.get_usage()
+    if state.is_stop_requested():
+        info["stop_requested"] = True
+        info["stop_reason"] = state.get_stop_reason()
+
+    pools_dir = state.state_dir / "pools"
+    if pools_dir.exists() and config is not None:
+        from ..core.taskpool import TaskPool
+        for pool_name, pool_config in config.get("task_pools", {}).items():
+            if not (pools_dir / f"{pool_name}.json").exists():
+                continue
+            try:
+                # Nur lesen: kein Pool-Lock, kein Abgleich mit der Quelle
+                pool = TaskPool(pool_name, pool_config, state.state_dir, base_dir)
+                info["pools"][pool_name] = pool.read_counts()
+            except (ValueError, OSError):
+                continue
+    return info
+
+
+def _usage_line(totals):
+    """Token, Cache-Anteil und Kosten einer Verbrauchssumme (core.state.add_usage)."""
+    tokens_in = (totals.get("input_tokens", 0) + totals.get("cache_read_input_tokens", 0)
+                 + totals.get("cache_creation_input_tokens", 0))
+    return (f"{tokens_in} ein / {totals.get('output_tokens', 0)} aus, "
+            f"Cache {cache_hit_rate(totals):.0%}, {totals.get('cost_usd', 0):.4f}$ "
+            f"({totals.get('calls', 0)} Aufrufe, {totals.get('num_turns', 0)} Turns)")
+
+
+def _print_status(info):
+    max_rounds = info["max_rounds"] if info["max_rounds"] is not None else "?"
+    max_runtime = f"{info['max_runtime_hours']}h" if info["max_runtime_hours"] is not None else "?"
+    runtime = f"{info['runtime_hours']:.1f}h" if info["runtime_hours"] is not None else "-"
+    print("=" * 50)
+    print(f"  KETTE: {info['name']}")
+    print("=" * 50)
+    print(f"  Status:       {info['status']}")
+    print(f"  Runde:        {info['round']} / {max_rounds}")
+    print(f"  Laufzeit:     {runtime} / {max_runtime} max")
+    print(f"  Letztes Glied: {info['last_role'] or '-'}")
+    print(f"  Letzter Task: {info['last_task'] or '-'}")
+    print(f"  Task-Status:  {info['last_status'] or '-'}")
+    for pool_name, counts in info["pools"].items():
+        print(f"  Pool {pool_name}: {counts['open']} offen, {counts['claimed']} in Arbeit, "
+              f"{counts['done']} erledigt, {counts['failed']} fehlgeschlagen")
+    usage = info["usage"]
+    if usage.get("total"):
+        print(f"  Verbrauch:    {_usage_line(usage['total'])}")
+        rounds = usage.get("rounds") or {}
+        if rounds:
+            last = max(rounds, key=int)
+            print(f"  Runde {last}:".ljust(16) + _usage_line(rounds[last]))
+        for link_name, totals in (usage.get("links") or {}).items():
+            print(f"    {link_name}: {_usage_line(totals)}")
+    if info["stop_requested"]:
+        print(f"  !!! STOP: {info['stop_reason']}")
+    print("=" * 50)
+    print()
+
+
+def _field_value(value):
+    """Feldwert fuer ``--field``: Text ohne Anfuehrungszeichen, Strukturen als JSON."""
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list, bool)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def show_status(chain_name=None, as_json=False, field=None):
+    """Zeigt Status einer oder aller Ketten (``field``: nur dieses Feld einer Kette)."""
+    if field is not None:
+        if not chain_name:
+            print("Fehler: --field braucht einen Ketten-Namen.", file=sys.stderr)
+            return 1
+        info = chain_status(chain_name)
+        if field not in info:
+            print(f"Fehler: unbekanntes Feld '{field}' (moeglich: {', '.join(info)})", file=sys.stderr)
+            return 1
+        print(_field_value(info[field]))
+        return 0
+    names = [chain_name] if chain_name else chain_names()
+    infos = [chain_status(name) for name in names]
+    if as_json:
+        print(json.dumps(infos[0] if chain_name else infos, ensure_ascii=False, indent=2))
+        return 0
+    if not infos:
+        print("Keine laufenden oder beendeten Ketten gefunden.")
+        return 0
+    for info in infos:
+        _print_status(info)
+    return 0
+
+
+def show_chain_list(as_json=False):
+    """Listet gespeicherte Ketten (Text oder JSON, aus dem Ketten-Index)."""
+    entries = chain_catalog()
+    if as_json:
+        print(json.dumps(entries, ensure_ascii=False, indent=2))
+        return 0
+    if not entries:
+        print("Keine gespeicherten Ketten gefunden.")
+        print(f"Ketten-Verzeichnis: {BASE_DIR / 'chains'}")
+        return 0
+    print("Gespeicherte Ketten:")
+    for entry in entries:
+        if "error" in entry:
+            print(f"  {entry['name']:25s}  (Fehler beim Laden)")
+        else:
+            print(f"  {entry['name']:25s}  {entry['links']} Glieder, {entry['mode']:8s}  {entry['description']}")
+    return 0
+
+
+def show_log(chain_name, lines=20, follow_log=False, link=None):
+    """Zeigt Log-Eintraege einer Kette (oder eines Links) und folgt optional.
+
+    Liest nur das Dateiende (blockweise rueckwaerts), auch bei grossen Logs.
+    """
+    log_file = LOG_DIR / (f"{chain_name}_{link}.log" if link else f"{chain_name}.log")
+    if not log_file.exists() and not follow_log:
+        print(f"Kein Log fuer '{log_file.stem}' vorhanden.")
+        return 0
+    if log_file.exists():
+        for line in tail_lines(log_file, lines):
+            print(line)
+    if follow_log:
+        try:
+            for line in follow(log_file):
+                print(line, flush=True)
+        except KeyboardInterrupt:
+            pass
+    return 0
@@ -0,0 +1,80 @@
+"""
+llmauto.modes.supervisor -- Mehrere Ketten in einem Prozess
+============================================================
+Fuehrt N Ketten gleichzeitig in einer einzigen asyncio Event-Loop aus.
+Die Claude-Aufrufe aller Ketten laufen ueber asyncio.create_subprocess_exec,
+ein globales Semaphore begrenzt die Anzahl gleichzeitiger CLI-Prozesse.
+Abhaengigkeiten zwischen Ketten (after/on_status) werden ereignisgesteuert
+aufgeloest (siehe chain.run_chain_graph).
+Ersetzt einzelne Interpreter pro Kette (chain start --bg) und Polling-Skripte.
+"""
+import asyncio
+
+from ..core.config import load_chain, load_global_config
+from . import chain as chain_mode
+
+
+async def supervise(chain_names, max_concurrent=0):
+    """Fuehrt alle Ketten nebenlaeufig aus und wartet auf ihr Ende.
+
+    Args:
+        chain_names: Liste von Ketten-Namen
+        max_concurrent: Max. gleichzeitige CLI-Prozesse ueber alle Ketten (0 = unbegrenzt)
+
+    Returns: dict {chain_name: exit_code}
+    """
+    limiter = asyncio.Semaphore(max_concurrent) if max_concurrent > 0 else None
+    return await chain_mode.run_chain_graph(chain_names, limiter=limiter)
+
+
+def run_supervisor(chain_names, max_concurrent=None, with_deps=False):
+    """Startet den Supervisor fuer die angegebenen Ketten (CLI-Einstieg).
+
+    Mit ``with_deps`` werden alle Vorgaenger-Ketten (after) mitgestartet.
+    """
+    names = list(dict.fromkeys(chain_names))  # Reihenfolge behalten, Duplikate entfernen
+    if not names:
+        print("Fehler: Mindestens ein Ketten-Name erforderlich.")
+        return 1
+    if with_deps:
+        try:
+            names = chain_mode.expand_dependencies(names)
+        except FileNotFoundError as e:
+            print(f"Fehler: {e}")
+            return 1
+
+    dependencies = {}
+    for name in names:
+        try:
+            config = load_chain(name)
+        except FileNotFoundError as e:
+            print(f"Fehler: {e}")
+            return 1
+        if not config.get("links"):
+            print(f"Fehler: Kette '{name}' hat keine Glieder (links).")
+            return 1
+        dependencies[name] = chain_mode.chain_dependencies(config)[0]
+    try:
+        chain_mode.check_dependency_cycles(dependencies)
+    except ValueError as e:
+        print(f"Fehler: {e}")
+        return 1
+
+    if max_concurrent is None:
+        max_concurrent = load_global_config().get("supervisor_max_concurrent", 0)
+
+    # Mehrere Ketten schreiben auf dieselbe Konsole: Ketten-Namen voranstellen
+    chain_mode.CONSOLE_CHAIN_PREFIX = True
+    limit = max_concurrent if max_concurrent > 0 else "unbegrenzt"
+    print(f"Supervisor: {len(names)} Ketten ({', '.join(names)}), max. {limit} gleichzeitige Aufrufe")
+
+    try:
+        results = asyncio.run(supervise(names, max_concurrent))
+    except KeyboardInterrupt:
+        print("Supervisor gestoppt (Ctrl+C). Laufende Ketten wurden auf STOPPED gesetzt.")
+        return 0
+
+    print("Supervisor beendet:")
+    for name, code in results.items():
+        print(f"  {name:25s}  exit={code}")
+    return 0 if all(code == 0 for code in results.values()) else 1
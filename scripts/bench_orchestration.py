@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+llmauto Orchestrierungs-Benchmark -- Thin Wrapper.
+
+Die Logik liegt in llmauto.core.bench.
+Standalone-Aufruf: python scripts/bench_orchestration.py [--links 1,10,100] [--rounds 5]
+"""
+import json
+import sys
+from pathlib import Path
+
+# Sicherstellen dass llmauto importierbar ist (Elternverzeichnis des Pakets)
+_root = str(Path(__file__).absolute().parent.parent.parent)
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+from llmauto.core.bench import (
+    DEFAULT_LINK_COUNTS, DEFAULT_ROUNDS, format_report, run_benchmark,
+)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="llmauto Orchestrierungs-Benchmark (Fake-CLI)")
+    parser.add_argument("--links", default=",".join(str(n) for n in DEFAULT_LINK_COUNTS),
+                        help="Kettengroessen, kommagetrennt (Standard: 1,10,100)")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="Runden pro Kette")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Antwortzeit der Fake-CLI in Sekunden")
+    parser.add_argument("--output-bytes", type=int, default=200, help="Antwortgroesse der Fake-CLI")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Speichermessung (zweiter Durchlauf mit tracemalloc) auslassen")
+    parser.add_argument("--json", action="store_true", help="Ergebnisse als JSON ausgeben")
+    args = parser.parse_args()
+
+    link_counts = [int(n) for n in args.links.split(",") if n.strip()]
+
+    def progress(result):
+        if not args.json:
+            print(f"  {result['links']} Glieder x {result['rounds']} Runden: "
+                  f"{result['wall_s']:.2f}s", file=sys.stderr)
+
+    results = run_benchmark(link_counts, rounds=args.rounds, latency=args.latency,
+                            output_bytes=args.output_bytes, memory=not args.no_memory,
+                            progress=progress)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(format_report(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
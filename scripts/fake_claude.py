@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+llmauto Fake-Claude -- Ersatz fuer die ``claude`` CLI.
+
+Versteht die Aufrufe von ClaudeRunner (``-p <prompt>``, ``--output-format
+text|json|stream-json``, ``--input-format stream-json`` fuer warme Sitzungen)
+und antwortet ohne Modell. Damit lassen sich Ketten, Runner und Benchmarks
+ohne API-Kosten ausfuehren.
+
+Aktivieren:
+    export LLMAUTO_CLAUDE_CMD="python /pfad/zu/llmauto/scripts/fake_claude.py"
+    (oder "claude_cmd" in config.json)
+
+Verhalten per Umgebungsvariable:
+    FAKE_CLAUDE_LATENCY       Sekunden pro Antwort (Standard 0)
+    FAKE_CLAUDE_OUTPUT_BYTES  Groesse der Antwort in Bytes (Standard 200)
+    FAKE_CLAUDE_EXIT_CODE     Exit-Code (Standard 0; != 0 = Fehlschlag)
+    FAKE_CLAUDE_STDERR        Text auf stderr (z.B. "API Error: 429 rate limit")
+    FAKE_CLAUDE_COST_USD      Kosten pro Antwort in total_cost_usd (Standard 0)
+    FAKE_CLAUDE_HANDOFF       "auto" (Standard): Handoff-Pfad aus dem Prompt
+                              (state/<kette>/handoff.md) ergaenzen;
+                              ein Pfad: diese Datei ergaenzen; "" = nie
+
+Bewusst nur Standardbibliothek und ohne Import von llmauto (schneller Start).
+"""
+import json
+import os
+import re
+import sys
+import time
+import uuid
+
+# Flags der CLI, die einen Wert erwarten
+_VALUE_FLAGS = {"--model", "--fallback-model", "--permission-mode", "--allowedTools",
+                "--input-format", "--output-format"}
+_HANDOFF_RE = re.compile(r"state[/\\]([\w.-]+)[/\\]handoff\.md")
+_FILLER = "Fake-Antwort fuer Benchmarks. "
+
+
+def parse_args(argv):
+    """Returns: (optionen dict, prompt oder None)"""
+    options, prompt = {}, None
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in _VALUE_FLAGS and i + 1 < len(argv):
+            options[arg] = argv[i + 1]
+            i += 2
+            continue
+        if arg == "-p":
+            # Prompt folgt direkt auf -p (fehlt bei --input-format stream-json)
+            if i + 1 < len(argv) and argv[i + 1] not in _VALUE_FLAGS and not argv[i + 1].startswith("--"):
+                prompt = argv[i + 1]
+                i += 1
+        elif arg.startswith("--"):
+            options[arg] = True
+        i += 1
+    return options, prompt
+
+
+def _env_number(name, default, cast):
+    try:
+        return cast(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def answer_text(prompt, size):
+    text = f"OK: {prompt[:60]!r}\n"
+    if size > len(text):
+        repeats = (size - len(text)) // len(_FILLER) + 1
+        text += (_FILLER * repeats)[:size - len(text)]
+    return text
+
+
+def write_handoff(prompt, model):
+    """Ergaenzt den Handoff wie ein Agent (Rolle, Task, Status)."""
+    target = os.environ.get("FAKE_CLAUDE_HANDOFF", "auto")
+    if not target:
+        return
+    if target == "auto":
+        match = _HANDOFF_RE.search(prompt)
+        if not match:
+            return
+        target = match.group(0)
+    try:
+        with open(target, "a", encoding="utf-8") as f:
+            f.write(f"\n## Rolle: fake ({model})\n## Task: {prompt[:40]!r}\n## Status: DONE\n")
+    except OSError:
+        pass
+
+
+def respond(prompt, model):
+    """Eine Antwort erzeugen. Returns: (exit_code, text, usage)"""
+    latency = _env_number("FAKE_CLAUDE_LATENCY", 0.0, float)
+    if latency > 0:
+        time.sleep(latency)
+    exit_code = _env_number("FAKE_CLAUDE_EXIT_CODE", 0, int)
+    text = answer_text(prompt, _env_number("FAKE_CLAUDE_OUTPUT_BYTES", 200, int))
+    if exit_code == 0:
+        write_handoff(prompt, model)
+    usage = {"input_tokens": len(prompt) // 4 + 1, "output_tokens": len(text) // 4 + 1,
+             "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+    return exit_code, text, usage
+
+
+def result_event(exit_code, text, usage, started, session_id):
+    return {
+        "type": "result",
+        "subtype": "success" if exit_code == 0 else "error_during_execution",
+        "is_error": exit_code != 0,
+        "result": text,
+        "duration_ms": int((time.monotonic() - started) * 1000),
+        "num_turns": 1,
+        "session_id": session_id,
+        "total_cost_usd": _env_number("FAKE_CLAUDE_COST_USD", 0.0, float),
+        "usage": usage,
+    }
+
+
+def _emit(event):
+    sys.stdout.write(json.dumps(event, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def run_session(model, session_id):
+    """Streaming-Eingabe: eine Antwort pro JSON-Zeile auf stdin (warme Sitzung)."""
+    _emit({"type": "system", "subtype": "init", "model": model, "session_id": session_id})
+    for line in sys.stdin:
+        try:
+            message = json.loads(line)
+            prompt = "".join(block.get("text", "") for block in message["message"]["content"])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            continue
+        started = time.monotonic()
+        exit_code, text, usage = respond(prompt, model)
+        if exit_code == 0:
+            _emit({"type": "assistant", "message": {"content": [{"type": "text", "text": text}]}})
+        _emit(result_event(exit_code, text, usage, started, session_id))
+    return 0
+
+
+def main(argv=None):
+    options, prompt = parse_args(sys.argv[1:] if argv is None else argv)
+    model = options.get("--model", "fake")
+    output_format = options.get("--output-format", "text")
+    session_id = str(uuid.uuid4())
+    if options.get("--input-format") == "stream-json":
+        return run_session(model, session_id)
+    if prompt is None:
+        prompt = sys.stdin.read()
+
+    started = time.monotonic()
+    exit_code, text, usage = respond(prompt, model)
+    stderr = os.environ.get("FAKE_CLAUDE_STDERR")
+    if stderr is None and exit_code != 0:
+        stderr = f"Fake-Fehler (Exit-Code {exit_code})"
+    if stderr:
+        sys.stderr.write(stderr + "\n")
+
+    if output_format == "json":
+        _emit(result_event(exit_code, text, usage, started, session_id))
+    elif output_format == "stream-json":
+        _emit({"type": "system", "subtype": "init", "model": model, "session_id": session_id})
+        _emit({"type": "assistant", "message": {"content": [{"type": "text", "text": text}]}})
+        _emit(result_event(exit_code, text, usage, started, session_id))
+    elif exit_code == 0:
+        sys.stdout.write(text)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,7 +15,7 @@ log() {
 log "=== Polling gestartet: Warte auf review-only COMPLETED ==="
 
 while true; do
-    STATUS=$(cd "$LLMAUTO_DIR" && PYTHONIOENCODING=utf-8 python -m llmauto chain status review-only 2>&1 | grep "Status:" | head -1 | awk '{print $NF}')
+    STATUS=$(cd "$LLMAUTO_DIR" && PYTHONIOENCODING=utf-8 python -m llmauto chain status review-only --field status 2>/dev/null)
 
     if [ "$STATUS" = "COMPLETED" ]; then
         log "review-only Chain COMPLETED! Starte Konsistenz-Check Opus..."
@@ -15,7 +15,7 @@ wait_for_chain() {
     local chain_name="$1"
     log "Warte auf $chain_name COMPLETED..."
     while true; do
-        STATUS=$(cd "$LLMAUTO_DIR" && PYTHONIOENCODING=utf-8 python -m llmauto chain status "$chain_name" 2>&1 | grep "Status:" | head -1 | awk '{print $NF}')
+        STATUS=$(cd "$LLMAUTO_DIR" && PYTHONIOENCODING=utf-8 python -m llmauto chain status "$chain_name" --field status 2>/dev/null)
         if [ "$STATUS" = "COMPLETED" ]; then
             log "$chain_name: COMPLETED!"
             return 0
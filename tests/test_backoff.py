@@ -0,0 +1,100 @@
+"""Tests fuer llmauto.core.backoff -- Klassifizierung und Backoff-Policies."""
+import pytest
+
+from llmauto.core.backoff import (
+    ABORTED, ERROR, OK, PERMANENT, TIMEOUT, TRANSIENT,
+    BackoffPolicy, FixedPolicy, ModelCooldowns, classify, make_policy,
+)
+
+
+def _result(returncode=0, stderr="", output=""):
+    return {"success": returncode == 0, "returncode": returncode,
+            "stderr": stderr, "output": output, "duration_s": 1.0, "model": "m"}
+
+
+class TestClassify:
+    @pytest.mark.parametrize("result, kind", [
+        (_result(0), OK),
+        (_result(-2, "claude CLI nicht gefunden"), PERMANENT),
+        (_result(-4), ABORTED),
+        (_result(-1, "TIMEOUT nach 10s"), TIMEOUT),
+        (_result(1, "API Error: 429 Too Many Requests"), TRANSIENT),
+        (_result(1, "Overloaded"), TRANSIENT),
+        (_result(1, "Invalid API key"), PERMANENT),
+        (_result(1, "irgendwas"), ERROR),
+    ])
+    def test_kinds(self, result, kind):
+        assert classify(result) == kind
+
+    def test_model_answer_is_not_classified(self):
+        # Die Antwort eines Workers darf von Auth/Rate-Limits handeln
+        result = _result(1, "", output="Fixed authentication; handle 503 and rate limit")
+        assert classify(result) == ERROR
+
+    def test_structured_error_field(self):
+        result = dict(_result(1), error="Invalid API key · Please run /login")
+        assert classify(result) == PERMANENT
+
+
+class TestBackoffPolicy:
+    def _policy(self, **kw):
+        return BackoffPolicy(jitter=0, cooldowns=ModelCooldowns(), **kw)
+
+    def test_success_has_no_delay(self):
+        decision = self._policy().record(_result(0), "m")
+        assert decision == (OK, 0.0, False)
+
+    def test_exponential_and_capped(self):
+        policy = self._policy(base_seconds=5, factor=2, max_seconds=30)
+        delays = [policy.record(_result(1, "rate limit"), "m").delay for _ in range(5)]
+        assert delays == [5, 10, 20, 30, 30]
+
+    def test_success_resets_failures(self):
+        policy = self._policy(base_seconds=5)
+        policy.record(_result(1, "overloaded"), "m")
+        policy.record(_result(0), "m")
+        assert policy.record(_result(1, "overloaded"), "m").delay == 5
+
+    def test_transient_sets_shared_model_cooldown(self):
+        cooldowns = ModelCooldowns()
+        a = BackoffPolicy(jitter=0, base_seconds=60, cooldowns=cooldowns)
+        b = BackoffPolicy(jitter=0, cooldowns=cooldowns)
+        decision = a.record(_result(1, "rate limit"), "opus")
+        assert decision.retry is True
+        assert 59 < b.cooldown_remaining("opus") <= 60
+        assert b.cooldown_remaining("sonnet") == 0
+
+    def test_permanent_and_timeout_no_delay(self):
+        policy = self._policy()
+        assert policy.record(_result(-2), "m") == (PERMANENT, 0.0, False)
+        assert policy.record(_result(-1), "m") == (TIMEOUT, 0.0, False)
+
+    def test_jitter_bounds(self):
+        low = BackoffPolicy(base_seconds=10, jitter=0.2, rng=lambda: 0.0)
+        high = BackoffPolicy(base_seconds=10, jitter=0.2, rng=lambda: 1.0)
+        assert low.backoff_seconds(1) == pytest.approx(8)
+        assert high.backoff_seconds(1) == pytest.approx(12)
+
+
+class TestFixedPolicy:
+    def test_transient_waits_without_retry(self):
+        policy = FixedPolicy(failure_seconds=30, cooldowns=ModelCooldowns())
+        assert policy.record(_result(1, "rate limit"), "m") == (TRANSIENT, 30, False)
+        assert policy.record(_result(1, "irgendwas"), "m") == (ERROR, 30, False)
+
+
+class TestMakePolicy:
+    def test_default(self):
+        policy = make_policy({"base_seconds": 1})
+        assert isinstance(policy, BackoffPolicy)
+        assert policy.base_seconds == 1
+
+    def test_fixed(self):
+        policy = make_policy({"policy": "fixed"})
+        assert isinstance(policy, FixedPolicy)
+        assert policy.step_delay_seconds == 5
+        assert policy.max_retries == 0
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            make_policy({"policy": "gibtsnicht"})
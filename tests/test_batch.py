@@ -0,0 +1,160 @@
+"""Tests fuer llmauto.modes.batch -- Batch-Pipe aus JSONL."""
+import asyncio
+import json
+
+from llmauto.modes.batch import default_output_path, load_done, read_items, run_batch, run_batch_async
+
+
+def _write_jsonl(path, rows):
+    path.write_text("\n".join(r if isinstance(r, str) else json.dumps(r) for r in rows) + "\n",
+                    encoding="utf-8")
+
+
+class _FakeBatchRunner:
+    """Ersetzt den Claude-Aufruf: Prompts mit "fail" schlagen fehl."""
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.running = 0
+        self.max_running = 0
+        self.seen = []
+
+    async def run_item(self, item):
+        if "error" in item:
+            return {"id": item["id"], "success": False, "error": item["error"]}
+        self.seen.append(item["id"])
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delays.get(item["id"], 0.01))
+        self.running -= 1
+        ok = "fail" not in item["prompt"]
+        return {"id": item["id"], "success": ok, "returncode": 0 if ok else 1,
+                "output": item["prompt"].upper(), "model": item.get("model")}
+
+    async def close(self):
+        self.closed = True
+
+
+class TestReadItems:
+    def test_ids_overrides_and_errors(self, tmp_path):
+        path = tmp_path / "in.jsonl"
+        _write_jsonl(path, [
+            {"id": "a", "prompt": "eins", "model": "m"},
+            "\"nur text\"",
+            "kein json",
+            {"id": "leer", "prompt": " "},
+            "",
+            {"prompt": "ohne id"},
+        ])
+        items = list(read_items(path))
+        assert items[0] == {"id": "a", "prompt": "eins", "model": "m"}
+        assert items[1] == {"id": "line-2", "prompt": "nur text"}
+        assert items[2]["id"] == "line-3" and "error" in items[2]
+        assert items[3] == {"id": "leer", "error": "Leerer Prompt"}
+        assert items[4] == {"id": "line-6", "prompt": "ohne id"}
+
+    def test_skips_done(self, tmp_path):
+        path = tmp_path / "in.jsonl"
+        _write_jsonl(path, [{"id": "a", "prompt": "x"}, {"id": "b", "prompt": "y"}])
+        assert [i["id"] for i in read_items(path, done={"a"})] == ["b"]
+
+    def test_counts_skips_in_input(self, tmp_path):
+        path = tmp_path / "in.jsonl"
+        _write_jsonl(path, [{"id": "a", "prompt": "x"}, {"id": "b", "prompt": "y"}])
+        counts = {"skipped": 0}
+        list(read_items(path, done={"a", "weg"}, counts=counts))
+        assert counts["skipped"] == 1
+
+    def test_invalid_fields(self, tmp_path):
+        path = tmp_path / "in.jsonl"
+        _write_jsonl(path, [
+            {"id": "t", "prompt": "x", "timeout": "lang"},
+            {"id": "n", "prompt": "x", "timeout": -5},
+            {"id": "m", "prompt": "x", "model": 3},
+            {"id": "ok", "prompt": "x", "timeout": 60.5},
+        ])
+        items = list(read_items(path))
+        assert [i["id"] for i in items if "error" in i] == ["t", "n", "m"]
+        assert "timeout" in items[0]["error"] and "model" in items[2]["error"]
+        assert items[3] == {"id": "ok", "prompt": "x", "timeout": 60.5}
+
+
+class TestLoadDone:
+    def test_last_record_wins(self, tmp_path):
+        path = tmp_path / "out.jsonl"
+        _write_jsonl(path, [
+            {"id": "a", "success": False}, {"id": "a", "success": True},
+            {"id": "b", "success": True}, {"id": "b", "success": False},
+            '{"id": "c", "succ',  # abgeschnittene Zeile
+        ])
+        assert load_done(path) == {"a"}
+
+    def test_missing_file(self, tmp_path):
+        assert load_done(tmp_path / "fehlt.jsonl") == set()
+
+    def test_default_output_path(self, tmp_path):
+        assert default_output_path(tmp_path / "in.jsonl") == tmp_path / "in.results.jsonl"
+
+
+class TestRunBatch:
+    def test_pool_bounded_and_completion_order(self, tmp_path):
+        path, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+        _write_jsonl(path, [{"id": f"p{i}", "prompt": f"text {i}"} for i in range(6)])
+        runner = _FakeBatchRunner(delays={"p0": 0.2})
+        counts = asyncio.run(run_batch_async(path, out, runner, jobs=3, quiet=True))
+        assert counts == {"ok": 6, "failed": 0, "skipped": 0}
+        assert runner.max_running == 3
+        ids = [json.loads(line)["id"] for line in out.read_text().splitlines()]
+        assert sorted(ids) == [f"p{i}" for i in range(6)]
+        assert ids[-1] == "p0"  # langsamster Eintrag zuletzt fertig
+
+    def test_resume_reruns_only_failed(self, tmp_path):
+        path, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+        _write_jsonl(path, [{"id": "a", "prompt": "ok"}, {"id": "b", "prompt": "fail"}])
+        counts = asyncio.run(run_batch_async(path, out, _FakeBatchRunner(), jobs=2, quiet=True))
+        assert counts == {"ok": 1, "failed": 1, "skipped": 0}
+        runner = _FakeBatchRunner()
+        counts = asyncio.run(run_batch_async(path, out, runner, jobs=2, quiet=True))
+        assert runner.seen == ["b"]
+        assert counts["skipped"] == 1
+        assert len(out.read_text().splitlines()) == 3
+
+    def test_item_exception_does_not_abort_batch(self, tmp_path):
+        path, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+        _write_jsonl(path, [{"id": f"p{i}", "prompt": f"text {i}"} for i in range(4)])
+        runner = _FakeBatchRunner()
+        run_item = runner.run_item
+
+        async def flaky(item):
+            if item["id"] == "p1":
+                raise ValueError("kaputt")
+            return await run_item(item)
+
+        runner.run_item = flaky
+        counts = asyncio.run(run_batch_async(path, out, runner, jobs=2, quiet=True))
+        assert counts == {"ok": 3, "failed": 1, "skipped": 0}
+        records = {r["id"]: r for r in map(json.loads, out.read_text().splitlines())}
+        assert records["p1"]["success"] is False
+        assert records["p1"]["error"] == "ValueError: kaputt"
+
+
+class TestRunBatchOptions:
+    def test_warm_and_cache_rejected(self, tmp_path, monkeypatch, capsys):
+        import llmauto.modes.batch as batch_mode
+
+        monkeypatch.setattr(batch_mode, "load_global_config", lambda: {"pipe_cache": {"enabled": True}})
+        path = tmp_path / "in.jsonl"
+        _write_jsonl(path, [{"id": "a", "prompt": "x"}])
+        assert run_batch(path, use_cache=True, warm=True, quiet=True) == 1
+        assert "--warm" in capsys.readouterr().out
+        assert not (tmp_path / "in.results.jsonl").exists()
+
+    def test_invalid_output_format_fails_at_start(self, tmp_path, monkeypatch, capsys):
+        import llmauto.modes.batch as batch_mode
+
+        monkeypatch.setattr(batch_mode, "load_global_config", lambda: {"output_format": "xml"})
+        path = tmp_path / "in.jsonl"
+        _write_jsonl(path, [{"id": "a", "prompt": "x"}])
+        assert run_batch(path, quiet=True) == 1
+        assert "output_format 'xml'" in capsys.readouterr().out
+        assert not (tmp_path / "in.results.jsonl").exists()
@@ -0,0 +1,45 @@
+"""Tests fuer llmauto.core.bench -- Orchestrierungs-Benchmark mit Fake-CLI."""
+import os
+
+from llmauto.core.bench import (
+    BASE_DIR, bench_config, count_fs_ops, format_report, run_case,
+)
+
+
+class TestBenchConfig:
+    def test_links_and_rounds(self):
+        config = bench_config(3, 7)
+        assert config["chain_name"] == "_bench-3"
+        assert config["max_rounds"] == 7
+        assert [link["name"] for link in config["links"]] == ["link-1", "link-2", "link-3"]
+        assert "state/{CHAIN}/handoff.md" in config["links"][0]["prompt"]
+
+
+class TestCountFsOps:
+    def test_counts_reads_writes_renames(self, tmp_path):
+        path = tmp_path / "a.txt"
+        with count_fs_ops() as counts:
+            path.write_text("x", encoding="utf-8")
+            path.read_text(encoding="utf-8")
+            os.replace(path, tmp_path / "b.txt")
+        assert counts["write"] == 1
+        assert counts["read"] == 1
+        assert counts["rename"] == 1
+
+    def test_inactive_outside_block(self, tmp_path):
+        with count_fs_ops() as counts:
+            pass
+        (tmp_path / "a.txt").write_text("x", encoding="utf-8")
+        assert counts["write"] == 0
+
+
+class TestRunCase:
+    def test_small_chain(self):
+        result = run_case(2, rounds=2, memory=False)
+        assert result["calls"] == 4
+        assert isinstance(result["overhead_ms_per_link"], float)
+        assert result["fs_per_link"]["spawn"] >= 1
+        assert result["mem_peak_kib"] is None
+        # State und Logs der synthetischen Kette sind entfernt
+        assert not (BASE_DIR / "state" / "_bench-2").exists()
+        assert "Overhead" in format_report([result])
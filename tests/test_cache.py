@@ -0,0 +1,73 @@
+"""Tests fuer llmauto.core.cache -- Ergebnis-Cache fuer pipe."""
+import os
+
+from llmauto.core.cache import ResultCache, cache_key, cwd_fingerprint
+
+
+def _result(output="ok", success=True):
+    return {"success": success, "returncode": 0 if success else 1, "output": output,
+            "stderr": "", "duration_s": 30.0, "model": "m"}
+
+
+class TestCacheKey:
+    def test_stable(self, tmp_path):
+        a = cache_key("p", "m", allowed_tools=["Read", "Bash"], cwd=tmp_path)
+        b = cache_key("p", "m", allowed_tools=["Bash", "Read"], cwd=tmp_path)
+        assert a == b and len(a) == 64
+
+    def test_inputs_change_key(self, tmp_path):
+        base = cache_key("p", "m", allowed_tools=["Read"], cwd=tmp_path)
+        assert cache_key("q", "m", allowed_tools=["Read"], cwd=tmp_path) != base
+        assert cache_key("p", "n", allowed_tools=["Read"], cwd=tmp_path) != base
+        assert cache_key("p", "m", allowed_tools=["Edit"], cwd=tmp_path) != base
+        assert cache_key("p", "m", allowed_tools=["Read"], cwd=tmp_path,
+                         permission_mode="plan") != base
+        assert cache_key("p", "m", allowed_tools=["Read"], cwd=tmp_path,
+                         output_format="json") != base
+        assert cache_key("p", "m", allowed_tools=["Read"], cwd=tmp_path,
+                         output_format="text") == base
+
+    def test_cwd_fingerprint_tracks_files(self, tmp_path):
+        before = cwd_fingerprint(tmp_path)
+        (tmp_path / "a.txt").write_text("x")
+        after = cwd_fingerprint(tmp_path)
+        assert before != after
+        assert cwd_fingerprint(tmp_path) == after
+
+
+class TestResultCache:
+    def test_roundtrip(self, tmp_path):
+        cache = ResultCache(tmp_path)
+        assert cache.get("ab" * 32) is None
+        assert cache.put("ab" * 32, _result("antwort"))
+        assert cache.get("ab" * 32)["output"] == "antwort"
+
+    def test_failures_not_stored(self, tmp_path):
+        cache = ResultCache(tmp_path)
+        assert not cache.put("ab" * 32, _result(success=False))
+        assert cache.get("ab" * 32) is None
+
+    def test_ttl(self, tmp_path):
+        cache = ResultCache(tmp_path, ttl_seconds=60)
+        cache.put("ab" * 32, _result(), now=1000)
+        assert cache.get("ab" * 32, now=1050) is not None
+        assert cache.get("ab" * 32, now=1061) is None
+        assert not list(tmp_path.glob("*/*.json"))
+
+    def test_lru_eviction(self, tmp_path):
+        cache = ResultCache(tmp_path, ttl_seconds=0, max_bytes=0)
+        keys = [c * 64 for c in "abc"]
+        for i, key in enumerate(keys):
+            cache.put(key, _result("x" * 100), now=1000 + i)
+        size = os.path.getsize(cache._path(keys[0]))
+        cache.max_bytes = 2 * size
+        # Lesezugriff macht "a" zum zuletzt benutzten Eintrag
+        cache.get(keys[0], now=2000)
+        assert cache.evict(now=2000) == 1
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+
+    def test_clear(self, tmp_path):
+        cache = ResultCache(tmp_path)
+        cache.put("ab" * 32, _result())
+        assert cache.clear() == 1
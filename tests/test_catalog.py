@@ -0,0 +1,57 @@
+"""Tests fuer llmauto.core.catalog -- Ketten-Index mit inkrementellem Cache."""
+import json
+import os
+
+from llmauto.core import catalog
+from llmauto.core.catalog import CATALOG_FILE, chain_catalog
+
+
+def _write_chain(path, **fields):
+    path.write_text(json.dumps(fields), encoding="utf-8")
+
+
+class TestChainCatalog:
+    def test_metadata_and_cache_file(self, tmp_path):
+        _write_chain(tmp_path / "b.json", description="Zwei", mode="once", links=[{}, {}])
+        _write_chain(tmp_path / "a.json", links=[{}])
+        (tmp_path / "notiz.txt").write_text("x")
+        entries = chain_catalog(tmp_path)
+        assert [e["name"] for e in entries] == ["a", "b"]
+        assert entries[0]["mode"] == "loop" and entries[0]["links"] == 1
+        assert entries[1]["description"] == "Zwei" and entries[1]["links"] == 2
+        assert (tmp_path / CATALOG_FILE).exists()
+
+    def test_only_changed_files_are_parsed(self, tmp_path, monkeypatch):
+        _write_chain(tmp_path / "a.json", links=[{}])
+        _write_chain(tmp_path / "b.json", links=[])
+        chain_catalog(tmp_path)
+        parsed = []
+        original = catalog._read_entry
+        monkeypatch.setattr(catalog, "_read_entry", lambda p: parsed.append(p) or original(p))
+        chain_catalog(tmp_path)
+        assert parsed == []
+
+        _write_chain(tmp_path / "b.json", links=[{}, {}, {}], description="neu")
+        st = os.stat(tmp_path / "b.json")
+        os.utime(tmp_path / "b.json", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        entries = {e["name"]: e for e in chain_catalog(tmp_path)}
+        assert [os.path.basename(p) for p in parsed] == ["b.json"]
+        assert entries["b"]["links"] == 3
+
+    def test_removed_and_broken_files(self, tmp_path):
+        _write_chain(tmp_path / "a.json", links=[])
+        _write_chain(tmp_path / "b.json", links=[])
+        chain_catalog(tmp_path)
+        (tmp_path / "a.json").unlink()
+        (tmp_path / "b.json").write_text("{kaputt", encoding="utf-8")
+        entries = chain_catalog(tmp_path)
+        assert [e["name"] for e in entries] == ["b"]
+        assert "error" in entries[0]
+
+    def test_corrupt_cache_is_rebuilt(self, tmp_path):
+        _write_chain(tmp_path / "a.json", links=[{}])
+        (tmp_path / CATALOG_FILE).write_text("kein json", encoding="utf-8")
+        assert chain_catalog(tmp_path)[0]["links"] == 1
+
+    def test_missing_dir(self, tmp_path):
+        assert chain_catalog(tmp_path / "fehlt") == []
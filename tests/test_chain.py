@@ -0,0 +1,361 @@
+"""Tests fuer llmauto.modes.chain -- Ketten-Modus."""
+import pytest
+
+from llmauto.modes.chain import plan_steps
+
+
+class TestPlanSteps:
+    def test_sequential_links(self):
+        links = [{"name": "a"}, {"name": "b"}, {"name": "c"}]
+        steps = plan_steps(links)
+        assert len(steps) == 3
+        assert [s[0][0] for s in steps] == [0, 1, 2]
+
+    def test_parallel_group(self):
+        links = [
+            {"name": "controller"},
+            {"name": "w1", "parallel_group": "workers"},
+            {"name": "w2", "parallel_group": "workers"},
+            {"name": "w3", "parallel_group": "workers"},
+            {"name": "reviewer"},
+        ]
+        steps = plan_steps(links)
+        assert len(steps) == 3
+        assert [link["name"] for _, link in steps[1]] == ["w1", "w2", "w3"]
+
+    def test_non_adjacent_groups_stay_separate(self):
+        links = [
+            {"name": "w1", "parallel_group": "g"},
+            {"name": "mid"},
+            {"name": "w2", "parallel_group": "g"},
+        ]
+        steps = plan_steps(links)
+        assert len(steps) == 3
+
+    def test_empty_group_is_sequential(self):
+        links = [{"name": "a", "parallel_group": ""}, {"name": "b", "parallel_group": ""}]
+        assert len(plan_steps(links)) == 2
+
+
+class TestChainDependencies:
+    def test_defaults(self):
+        from llmauto.modes.chain import chain_dependencies
+        assert chain_dependencies({}) == ([], {"COMPLETED"})
+
+    def test_single_values(self):
+        from llmauto.modes.chain import chain_dependencies
+        after, accepted = chain_dependencies({"after": "review", "on_status": "STOPPED"})
+        assert after == ["review"]
+        assert accepted == {"STOPPED"}
+
+    def test_cycle_detected(self):
+        from llmauto.modes.chain import check_dependency_cycles
+        with pytest.raises(ValueError, match="a -> b -> a"):
+            check_dependency_cycles({"a": ["b"], "b": ["a"]})
+
+    def test_no_cycle(self):
+        from llmauto.modes.chain import check_dependency_cycles
+        check_dependency_cycles({"a": [], "b": ["a"], "c": ["a", "b", "extern"]})
+
+
+class TestRunChainGraph:
+    """Scheduler mit simulierten Ketten (ohne Claude-Aufrufe)."""
+
+    @pytest.fixture
+    def graph(self, tmp_path, monkeypatch):
+        import asyncio
+        from llmauto.core.state import ChainState
+        from llmauto.modes import chain as chain_mode
+
+        configs = {}
+        started = []
+
+        async def fake_run(name, limiter=None):
+            started.append(name)
+            state = ChainState(name, tmp_path)
+            state.set_status("RUNNING")
+            await asyncio.sleep(0.01)
+            state.set_status(configs[name].get("_final", "COMPLETED"))
+            return 0
+
+        monkeypatch.setattr(chain_mode, "load_chain", lambda name: configs[name])
+        monkeypatch.setattr(chain_mode, "run_chain_async", fake_run)
+        monkeypatch.setattr(chain_mode, "log", lambda *a, **k: None)
+
+        def _run(cfgs):
+            configs.update(cfgs)
+            results = asyncio.run(chain_mode.run_chain_graph(list(cfgs)))
+            return results, started
+        return _run
+
+    def test_downstream_starts_after_upstream(self, graph):
+        results, started = graph({
+            "publish": {"after": ["review"]},
+            "review": {},
+        })
+        assert started == ["review", "publish"]
+        assert results == {"publish": 0, "review": 0}
+
+    def test_downstream_skipped_on_wrong_status(self, graph):
+        results, started = graph({
+            "review": {"_final": "STOPPED"},
+            "publish": {"after": "review"},
+        })
+        assert started == ["review"]
+        assert results["publish"] == 1
+
+    def test_on_status_accepts_stopped(self, graph):
+        results, started = graph({
+            "review": {"_final": "STOPPED"},
+            "publish": {"after": "review", "on_status": ["COMPLETED", "STOPPED"]},
+        })
+        assert started == ["review", "publish"]
+
+
+class TestResume:
+    """Checkpoint und ``run_chain_async(resume=True)`` mit simulierten Links."""
+
+    @pytest.fixture
+    def chain(self, tmp_path, monkeypatch):
+        import asyncio
+        from llmauto.core.state import ChainState
+        from llmauto.modes import chain as chain_mode
+
+        config = {"mode": "once", "links": [{"name": "a"}, {"name": "b"}, {"name": "c"}]}
+        calls = []
+        fail_on = set()
+        settings = {}
+
+        async def fake_link(i, link, ctx):
+            calls.append(link["name"])
+            if link["name"] in fail_on:
+                fail_on.discard(link["name"])
+                raise RuntimeError("Absturz")
+            return {"success": True, "returncode": 0}
+
+        monkeypatch.setattr(chain_mode, "load_chain", lambda name: config)
+        monkeypatch.setattr(chain_mode, "load_global_config", lambda: dict(settings))
+        monkeypatch.setattr(chain_mode, "ChainState",
+                            lambda name, base_dir, **kw: ChainState(name, tmp_path, **kw))
+        monkeypatch.setattr(chain_mode, "_run_link", fake_link)
+        monkeypatch.setattr(chain_mode, "log", lambda *a, **k: None)
+        monkeypatch.setattr(chain_mode, "send_telegram_update", lambda *a: None)
+
+        def _run(resume=False, fail=()):
+            calls.clear()
+            fail_on.update(fail)
+            try:
+                asyncio.run(chain_mode.run_chain_async("resume-test", resume=resume))
+            except RuntimeError:
+                pass
+            return list(calls), ChainState("resume-test", tmp_path)
+        _run.settings = settings
+        return _run
+
+    def test_resume_continues_at_unfinished_link(self, chain):
+        calls, state = chain(fail="b")
+        assert calls == ["a", "b"]
+        assert state.finished_links() == {0}
+        assert state.get_cursor()["links"]["1"]["status"] == "running"
+
+        calls, state = chain(resume=True)
+        assert calls == ["b", "c"]
+        assert state.get_status() == "COMPLETED"
+        assert state.get_round() == 1
+        assert state.get_cursor() is None
+
+    def test_resume_keeps_start_time(self, chain):
+        _, state = chain(fail="c")
+        start = state.get_start_time()
+        _, state = chain(resume=True)
+        assert state.get_start_time() == start
+
+    def test_start_without_resume_restarts_round(self, chain):
+        chain(fail="b")
+        calls, _ = chain()
+        assert calls == ["a", "b", "c"]
+
+    def test_tracing_opt_in(self, chain):
+        from llmauto.core import tracing
+
+        _, state = chain()
+        assert tracing.list_traces(state.state_dir) == []
+        chain.settings["tracing"] = {"enabled": True}
+        _, state = chain()
+        assert len(tracing.list_traces(state.state_dir)) == 1
+
+
+class TestParallelGroups:
+    """Fan-out/Fan-in von ``parallel_group`` mit simulierten, schlafenden Links."""
+
+    @pytest.fixture
+    def chain(self, tmp_path, monkeypatch):
+        import asyncio
+        from llmauto.core.state import ChainState
+        from llmauto.modes import chain as chain_mode
+
+        events = []
+        running = {"now": 0, "max": 0}
+
+        async def sleeping_link(i, link, ctx):
+            loop = asyncio.get_running_loop()
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            events.append(("start", link["name"], loop.time()))
+            await asyncio.sleep(0.05)
+            events.append(("end", link["name"], loop.time()))
+            running["now"] -= 1
+            return {"success": True, "returncode": 0}
+
+        monkeypatch.setattr(chain_mode, "load_global_config", lambda: {})
+        monkeypatch.setattr(chain_mode, "ChainState",
+                            lambda name, base_dir, **kw: ChainState(name, tmp_path, **kw))
+        monkeypatch.setattr(chain_mode, "_run_link", sleeping_link)
+        monkeypatch.setattr(chain_mode, "log", lambda *a, **k: None)
+        monkeypatch.setattr(chain_mode, "send_telegram_update", lambda *a: None)
+
+        def _run(max_parallel=0):
+            config = {"mode": "once", "max_parallel": max_parallel, "links": [
+                {"name": "a", "parallel_group": "g"},
+                {"name": "b", "parallel_group": "g"},
+                {"name": "c", "parallel_group": "g"},
+                {"name": "d"},
+            ]}
+            monkeypatch.setattr(chain_mode, "load_chain", lambda name: config)
+            events.clear()
+            running.update(now=0, max=0)
+            asyncio.run(chain_mode.run_chain_async("parallel-test"))
+            times = {(kind, name): t for kind, name, t in events}
+            return times, running["max"]
+        return _run
+
+    def test_group_links_overlap(self, chain):
+        times, peak = chain()
+        assert peak == 3
+        first_end = min(times[("end", name)] for name in "abc")
+        assert all(times[("start", name)] < first_end for name in "abc")
+
+    def test_max_parallel_caps_concurrency(self, chain):
+        times, peak = chain(max_parallel=2)
+        assert peak == 2
+        assert times[("start", "c")] >= min(times[("end", "a")], times[("end", "b")])
+
+    def test_next_step_waits_for_whole_group(self, chain):
+        for max_parallel in (0, 2):
+            times, _ = chain(max_parallel=max_parallel)
+            assert times[("start", "d")] >= max(times[("end", name)] for name in "abc")
+
+
+class TestRetry:
+    def test_backoff_awaited_after_router_switch(self, tmp_path, monkeypatch):
+        import asyncio
+        from llmauto.core.backoff import BackoffPolicy, ModelCooldowns
+        from llmauto.core.prompts import PromptRegistry
+        from llmauto.core.router import ModelRouter
+        from llmauto.core.state import ChainState
+        from llmauto.modes import chain as chain_mode
+
+        results = [
+            {"success": False, "returncode": 1, "output": "", "stderr": "API Error: 429 rate limit",
+             "duration_s": 1.0},
+            {"success": True, "returncode": 0, "output": "ok", "stderr": "", "duration_s": 1.0},
+        ]
+        models, pauses = [], []
+
+        class FakeRunner:
+            def __init__(self, **kwargs):
+                pass
+
+            async def run_async(self, prompt, **overrides):
+                models.append(overrides["model"])
+                return dict(results.pop(0), model=overrides["model"])
+
+        async def fake_pause(ctx, seconds, reason):
+            if seconds > 0:
+                pauses.append((reason, seconds))
+
+        monkeypatch.setattr(chain_mode, "ClaudeRunner", FakeRunner)
+        monkeypatch.setattr(chain_mode, "_pause", fake_pause)
+        monkeypatch.setattr(chain_mode, "log", lambda *a, **k: None)
+        monkeypatch.setattr(chain_mode, "LOG_DIR", tmp_path / "logs")
+        link = {"name": "w", "model": "opus", "prompt": "Aufgabe"}
+        config = {"links": [link]}
+        ctx = {
+            "chain_name": "k", "config": config, "global_config": {"history_enabled": False},
+            "state": ChainState("k", tmp_path), "base_dir": tmp_path, "handoff": "",
+            "prompts": PromptRegistry(config, tmp_path, chain_name="k"),
+            "backoff": BackoffPolicy(jitter=0, base_seconds=5, cooldowns=ModelCooldowns()),
+            "router": ModelRouter(fallbacks={"opus": ["sonnet"]}, failure_threshold=1),
+        }
+        result = asyncio.run(chain_mode._run_link(0, link, ctx))
+        assert result["success"]
+        # Wechsel auf sonnet umgeht den opus-Cooldown; das Backoff wird trotzdem abgewartet
+        assert models == ["opus", "sonnet"]
+        assert pauses == [("backoff", 5)]
+
+
+class TestTaskRelease:
+    """Eine vergebene Aufgabe geht bei jedem Fehler sofort an den Pool zurueck."""
+
+    @pytest.fixture
+    def run_link(self, tmp_path, monkeypatch):
+        import asyncio
+        from llmauto.core.backoff import BackoffPolicy, ModelCooldowns
+        from llmauto.core.prompts import PromptRegistry
+        from llmauto.core.state import ChainState
+        from llmauto.modes import chain as chain_mode
+
+        source = tmp_path / "AUFGABEN.txt"
+        source.write_text("- [ ] a\n", encoding="utf-8")
+        link = {"name": "w", "prompt": "Aufgabe", "task_pool": "plan"}
+        config = {"links": [link], "task_pools": {"plan": {"type": "file", "path": str(source)}}}
+        errors = {}
+
+        class FakeRunner:
+            def __init__(self, **kwargs):
+                pass
+
+            async def run_async(self, prompt, **overrides):
+                if "runner" in errors:
+                    raise errors["runner"]
+                return {"success": True, "returncode": 0, "output": "ok", "stderr": "",
+                        "duration_s": 0.1, "model": overrides["model"]}
+
+        monkeypatch.setattr(chain_mode, "ClaudeRunner", FakeRunner)
+        monkeypatch.setattr(chain_mode, "log", lambda *a, **k: None)
+        monkeypatch.setattr(chain_mode, "LOG_DIR", tmp_path / "logs")
+
+        def _run(**raise_in):
+            errors.clear()
+            errors.update(raise_in)
+            prompts = PromptRegistry(config, tmp_path, chain_name="k")
+            if "template" in errors:
+                def broken(link):
+                    raise errors["template"]
+                prompts.template = broken
+            ctx = {
+                "chain_name": "k", "config": config, "global_config": {"history_enabled": False},
+                "state": ChainState("k", tmp_path), "base_dir": tmp_path, "handoff": "",
+                "prompts": prompts,
+                "backoff": BackoffPolicy(jitter=0, cooldowns=ModelCooldowns()),
+            }
+            try:
+                asyncio.run(chain_mode._run_link(0, link, ctx))
+            except Exception as e:
+                return e, ctx["pools"]["plan"].counts()
+            return None, ctx["pools"]["plan"].counts()
+        return _run
+
+    def test_render_error_releases_task(self, run_link):
+        error, counts = run_link(template=KeyError("TASKS"))
+        assert isinstance(error, KeyError)
+        assert counts["open"] == 1 and counts["claimed"] == 0
+
+    def test_runner_error_releases_task(self, run_link):
+        error, counts = run_link(runner=OSError("kaputt"))
+        assert isinstance(error, OSError)
+        assert counts["open"] == 1 and counts["claimed"] == 0
+
+    def test_success_completes_task(self, run_link):
+        error, counts = run_link()
+        assert error is None and counts["done"] == 1
@@ -41,6 +41,40 @@ class TestNormalizePaths:
         assert _normalize_paths(None) is None
         assert _normalize_paths(True) is True
 
+    @pytest.fixture
+    def homes(self, monkeypatch):
+        from llmauto.core import config
+        monkeypatch.setattr(config, "_KNOWN_USER_HOMES", ["C:\\Users\\User\\", "C:\\Users\\User\\Alt\\"])
+        monkeypatch.setattr(config, "_ACTUAL_HOME", "/home/neu/")
+        return config
+
+    def test_replaces_in_list_order(self, homes):
+        assert _normalize_paths("C:\\Users\\User\\a") == "/home/neu/a"
+        # Wie str.replace nacheinander: das erste Home der Liste gewinnt
+        assert _normalize_paths("x C:\\Users\\User\\Alt\\b y") == "x /home/neu/Alt\\b y"
+        homes._KNOWN_USER_HOMES.reverse()
+        assert _normalize_paths("x C:\\Users\\User\\Alt\\b y") == "x /home/neu/b y"
+
+    def test_unchanged_objects_are_shared(self, homes):
+        prompts = {"p1": "langer Text ohne Pfad", "p2": ["a", "b"]}
+        data = {"prompts": prompts, "links": [{"prompt": "C:\\Users\\User\\x.txt"}]}
+        result = _normalize_paths(data)
+        assert result is not data
+        assert result["prompts"] is prompts
+        assert result["links"][0]["prompt"] == "/home/neu/x.txt"
+        assert data["links"][0]["prompt"] == "C:\\Users\\User\\x.txt"
+        untouched = {"a": ["b", {"c": "d"}]}
+        assert _normalize_paths(untouched) is untouched
+
+    def test_pattern_follows_known_homes(self, homes):
+        assert _normalize_paths("D:\\Home\\x") == "D:\\Home\\x"
+        homes._KNOWN_USER_HOMES.append("D:\\Home\\")
+        assert _normalize_paths("D:\\Home\\x") == "/home/neu/x"
+
+    def test_actual_home_is_not_replaced(self, homes, monkeypatch):
+        monkeypatch.setattr(homes, "_ACTUAL_HOME", "C:\\Users\\User\\")
+        assert _normalize_paths("C:\\Users\\User\\Alt\\b") == "C:\\Users\\User\\b"
+
 
 class TestDefaultGlobalConfig:
     def test_has_required_keys(self):
@@ -52,6 +86,11 @@ class TestDefaultGlobalConfig:
     def test_model_is_current(self):
         assert "claude-sonnet-4-6" in DEFAULT_GLOBAL_CONFIG["default_model"]
 
+    def test_opt_in_features_disabled(self):
+        assert DEFAULT_GLOBAL_CONFIG["output_format"] == "text"
+        assert DEFAULT_GLOBAL_CONFIG["model_router"]["enabled"] is False
+        assert DEFAULT_GLOBAL_CONFIG["tracing"]["enabled"] is False
+
 
 class TestNewLink:
     def test_creates_default_link(self):
@@ -103,6 +142,20 @@ class TestLoadChain:
             load_chain("nonexistent-chain-xyz")
 
 
+class TestLoadChainNormalization:
+    @pytest.mark.parametrize("ensure_ascii", [False, True])
+    def test_non_ascii_home(self, tmp_path, monkeypatch, ensure_ascii):
+        from llmauto.core import config as cfg_module
+        monkeypatch.setattr(cfg_module, "BASE_DIR", tmp_path)
+        monkeypatch.setattr(cfg_module, "_KNOWN_USER_HOMES", ["C:\\Users\\J\u00fcrgen\\"])
+        monkeypatch.setattr(cfg_module, "_ACTUAL_HOME", "/home/neu/")
+        (tmp_path / "chains").mkdir()
+        chain = {"chain_name": "k", "links": [{"name": "w", "prompt": "C:\\Users\\J\u00fcrgen\\a.txt"}]}
+        (tmp_path / "chains" / "k.json").write_text(
+            json.dumps(chain, ensure_ascii=ensure_ascii), encoding="utf-8")
+        assert load_chain("k")["links"][0]["prompt"] == "/home/neu/a.txt"
+
+
 class TestSaveChain:
     def test_save_and_reload(self, tmp_path):
         from llmauto.core import config as cfg_module
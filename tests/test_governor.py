@@ -0,0 +1,100 @@
+"""Tests fuer llmauto.core.governor -- Modell-Slots und Token-Bucket."""
+import asyncio
+import time
+
+from llmauto.core.governor import ModelGovernor
+from llmauto.core.runner import ClaudeRunner
+
+
+def _governor(tmp_path, limits):
+    return ModelGovernor(limits, governor_dir=tmp_path / "_governor", poll=0.01)
+
+
+class TestSlots:
+    def test_unlimited_model_passes_through(self, tmp_path):
+        gov = _governor(tmp_path, {"opus": {"max_concurrent": 1}})
+
+        async def main():
+            lease = await gov.acquire("sonnet")
+            assert lease.slot_path is None
+            await lease.release()
+        asyncio.run(main())
+
+    def test_max_concurrent_fifo(self, tmp_path):
+        # Zwei Instanzen = zwei Prozesse, die sich nur ueber Dateien abstimmen
+        gov_a = _governor(tmp_path, {"opus": {"max_concurrent": 1}})
+        gov_b = _governor(tmp_path, {"opus": {"max_concurrent": 1}})
+        order = []
+
+        async def worker(gov, name, delay):
+            await asyncio.sleep(delay)
+            lease = await gov.acquire("opus")
+            order.append(name)
+            await asyncio.sleep(0.05)
+            await lease.release()
+
+        async def main():
+            await asyncio.gather(worker(gov_a, "a", 0), worker(gov_b, "b", 0.01),
+                                 worker(gov_a, "c", 0.02))
+        asyncio.run(main())
+        assert order == ["a", "b", "c"]
+
+    def test_stale_slot_of_dead_process_is_reclaimed(self, tmp_path):
+        gov = _governor(tmp_path, {"opus": {"max_concurrent": 1}})
+        (tmp_path / "_governor").mkdir()
+        (tmp_path / "_governor" / "opus.slot0").write_text("999999999 0", encoding="ascii")
+
+        async def main():
+            lease = await asyncio.wait_for(gov.acquire("opus"), timeout=5)
+            await lease.release()
+        asyncio.run(main())
+
+    def test_abort_while_waiting(self, tmp_path):
+        gov = _governor(tmp_path, {"*": {"max_concurrent": 1}})
+
+        async def main():
+            first = await gov.acquire("opus")
+            second = await gov.acquire("opus", abort_check=lambda: True)
+            await first.release()
+            return second
+        assert asyncio.run(main()) is None
+        assert list((tmp_path / "_governor" / "opus.queue").iterdir()) == []
+
+    def test_snapshot(self, tmp_path):
+        gov = _governor(tmp_path, {"opus": {"max_concurrent": 2}})
+
+        async def main():
+            lease = await gov.acquire("opus")
+            snap = gov.snapshot()
+            await lease.release()
+            return snap
+        assert asyncio.run(main()) == {"opus": {"active": 1, "waiting": 0, "max": 2}}
+
+
+class TestTokenBucket:
+    def test_rate_limited(self, tmp_path):
+        # 36000/h = 10/s, burst 1 -> zweiter Aufruf wartet ~0.1s
+        gov = _governor(tmp_path, {"haiku": {"requests_per_hour": 36000, "burst": 1}})
+
+        async def main():
+            start = time.monotonic()
+            for _ in range(3):
+                lease = await gov.acquire("haiku")
+                await lease.release()
+            return time.monotonic() - start
+        assert asyncio.run(main()) >= 0.15
+
+
+class TestRunnerIntegration:
+    def test_hard_stop_while_queued(self, tmp_path):
+        gov = _governor(tmp_path, {"*": {"max_concurrent": 1}})
+        runner = ClaudeRunner(model="opus", governor=gov)
+
+        async def main():
+            blocker = await gov.acquire("opus")
+            try:
+                return await runner.run_async("x", abort_check=lambda: True)
+            finally:
+                await blocker.release()
+        result = asyncio.run(main())
+        assert result["returncode"] == -4
@@ -0,0 +1,176 @@
+"""Tests fuer llmauto.core.history -- SQLite Lauf-Historie."""
+import sqlite3
+import threading
+
+import pytest
+
+from llmauto.core import history as history_mod
+from llmauto.core.history import RunHistory, close_shared, percentile, record_result
+
+
+def _result(duration, success=True, model="claude-sonnet-4-6", output="x"):
+    return {
+        "success": success,
+        "output": output,
+        "stderr": "",
+        "returncode": 0 if success else 1,
+        "duration_s": duration,
+        "model": model,
+    }
+
+
+@pytest.fixture
+def history(tmp_path):
+    h = RunHistory(tmp_path / "history.db")
+    yield h
+    h.close()
+
+
+class TestPercentile:
+    def test_empty(self):
+        assert percentile([], 50) == 0.0
+
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 100) == 100
+
+    def test_single_value(self):
+        assert percentile([7.0], 95) == 7.0
+
+
+class TestRecord:
+    def test_record_creates_row(self, history):
+        history.record(_result(12.5, output="hallo"), chain="c", round_no=1, link="w")
+        conn = sqlite3.connect(str(history.db_path))
+        row = conn.execute("SELECT chain, round, link, duration_s, output_bytes FROM runs").fetchone()
+        conn.close()
+        assert row == ("c", 1, "w", 12.5, 5)
+
+    def test_indexes_exist(self, history):
+        history.record(_result(1.0))
+        conn = sqlite3.connect(str(history.db_path))
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        conn.close()
+        assert "idx_runs_chain_ts" in names
+
+
+class TestRecordResult:
+    @pytest.fixture(autouse=True)
+    def _close(self):
+        yield
+        close_shared()
+
+    def test_connection_reused(self, tmp_path, monkeypatch):
+        path = tmp_path / "history.db"
+        migrations = []
+        original = RunHistory._migrate
+        monkeypatch.setattr(RunHistory, "_migrate", lambda self: (migrations.append(1), original(self)))
+        assert record_result(_result(1.0), db_path=path, chain="c", link="w")
+        assert record_result(_result(2.0), db_path=path, chain="c", link="w")
+        assert migrations == [1]
+        assert history_mod._shared[path].link_stats()[0]["runs"] == 2
+
+    def test_writes_from_threads(self, tmp_path):
+        path = tmp_path / "history.db"
+        threads = [threading.Thread(target=record_result, args=(_result(i),),
+                                    kwargs={"db_path": path, "link": "w"}) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        close_shared()
+        h = RunHistory(path)
+        try:
+            assert h.link_stats()[0]["runs"] == 8
+        finally:
+            h.close()
+
+    def test_reconnects_after_error(self, tmp_path):
+        path = tmp_path / "history.db"
+        assert record_result(_result(1.0), db_path=path, link="w")
+        history_mod._shared[path]._conn.close()
+        assert record_result(_result(1.0), db_path=path, link="w") is False
+        assert path not in history_mod._shared
+        assert record_result(_result(1.0), db_path=path, link="w")
+
+
+class TestStats:
+    def test_link_stats_sorted_by_p95(self, history):
+        for d in (10, 20, 30):
+            history.record(_result(d), chain="c", link="schnell")
+        for d in (100, 200, 300):
+            history.record(_result(d), chain="c", link="langsam")
+        history.record(_result(5, success=False), chain="c", link="langsam")
+        stats = history.link_stats()
+        assert stats[0]["link"] == "langsam"
+        assert stats[0]["runs"] == 4
+        assert stats[0]["failures"] == 1
+        assert stats[0]["p95_s"] == 300
+
+    def test_filter_by_chain_and_since(self, history):
+        history.record(_result(1), chain="a", link="w", ts=1000)
+        history.record(_result(2), chain="a", link="w", ts=5000)
+        history.record(_result(3), chain="b", link="w", ts=5000)
+        stats = history.link_stats(chain="a", since=2000)
+        assert len(stats) == 1
+        assert stats[0]["runs"] == 1
+
+    def test_model_stats(self, history):
+        history.record(_result(60, model="opus"), ts=3600)
+        history.record(_result(60, model="opus", success=False), ts=7200)
+        history.record(_result(30, model="sonnet"), ts=7200)
+        stats = {s["model"]: s for s in history.model_stats()}
+        assert stats["opus"]["runs"] == 2
+        assert stats["opus"]["failure_rate"] == 0.5
+        assert stats["sonnet"]["failures"] == 0
+        assert stats["opus"]["throughput_per_h"] > 0
+
+
+def _usage(result, tokens_in, tokens_out, cache_read=0, cost=0.0):
+    result.update(usage={"input_tokens": tokens_in, "output_tokens": tokens_out,
+                         "cache_read_input_tokens": cache_read, "cache_creation_input_tokens": 0},
+                  cost_usd=cost, num_turns=3)
+    return result
+
+
+class TestUsage:
+    def test_record_usage_columns(self, history):
+        history.record(_usage(_result(1.0), 100, 20, cache_read=50, cost=0.5), chain="c", link="w")
+        conn = sqlite3.connect(str(history.db_path))
+        row = conn.execute("SELECT input_tokens, output_tokens, cache_read_tokens, cost_usd, "
+                           "num_turns FROM runs").fetchone()
+        conn.close()
+        assert row == (100, 20, 50, 0.5, 3)
+
+    def test_usage_stats(self, history):
+        history.record(_usage(_result(1.0), 100, 10, cache_read=300, cost=0.25), chain="c", link="teuer")
+        history.record(_usage(_result(1.0), 100, 10, cost=0.25), chain="c", link="teuer")
+        history.record(_usage(_result(1.0), 10, 1, cost=0.01), chain="c", link="billig")
+        history.record(_result(1.0), chain="c", link="text")  # ohne strukturierte Ausgabe
+        stats = history.usage_stats()
+        assert [s["link"] for s in stats] == ["teuer", "billig"]
+        assert stats[0]["runs"] == 2
+        assert stats[0]["cost_usd"] == 0.5
+        assert stats[0]["cache_hit_rate"] == 0.6
+        assert stats[0]["turns_per_run"] == 3
+
+    def test_migrates_old_schema(self, tmp_path):
+        path = tmp_path / "alt.db"
+        conn = sqlite3.connect(str(path))
+        conn.execute("CREATE TABLE runs (id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, "
+                     "chain TEXT, round INTEGER, link TEXT, model TEXT, returncode INTEGER, "
+                     "success INTEGER, duration_s REAL, output_bytes INTEGER, "
+                     "skip_protected INTEGER DEFAULT 0, fallback_used INTEGER DEFAULT 0)")
+        conn.execute("INSERT INTO runs (ts, chain, link, success, duration_s) VALUES (1, 'c', 'w', 1, 2.0)")
+        conn.commit()
+        conn.close()
+        history = RunHistory(path)
+        try:
+            history.record(_usage(_result(1.0), 10, 1, cost=0.1), chain="c", link="w")
+            stats = history.usage_stats()
+            assert stats[0]["runs"] == 1
+            assert history.link_stats()[0]["runs"] == 2
+        finally:
+            history.close()
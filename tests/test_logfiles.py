@@ -0,0 +1,82 @@
+"""Tests fuer llmauto.core.logfiles -- Tail, Follow, Rotation."""
+import threading
+import time
+
+from llmauto.core.logfiles import follow, rotate_if_needed, tail_lines
+
+
+class TestTailLines:
+    def test_last_lines(self, tmp_path):
+        f = tmp_path / "a.log"
+        f.write_text("".join(f"zeile {i}\n" for i in range(1000)), encoding="utf-8")
+        assert tail_lines(f, 3) == ["zeile 997", "zeile 998", "zeile 999"]
+
+    def test_small_blocks_span_lines(self, tmp_path):
+        f = tmp_path / "a.log"
+        f.write_text("".join(f"zeile {i}\n" for i in range(50)), encoding="utf-8")
+        assert tail_lines(f, 5, block_size=7) == [f"zeile {i}" for i in range(45, 50)]
+
+    def test_fewer_lines_than_requested(self, tmp_path):
+        f = tmp_path / "a.log"
+        f.write_text("eins\nzwei\n\n", encoding="utf-8")
+        assert tail_lines(f, 20) == ["eins", "zwei"]
+
+    def test_empty_file(self, tmp_path):
+        f = tmp_path / "a.log"
+        f.write_text("", encoding="utf-8")
+        assert tail_lines(f, 5) == []
+
+    def test_utf8(self, tmp_path):
+        f = tmp_path / "a.log"
+        f.write_text("alt\nGrüße\n", encoding="utf-8")
+        assert tail_lines(f, 1, block_size=3) == ["Grüße"]
+
+
+class TestFollow:
+    def test_yields_appended_lines_and_survives_rotation(self, tmp_path):
+        f = tmp_path / "a.log"
+        f.write_text("alt\n", encoding="utf-8")
+        done = threading.Event()
+        seen = []
+
+        def reader():
+            for line in follow(f, poll=0.01, stop=done.is_set):
+                seen.append(line)
+
+        t = threading.Thread(target=reader)
+        t.start()
+        time.sleep(0.1)
+        with open(f, "a", encoding="utf-8") as fh:
+            fh.write("neu\n")
+        time.sleep(0.1)
+        rotate_if_needed(f, 1, backups=1)
+        f.write_text("nach rotation\n", encoding="utf-8")
+        deadline = time.time() + 5
+        while "nach rotation" not in seen and time.time() < deadline:
+            time.sleep(0.02)
+        done.set()
+        t.join(timeout=5)
+        assert seen == ["neu", "nach rotation"]
+
+
+class TestRotate:
+    def test_disabled(self, tmp_path):
+        f = tmp_path / "a.log"
+        f.write_text("x" * 100)
+        assert rotate_if_needed(f, 0) is False
+        assert f.exists()
+
+    def test_rotates_and_shifts_backups(self, tmp_path):
+        f = tmp_path / "a.log"
+        for content in ("erste", "zweite", "dritte"):
+            f.write_text(content)
+            assert rotate_if_needed(f, 1, backups=2) is True
+        assert not f.exists()
+        assert (tmp_path / "a.log.1").read_text() == "dritte"
+        assert (tmp_path / "a.log.2").read_text() == "zweite"
+        assert not (tmp_path / "a.log.3").exists()
+
+    def test_below_limit(self, tmp_path):
+        f = tmp_path / "a.log"
+        f.write_text("kurz")
+        assert rotate_if_needed(f, 1000) is False
@@ -0,0 +1,121 @@
+"""Tests fuer llmauto.core.prompts -- Prompt-Registry und Templates."""
+import os
+
+from llmauto.core.prompts import (
+    PromptRegistry, Template, UNTIL_FULL_SUFFIX, bash_home, extract_verdict,
+)
+
+
+class TestBashHome:
+    def test_windows_home(self):
+        assert bash_home("C:\\Users\\Lukas\\") == "/c/Users/Lukas"
+
+    def test_posix_home(self):
+        assert bash_home("/home/lukas/") == "/home/lukas"
+
+
+class TestTemplate:
+    def test_static_values_compiled_in(self):
+        t = Template("{HOME}/x {ROUND}", {"HOME": "/h"})
+        assert t.variables == {"ROUND"}
+        assert t.render({"ROUND": 3}) == "/h/x 3"
+
+    def test_unknown_braces_untouched(self):
+        t = Template('JSON: {"a": 1} {FOO}')
+        assert t.render({}) == 'JSON: {"a": 1} {FOO}'
+
+    def test_missing_value_keeps_placeholder(self):
+        assert Template("Runde {ROUND}").render({}) == "Runde {ROUND}"
+
+    def test_callable_only_evaluated_when_used(self):
+        calls = []
+        t = Template("ohne Variablen")
+        assert t.render({"LAST_VERDICT": lambda: calls.append(1)}) == "ohne Variablen"
+        assert calls == []
+
+
+class TestExtractVerdict:
+    def test_last_verdict(self):
+        handoff = "## Overall verdict: NEEDS_FIX\n...\n## Overall verdict: APPROVED\n"
+        assert extract_verdict(handoff) == "APPROVED"
+
+    def test_no_verdict(self):
+        assert extract_verdict("nichts") == ""
+
+
+class TestPromptRegistry:
+    @staticmethod
+    def _write(tmp_path, name, text):
+        (tmp_path / "prompts").mkdir(exist_ok=True)
+        path = tmp_path / "prompts" / name
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    def _registry(self, tmp_path, prompts=None):
+        return PromptRegistry({"chain_name": "c", "prompts": prompts or {}}, tmp_path,
+                              home="C:\\Users\\x\\")
+
+    def test_file_prompt_rendered(self, tmp_path):
+        self._write(tmp_path, "worker.txt", "{CHAIN}/{LINK} Runde {ROUND} in {BASH_HOME}")
+        reg = self._registry(tmp_path)
+        text = reg.render({"name": "w", "prompt": "worker"}, ROUND=2)
+        assert text == "c/w Runde 2 in /c/Users/x"
+
+    def test_until_full_suffix(self, tmp_path):
+        reg = self._registry(tmp_path)
+        text = reg.render({"name": "w", "prompt": "Mach was", "until_full": True})
+        assert text == "Mach was" + UNTIL_FULL_SUFFIX
+
+    def test_file_change_invalidates_cache(self, tmp_path):
+        f = self._write(tmp_path, "worker.txt", "alt")
+        reg = self._registry(tmp_path)
+        link = {"name": "w", "prompt": "worker"}
+        assert reg.render(link) == "alt"
+        f.write_text("neu", encoding="utf-8")
+        st = f.stat()
+        os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert reg.render(link) == "neu"
+
+    def test_unchanged_file_not_reread(self, tmp_path, monkeypatch):
+        self._write(tmp_path, "worker.txt", "x")
+        reg = self._registry(tmp_path)
+        link = {"name": "w", "prompt": "worker"}
+        reg.render(link)
+        monkeypatch.setattr(reg, "_compile", lambda *a: (_ for _ in ()).throw(AssertionError))
+        assert reg.render(link) == "x"
+
+    def test_file_created_after_first_use(self, tmp_path):
+        reg = self._registry(tmp_path, {"p": {"type": "file", "path": "prompts/spaeter.txt"}})
+        missing = {"name": "a", "prompt": "p"}
+        by_key = {"name": "b", "prompt": "worker"}
+        assert reg.render(missing).startswith("Lies die Datei")
+        assert reg.render(by_key) == "worker"
+        self._write(tmp_path, "spaeter.txt", "aus Datei")
+        self._write(tmp_path, "worker.txt", "Worker-Prompt")
+        assert reg.render(missing) == "aus Datei"
+        assert reg.render(by_key) == "Worker-Prompt"
+
+    def test_config_inline_not_reresolved(self, tmp_path, monkeypatch):
+        reg = self._registry(tmp_path, {"p": "Inline {LINK}"})
+        link = {"name": "w", "prompt": "p"}
+        reg.render(link)
+        monkeypatch.setattr(reg, "resolve", lambda *a: (_ for _ in ()).throw(AssertionError))
+        assert reg.render(link) == "Inline w"
+
+    def test_unchanged_fallback_not_recompiled(self, tmp_path, monkeypatch):
+        reg = self._registry(tmp_path)
+        link = {"name": "w", "prompt": "Mach was"}
+        reg.render(link)
+        monkeypatch.setattr(reg, "_compile", lambda *a: (_ for _ in ()).throw(AssertionError))
+        assert reg.render(link) == "Mach was"
+
+    def test_validate_reports_missing_files(self, tmp_path):
+        reg = self._registry(tmp_path, {"p": {"type": "file", "path": "prompts/fehlt.txt"}})
+        problems = reg.validate([
+            {"name": "a", "prompt": "p"},
+            {"name": "b", "prompt": "nicht_da.txt"},
+            {"name": "c", "prompt": "Inline-Prompt"},
+        ])
+        assert len(problems) == 2
+        assert problems[0].startswith("a:")
+        assert problems[1].startswith("b:")
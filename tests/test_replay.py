@@ -0,0 +1,138 @@
+"""Tests fuer llmauto.core.replay -- Aufzeichnen und Abspielen von CLI-Aufrufen."""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from llmauto.core.replay import Player, Recorder, apply_diff, file_diff, make_replay
+from llmauto.core.runner import CLAUDE_CMD_ENV, ClaudeRunner
+
+FAKE_CLAUDE = Path(__file__).parent.parent / "scripts" / "fake_claude.py"
+
+
+class TestDiff:
+    @pytest.mark.parametrize("before, after", [
+        ("", "a\n"),
+        ("a\nb\n", "a\nb\nc\n"),
+        ("a\nb\nc\n", "a\nX\nc\n"),
+        ("a\nb\n", ""),
+        (None, "neu\n"),
+        ("ohne Zeilenende", "ohne Zeilenende\nmehr"),
+    ])
+    def test_roundtrip(self, before, after):
+        assert apply_diff(before, file_diff(before, after)) == after
+
+    def test_append_is_single_insert(self):
+        assert file_diff("a\n", "a\nb\n") == [[1, 1, ["b\n"]]]
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    """Runner gegen die Fake-CLI, die an den beobachteten Handoff anhaengt."""
+    monkeypatch.delenv(CLAUDE_CMD_ENV, raising=False)
+    handoff = tmp_path / "state" / "k" / "handoff.md"
+    handoff.parent.mkdir(parents=True)
+    handoff.write_text("# Start\n", encoding="utf-8")
+    monkeypatch.setenv("FAKE_CLAUDE_HANDOFF", str(handoff))
+    runner = ClaudeRunner(claude_cmd=[sys.executable, str(FAKE_CLAUDE)], timeout=30)
+    return runner, handoff, tmp_path / "archiv.jsonl"
+
+
+def _record(runner, handoff, archive, prompts, model="m1"):
+    recorder = Recorder(archive, watch=[handoff], root=handoff.parent.parent.parent)
+    recorder.start(chain="k")
+    results = [runner.run(p, replay=recorder, model=model) for p in prompts]
+    return recorder, results
+
+
+class TestRecorder:
+    def test_archive_layout(self, setup):
+        runner, handoff, archive = setup
+        recorder, results = _record(runner, handoff, archive, ["eins", "zwei"])
+        lines = [json.loads(line) for line in archive.read_text(encoding="utf-8").splitlines()]
+        assert lines[0]["type"] == "header"
+        assert lines[0]["files"] == {"state/k/handoff.md": "# Start\n"}
+        calls = lines[1:]
+        assert [c["seq"] for c in calls] == [1, 2]
+        assert "eins" not in json.dumps(calls[0]["cmd"])
+        assert calls[0]["result"]["output"] == results[0]["output"]
+        assert calls[0]["files"]["state/k/handoff.md"]["ops"][0][0] == 1
+        assert recorder.calls == 2
+
+    def test_continues_existing_archive(self, setup):
+        runner, handoff, archive = setup
+        _record(runner, handoff, archive, ["eins"])
+        recorder, _ = _record(runner, handoff, archive, ["zwei"])
+        lines = archive.read_text(encoding="utf-8").splitlines()
+        assert sum(1 for line in lines if '"header"' in line) == 1
+        assert json.loads(lines[-1])["seq"] == 2
+
+
+class TestPlayer:
+    def test_replays_results_and_files(self, setup, monkeypatch):
+        runner, handoff, archive = setup
+        _, recorded = _record(runner, handoff, archive, ["eins", "zwei"])
+        final = handoff.read_text(encoding="utf-8")
+        handoff.write_text("egal\n", encoding="utf-8")
+        # Abspielen darf die CLI nicht starten
+        monkeypatch.setattr(runner, "claude_cmd", ["/gibt/es/nicht"])
+
+        player = Player(archive, watch=[handoff], root=handoff.parent.parent.parent)
+        player.start()
+        assert handoff.read_text(encoding="utf-8") == "# Start\n"
+        results = [runner.run(p, replay=player, model="m1") for p in ["eins", "zwei"]]
+        assert [r["output"] for r in results] == [r["output"] for r in recorded]
+        assert all(r["replayed"] and r["replay_match"] == "prompt" for r in results)
+        assert handoff.read_text(encoding="utf-8") == final
+        assert player.served == 2 and player.diverged == 0
+
+    def test_model_fallback_and_missing(self, setup):
+        runner, handoff, archive = setup
+        _record(runner, handoff, archive, ["eins"])
+        player = Player(archive, watch=[handoff], root=handoff.parent.parent.parent)
+        result = runner.run("anderer Prompt", replay=player, model="m1")
+        assert result["replay_match"] == "model"
+        result = runner.run("noch einer", replay=player, model="m1")
+        assert result["returncode"] == -3
+        assert player.missing == 1
+
+    def test_append_applied_on_diverged_file(self, setup):
+        runner, handoff, archive = setup
+        _record(runner, handoff, archive, ["eins"])
+        handoff.write_text("# Anders\nzeile\n", encoding="utf-8")
+        player = Player(archive, watch=[handoff], root=handoff.parent.parent.parent)
+        result = runner.run("eins", replay=player, model="m1")
+        text = handoff.read_text(encoding="utf-8")
+        assert text.startswith("# Anders\nzeile\n")
+        assert "## Status: DONE" in text
+        assert "replay_diverged" not in result
+
+    def test_stream_log_written(self, setup, tmp_path):
+        runner, handoff, archive = setup
+        _record(runner, handoff, archive, ["eins"])
+        player = Player(archive, watch=[handoff], root=handoff.parent.parent.parent)
+        log_file = tmp_path / "link.log"
+        runner.run("eins", replay=player, model="m1", stream=True, log_file=log_file)
+        assert "OK: 'eins'" in log_file.read_text(encoding="utf-8")
+
+
+class TestMakeReplay:
+    def test_disabled(self):
+        assert make_replay({"mode": ""}) is None
+        assert make_replay(None) is None
+
+    def test_errors(self, tmp_path):
+        with pytest.raises(ValueError, match="unbekannter Modus"):
+            make_replay({"mode": "play", "archive": "x"})
+        with pytest.raises(ValueError, match="kein Archiv"):
+            make_replay({"mode": "record"})
+        with pytest.raises(ValueError, match="nicht gefunden"):
+            make_replay({"mode": "replay", "archive": str(tmp_path / "fehlt.jsonl")})
+
+    def test_modes(self, tmp_path):
+        archive = tmp_path / "a.jsonl"
+        assert isinstance(make_replay({"mode": "record", "archive": str(archive)}), Recorder)
+        archive.write_text("", encoding="utf-8")
+        player = make_replay({"mode": "replay", "archive": str(archive), "time_scale": 0.5})
+        assert isinstance(player, Player) and player.time_scale == 0.5
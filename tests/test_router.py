@@ -0,0 +1,117 @@
+"""Tests fuer llmauto.core.router -- Modell-Routing nach Gesundheitszustand."""
+import pytest
+
+from llmauto.core.router import HealthBook, ModelRouter, make_router
+
+
+def _result(returncode=0, stderr="", duration=1.0):
+    return {"success": returncode == 0, "returncode": returncode,
+            "stderr": stderr, "output": "", "duration_s": duration, "model": "m"}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def router(clock):
+    return ModelRouter(
+        fallbacks={"opus": ["sonnet", "haiku"], "sonnet": ["haiku"]},
+        failure_threshold=2, window=5, probe_after_seconds=60,
+        health=HealthBook(), clock=clock,
+    )
+
+
+class TestModelRouter:
+    def test_healthy_model_stays_primary(self, router):
+        assert router.select("opus") == ("opus", "primary")
+
+    def test_downgrade_after_consecutive_failures(self, router):
+        assert router.record("opus", _result(1, "rate limit")) is None
+        assert router.record("opus", _result(-1, "TIMEOUT")) == "tripped"
+        assert router.select("opus") == ("sonnet", "fallback")
+
+    def test_success_resets_failure_count(self, router):
+        router.record("opus", _result(1))
+        router.record("opus", _result(0))
+        router.record("opus", _result(1))
+        assert router.select("opus").model == "opus"
+
+    def test_permanent_and_aborted_do_not_count(self, router):
+        for _ in range(3):
+            router.record("opus", _result(-2, "claude CLI nicht gefunden"))
+            router.record("opus", _result(-4))
+        assert router.select("opus").model == "opus"
+
+    def test_link_fallback_comes_first(self, router):
+        router.record("opus", _result(1))
+        router.record("opus", _result(1))
+        assert router.select("opus", link_fallback="haiku").model == "haiku"
+
+    def test_skips_tripped_fallback(self, router):
+        for model in ("opus", "sonnet"):
+            router.record(model, _result(1))
+            router.record(model, _result(1))
+        assert router.select("opus").model == "haiku"
+
+    def test_all_tripped_stays_on_primary(self, router):
+        for model in ("sonnet", "haiku"):
+            router.record(model, _result(1))
+            router.record(model, _result(1))
+        assert router.select("sonnet") == ("sonnet", "primary")
+
+    def test_probe_restores_primary(self, router, clock):
+        router.record("opus", _result(1))
+        router.record("opus", _result(1))
+        clock.now += 61
+        assert router.select("opus") == ("opus", "probe")
+        # Waehrend der Probe laufen andere Aufrufe weiter auf dem Ausweichmodell
+        assert router.select("opus").model == "sonnet"
+        assert router.record("opus", _result(0)) == "restored"
+        assert router.select("opus") == ("opus", "primary")
+
+    def test_failed_probe_waits_again(self, router, clock):
+        router.record("opus", _result(1))
+        router.record("opus", _result(1))
+        clock.now += 61
+        assert router.select("opus").reason == "probe"
+        assert router.record("opus", _result(1)) is None
+        clock.now += 30
+        assert router.select("opus").model == "sonnet"
+        clock.now += 31
+        assert router.select("opus").reason == "probe"
+
+    def test_snapshot_rolling_window(self, router):
+        for duration in (1, 2, 3, 4, 5, 6):
+            router.record("sonnet", _result(0, duration=duration))
+        router.record("sonnet", _result(1))
+        snap = router.snapshot()["sonnet"]
+        assert snap["calls"] == 5
+        assert snap["success_rate"] == pytest.approx(4 / 5)
+        assert snap["avg_latency_s"] == pytest.approx(4.5)
+        assert snap["tripped"] is False
+
+
+class TestMakeRouter:
+    def test_disabled(self):
+        assert make_router({"enabled": False}) is None
+        assert make_router(None) is None
+        assert make_router({"failure_threshold": 5}) is None
+
+    def test_options(self):
+        router = make_router({"enabled": True, "failure_threshold": 5, "fallbacks": {"a": ["b"]}})
+        assert router.failure_threshold == 5
+        assert router.candidates("a", link_fallback="c") == ["c", "b"]
+
+    def test_unknown_option(self):
+        with pytest.raises(TypeError):
+            make_router({"enabled": True, "unbekannt": 1})
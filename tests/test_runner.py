@@ -1,7 +1,16 @@
 """Tests fuer llmauto.core.runner -- ClaudeRunner."""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
 import pytest
 
-from llmauto.core.runner import ClaudeRunner
+from llmauto.core.runner import (
+    CLAUDE_CMD_ENV, ClaudeRunner, claude_command, parse_structured_output, usage_from_event,
+)
+
+FAKE_CLAUDE = Path(__file__).parent.parent / "scripts" / "fake_claude.py"
 
 
 class TestClaudeRunnerInit:
@@ -60,6 +69,145 @@ class TestBuildCmd:
         assert "dontAsk" in cmd
 
 
+class TestClaudeCommand:
+    def test_default(self, monkeypatch):
+        monkeypatch.delenv(CLAUDE_CMD_ENV, raising=False)
+        assert claude_command() == ["claude"]
+
+    def test_config_string_is_split(self, monkeypatch):
+        monkeypatch.delenv(CLAUDE_CMD_ENV, raising=False)
+        assert claude_command('python "/pfad mit leer/fake.py"') == ["python", "/pfad mit leer/fake.py"]
+
+    def test_config_list(self, monkeypatch):
+        monkeypatch.delenv(CLAUDE_CMD_ENV, raising=False)
+        assert claude_command(["node", "cli.js"]) == ["node", "cli.js"]
+
+    def test_env_overrides_config(self, monkeypatch):
+        monkeypatch.setenv(CLAUDE_CMD_ENV, "fake-claude --x")
+        assert claude_command("claude") == ["fake-claude", "--x"]
+
+    def test_build_cmd_uses_command(self, monkeypatch):
+        monkeypatch.delenv(CLAUDE_CMD_ENV, raising=False)
+        cmd = ClaudeRunner(claude_cmd=["python", "fake.py"])._build_cmd("Hallo")
+        assert cmd[:3] == ["python", "fake.py", "--model"]
+
+
+class TestFakeClaude:
+    """Runner gegen scripts/fake_claude.py (Ersatz fuer die echte CLI)."""
+
+    @pytest.fixture
+    def runner(self, monkeypatch):
+        monkeypatch.delenv(CLAUDE_CMD_ENV, raising=False)
+        monkeypatch.setenv("FAKE_CLAUDE_HANDOFF", "")
+        return ClaudeRunner(claude_cmd=[sys.executable, str(FAKE_CLAUDE)], timeout=30)
+
+    def test_text_output(self, runner, monkeypatch):
+        monkeypatch.setenv("FAKE_CLAUDE_OUTPUT_BYTES", "500")
+        result = runner.run("Hallo")
+        assert result["success"]
+        assert result["output"].startswith("OK: 'Hallo'")
+        assert len(result["output"]) == 500
+
+    def test_exit_code_and_stderr(self, runner, monkeypatch):
+        monkeypatch.setenv("FAKE_CLAUDE_EXIT_CODE", "1")
+        monkeypatch.setenv("FAKE_CLAUDE_STDERR", "API Error: 429 rate limit")
+        result = runner.run("Hallo")
+        assert result["returncode"] == 1
+        assert "429" in result["stderr"]
+
+    def test_latency_timeout(self, runner, monkeypatch):
+        monkeypatch.setenv("FAKE_CLAUDE_LATENCY", "5")
+        result = runner.run("Hallo", timeout=0.5)
+        assert result["returncode"] == -1
+
+    def test_handoff_written(self, runner, monkeypatch, tmp_path):
+        handoff = tmp_path / "handoff.md"
+        monkeypatch.setenv("FAKE_CLAUDE_HANDOFF", str(handoff))
+        runner.run("Aufgabe")
+        assert "## Status: DONE" in handoff.read_text(encoding="utf-8")
+
+    def test_handoff_auto_from_prompt(self, runner, monkeypatch, tmp_path):
+        (tmp_path / "state" / "k").mkdir(parents=True)
+        monkeypatch.setenv("FAKE_CLAUDE_HANDOFF", "auto")
+        runner.run("Handoff: state/k/handoff.md", cwd=str(tmp_path))
+        assert (tmp_path / "state" / "k" / "handoff.md").exists()
+
+    def test_json_output_format(self, runner):
+        import subprocess
+        cmd = runner._build_cmd("Hallo") + ["--output-format", "json"]
+        proc = subprocess.run(cmd, capture_output=True, text=True, env=runner._build_env())
+        event = json.loads(proc.stdout)
+        assert event["type"] == "result" and not event["is_error"]
+        assert event["usage"]["output_tokens"] > 0
+
+
+class TestStructuredOutput:
+    """output_format json/stream-json: Ergebnistext und Verbrauch aus dem Ergebnis-Event."""
+
+    @pytest.fixture
+    def runner(self, monkeypatch):
+        monkeypatch.delenv(CLAUDE_CMD_ENV, raising=False)
+        monkeypatch.setenv("FAKE_CLAUDE_HANDOFF", "")
+        monkeypatch.setenv("FAKE_CLAUDE_COST_USD", "0.25")
+        return ClaudeRunner(claude_cmd=[sys.executable, str(FAKE_CLAUDE)], timeout=30,
+                            output_format="json")
+
+    def test_build_cmd_flags(self):
+        assert "--output-format" not in ClaudeRunner()._build_cmd("x")
+        runner = ClaudeRunner(output_format="json")
+        assert runner._build_cmd("x")[-2:] == ["--output-format", "json"]
+        # Streaming braucht Events pro Zeile
+        assert runner._build_cmd("x", stream=True)[-3:] == ["--output-format", "stream-json", "--verbose"]
+        assert runner._build_session_cmd().count("--output-format") == 1
+
+    def test_invalid_format(self):
+        with pytest.raises(ValueError, match="output_format"):
+            ClaudeRunner(output_format="xml")
+
+    @pytest.mark.parametrize("text", [
+        '{"type": "result", "result": "fertig", "num_turns": 2}',
+        '[{"type": "system"}, {"type": "result", "result": "fertig", "num_turns": 2}]',
+        '{"type": "system"}\n{"type": "assistant", "message": {"content": '
+        '[{"type": "text", "text": "teil"}]}}\n{"type": "result", "result": "fertig", "num_turns": 2}',
+    ])
+    def test_parse_variants(self, text):
+        event, _ = parse_structured_output(text)
+        assert event["result"] == "fertig"
+
+    def test_parse_plain_text(self):
+        assert parse_structured_output("kein json") == (None, None)
+
+    def test_usage_from_event(self):
+        fields = usage_from_event({"usage": {"input_tokens": 3, "cache_read_input_tokens": 7},
+                                   "total_cost_usd": 0.5, "num_turns": 2, "session_id": "s"})
+        assert fields["usage"] == {"input_tokens": 3, "output_tokens": 0,
+                                   "cache_creation_input_tokens": 0, "cache_read_input_tokens": 7}
+        assert (fields["cost_usd"], fields["num_turns"], fields["session_id"]) == (0.5, 2, "s")
+
+    def test_json_result(self, runner):
+        result = runner.run("Hallo")
+        assert result["success"]
+        assert result["output"].startswith("OK: 'Hallo'")
+        assert result["usage"]["output_tokens"] > 0
+        assert result["cost_usd"] == 0.25
+        assert result["num_turns"] == 1 and result["session_id"]
+
+    def test_error_event(self, runner, monkeypatch):
+        monkeypatch.setenv("FAKE_CLAUDE_EXIT_CODE", "2")
+        result = runner.run("Hallo")
+        assert result["returncode"] == 2 and not result["success"]
+        assert result["cost_usd"] == 0.25
+
+    def test_stream_json_log_is_readable(self, runner, tmp_path):
+        log_file = tmp_path / "link.log"
+        result = runner.run("Hallo", stream=True, log_file=log_file)
+        content = log_file.read_text(encoding="utf-8")
+        assert content.startswith("OK: 'Hallo'")
+        assert '"type"' not in content
+        assert result["output"].startswith("OK: 'Hallo'")
+        assert result["usage"]["input_tokens"] > 0 and result["cost_usd"] == 0.25
+
+
 class TestBuildEnv:
     def test_removes_claudecode(self):
         import os
@@ -75,3 +223,108 @@ class TestBuildEnv:
         runner = ClaudeRunner()
         env = runner._build_env()
         assert env.get("PYTHONIOENCODING") == "utf-8"
+
+
+class TestStreaming:
+    """Tests fuer den Streaming-Modus (asyncio-Prozess + inkrementeller Reader)."""
+
+    def _py(self, code):
+        return [sys.executable, "-c", code]
+
+    def test_tees_lines_to_log_and_callback(self, tmp_path):
+        from llmauto.core.runner import _StreamCapture
+        log_file = tmp_path / "link.log"
+        seen = []
+        capture = _StreamCapture(log_file=log_file, on_line=lambda s, l: seen.append((s, l)))
+        runner = ClaudeRunner()
+        cmd = self._py("import sys; print('eins'); print('zwei'); print('fehler', file=sys.stderr)")
+        result = asyncio.run(runner._exec(cmd, runner._build_env(), None, 30, "m", capture))
+        capture.close()
+        assert result["success"] is True
+        assert result["output"] == "eins\nzwei"
+        assert result["stderr"] == "fehler"
+        assert ("stdout", "zwei") in seen
+        content = log_file.read_text(encoding="utf-8")
+        assert "eins\nzwei\n" in content
+        assert "[stderr] fehler" in content
+
+    def test_tail_is_bounded(self):
+        from llmauto.core.runner import _StreamCapture
+        capture = _StreamCapture(tail_lines=10)
+        runner = ClaudeRunner()
+        cmd = self._py("for i in range(100): print(i)")
+        result = asyncio.run(runner._exec(cmd, runner._build_env(), None, 30, "m", capture))
+        assert result["output"].split("\n") == [str(i) for i in range(90, 100)]
+        assert capture.line_counts["stdout"] == 100
+        # Gesamtgroesse inkl. Zeilenumbrueche, unabhaengig vom Tail
+        assert capture.byte_counts["stdout"] == sum(len(str(i)) + 1 for i in range(100))
+
+    def test_timeout_keeps_partial_output(self, tmp_path):
+        from llmauto.core.runner import _StreamCapture
+        log_file = tmp_path / "link.log"
+        capture = _StreamCapture(log_file=log_file)
+        runner = ClaudeRunner()
+        cmd = self._py("import time; print('teil', flush=True); time.sleep(30)")
+        result = asyncio.run(runner._exec(cmd, runner._build_env(), None, 1, "m", capture))
+        capture.close()
+        assert result["returncode"] == -1
+        assert "TIMEOUT" in result["stderr"]
+        assert result["output"] == "teil"
+        assert "teil" in log_file.read_text(encoding="utf-8")
+
+    def test_missing_executable(self):
+        from llmauto.core.runner import _StreamCapture
+        runner = ClaudeRunner()
+        result = asyncio.run(runner._exec(["llmauto-gibt-es-nicht"], runner._build_env(),
+                                          None, 5, "m", _StreamCapture()))
+        assert result["returncode"] == -2
+
+
+class TestBufferedExec:
+    def test_buffered_output(self):
+        runner = ClaudeRunner()
+        cmd = [sys.executable, "-c", "import sys; print('hallo'); sys.exit(3)"]
+        result = asyncio.run(runner._exec(cmd, runner._build_env(), None, 30, "m"))
+        assert result["output"] == "hallo"
+        assert result["returncode"] == 3
+        assert result["success"] is False
+
+    def test_buffered_timeout(self):
+        runner = ClaudeRunner()
+        cmd = [sys.executable, "-c", "import time; time.sleep(30)"]
+        result = asyncio.run(runner._exec(cmd, runner._build_env(), None, 1, "m"))
+        assert result["returncode"] == -1
+        assert "TIMEOUT" in result["stderr"]
+
+
+class TestAbort:
+    """Tests fuer den vorzeitigen Abbruch (Hard-Stop) laufender Aufrufe."""
+
+    def test_abort_check_terminates_process(self, tmp_path):
+        from llmauto.core.runner import _StreamCapture
+        flag = tmp_path / "STOP"
+        capture = _StreamCapture()
+        runner = ClaudeRunner()
+        cmd = [sys.executable, "-c", "import time; print('start', flush=True); time.sleep(30)"]
+
+        async def _run():
+            async def _request_stop():
+                await asyncio.sleep(0.3)
+                flag.write_text("stop")
+            asyncio.ensure_future(_request_stop())
+            return await runner._exec(cmd, runner._build_env(), None, 30, "m", capture,
+                                      abort_check=flag.exists, abort_poll=0.1)
+
+        result = asyncio.run(_run())
+        assert result["returncode"] == -4
+        assert "ABGEBROCHEN" in result["stderr"]
+        assert result["output"] == "start"
+        assert result["duration_s"] < 10
+
+    def test_abort_check_not_triggered(self):
+        runner = ClaudeRunner()
+        cmd = [sys.executable, "-c", "print('fertig')"]
+        result = asyncio.run(runner._exec(cmd, runner._build_env(), None, 30, "m",
+                                          abort_check=lambda: False, abort_poll=0.05))
+        assert result["returncode"] == 0
+        assert result["output"] == "fertig"
@@ -0,0 +1,190 @@
+"""Tests fuer llmauto.core.session_pool -- warme Claude-Sitzungen."""
+import asyncio
+import json
+import sys
+
+from llmauto.core.runner import ClaudeRunner
+from llmauto.core.session_pool import SessionPool, WarmSession, context_tokens, user_message
+
+
+# Ersatz fuer "claude --input-format stream-json": Antwort enthaelt PID und Prompt-Nr.
+FAKE_CLI = r'''
+import json, os, sys, time
+print(json.dumps({"type": "system", "subtype": "init"}), flush=True)
+n = 0
+for line in sys.stdin:
+    n += 1
+    text = json.loads(line)["message"]["content"][0]["text"]
+    if text == "EXIT":
+        sys.exit(3)
+    if text == "SLEEP":
+        time.sleep(30)
+    print("kein json", flush=True)
+    print(json.dumps({"type": "assistant", "message": {"content": [{"type": "text", "text": text}]}}), flush=True)
+    print(json.dumps({"type": "result", "subtype": "success", "is_error": text == "FAIL",
+                      "result": f"{os.getpid()}:{n}:{text}",
+                      "usage": {"input_tokens": 1000 * n, "output_tokens": 10}}), flush=True)
+'''
+
+
+def _runner(tmp_path, pool):
+    script = tmp_path / "fake_cli.py"
+    script.write_text(FAKE_CLI, encoding="utf-8")
+    runner = ClaudeRunner(session_pool=pool, timeout=5)
+    runner._build_session_cmd = lambda **kw: [sys.executable, str(script), kw.get("model", "m")]
+    return runner
+
+
+def _pid(result):
+    return result["output"].split(":")[0]
+
+
+class TestHelpers:
+    def test_user_message(self):
+        message = json.loads(user_message("Hallo"))
+        assert message["type"] == "user"
+        assert message["message"]["content"][0]["text"] == "Hallo"
+
+    def test_context_tokens(self):
+        assert context_tokens(None) == 0
+        assert context_tokens({"input_tokens": 5, "cache_read_input_tokens": 7, "output_tokens": 1}) == 13
+
+    def test_session_cmd(self):
+        cmd = ClaudeRunner()._build_session_cmd()
+        assert "-p" in cmd and "stream-json" in cmd
+        assert cmd[cmd.index("-p") + 1].startswith("--")
+
+
+class TestSessionPool:
+    def test_reuses_warm_process(self, tmp_path):
+        pool = SessionPool(size=1)
+        runner = _runner(tmp_path, pool)
+
+        async def _run():
+            first = await runner.run_async("eins")
+            second = await runner.run_async("zwei")
+            await pool.close()
+            return first, second
+
+        first, second = asyncio.run(_run())
+        assert first["success"] and second["success"]
+        assert _pid(first) == _pid(second)
+        assert second["output"].endswith(":2:zwei")
+        assert second["usage"]["input_tokens"] == 2000
+
+    def test_recycles_after_max_prompts(self, tmp_path):
+        pool = SessionPool(size=1, max_prompts=2)
+        runner = _runner(tmp_path, pool)
+
+        async def _run():
+            results = [await runner.run_async(p) for p in ("a", "b", "c")]
+            await pool.close()
+            return results
+
+        a, b, c = asyncio.run(_run())
+        assert _pid(a) == _pid(b) != _pid(c)
+        assert c["output"].endswith(":1:c")
+
+    def test_recycles_on_context_size(self, tmp_path):
+        pool = SessionPool(size=1, max_context_tokens=1500)
+        runner = _runner(tmp_path, pool)
+
+        async def _run():
+            results = [await runner.run_async(p) for p in ("a", "b", "c")]
+            await pool.close()
+            return results
+
+        a, b, c = asyncio.run(_run())
+        assert _pid(a) == _pid(b) != _pid(c)
+
+    def test_error_result_discards_session(self, tmp_path):
+        pool = SessionPool(size=1)
+        runner = _runner(tmp_path, pool)
+
+        async def _run():
+            failed = await runner.run_async("FAIL")
+            ok = await runner.run_async("ok")
+            await pool.close()
+            return failed, ok
+
+        failed, ok = asyncio.run(_run())
+        assert failed["success"] is False and failed["returncode"] == 1
+        assert ok["success"] and _pid(failed) != _pid(ok)
+
+    def test_process_exit_and_timeout(self, tmp_path):
+        pool = SessionPool(size=1)
+        runner = _runner(tmp_path, pool)
+
+        async def _run():
+            exited = await runner.run_async("EXIT")
+            timed_out = await runner.run_async("SLEEP", timeout=1)
+            ok = await runner.run_async("ok")
+            await pool.close()
+            return exited, timed_out, ok
+
+        exited, timed_out, ok = asyncio.run(_run())
+        assert exited["returncode"] == 3
+        assert timed_out["returncode"] == -1 and "TIMEOUT" in timed_out["stderr"]
+        assert ok["success"]
+
+    def test_parallel_calls_bounded_by_size(self, tmp_path):
+        pool = SessionPool(size=2)
+        runner = _runner(tmp_path, pool)
+
+        async def _run():
+            results = await asyncio.gather(*(runner.run_async(f"p{i}") for i in range(6)))
+            await pool.close()
+            return results
+
+        results = asyncio.run(_run())
+        assert all(r["success"] for r in results)
+        assert len({_pid(r) for r in results}) <= 2
+
+    def test_exception_before_start_releases_slot(self, tmp_path):
+        pool = SessionPool(size=1)
+        runner = _runner(tmp_path, pool)
+
+        def _broken_env():
+            raise RuntimeError("env kaputt")
+
+        async def _run():
+            original = runner._build_env
+            runner._build_env = _broken_env
+            try:
+                await runner.run_async("a")
+            except RuntimeError:
+                pass
+            runner._build_env = original
+            ok = await runner.run_async("b")
+            await pool.close()
+            return ok
+
+        ok = asyncio.run(asyncio.wait_for(_run(), 10))
+        assert ok["success"]
+        assert pool._count == 0
+
+    def test_closes_outside_lock(self):
+        pool = SessionPool(size=1)
+        lock_held = []
+
+        class _SlowSession:
+            key, alive, prompts, context_tokens = "alt", True, 0, 0
+            last_used = 0
+
+            async def close(self):
+                lock_held.append(pool._condition().locked())
+                await asyncio.sleep(0)
+
+        async def _run():
+            pool._idle.append(_SlowSession())
+            pool._count = 1
+            return await pool._checkout("neu")
+
+        assert asyncio.run(_run()) is None
+        assert lock_held == [False]
+        assert pool._count == 1 and pool._idle == []
+
+    def test_missing_executable(self):
+        session = WarmSession("k", ["gibt-es-nicht-xyz"], None, None, "m")
+        result = asyncio.run(session.start())
+        assert result["returncode"] == -2
@@ -1,10 +1,12 @@
 """Tests fuer llmauto.core.state -- ChainState Management."""
+import json
 import tempfile
+import time
 from pathlib import Path
 
 import pytest
 
-from llmauto.core.state import ChainState
+from llmauto.core.state import USAGE_ROUNDS_KEPT, ChainState, cache_hit_rate, split_handoff
 
 
 @pytest.fixture
@@ -172,3 +174,294 @@ class TestReset:
         assert state.get_round() == 0
         assert not state.is_stop_requested()
         assert "INITIAL (Reset)" in state.get_handoff()
+
+
+class TestCheckpoint:
+    def test_no_cursor_initially(self, state):
+        assert state.get_cursor() is None
+        assert state.finished_links() == set()
+
+    def test_link_lifecycle(self, state):
+        state.link_started(0, "a")
+        entry = state.get_cursor()["links"]["0"]
+        assert entry["name"] == "a"
+        assert entry["status"] == "running"
+        assert "finished" not in entry
+        state.link_finished(0, "done")
+        entry = state.get_cursor()["links"]["0"]
+        assert entry["status"] == "done"
+        assert entry["started"] <= entry["finished"]
+
+    def test_finished_links(self, state):
+        for index, status in enumerate(["done", "failed", "skipped", "aborted"]):
+            state.link_started(index, f"l{index}")
+            state.link_finished(index, status)
+        state.link_started(4, "l4")
+        assert state.finished_links() == {0, 1, 2}
+
+    def test_cursor_persisted(self, tmp_path, state):
+        state.link_started(1, "b")
+        state.link_finished(1, "done")
+        assert ChainState("test-chain", tmp_path).finished_links() == {1}
+
+    def test_increment_round_clears_cursor(self, state):
+        state.link_started(0, "a")
+        state.link_finished(0, "done")
+        state.increment_round()
+        assert state.get_cursor() is None
+
+    def test_cursor_of_other_round_ignored(self, state):
+        state.link_started(0, "a")
+        state.link_finished(0, "done")
+        # z.B. round_counter.txt extern hochgesetzt
+        state._record["round"] = 3
+        assert state.finished_links() == set()
+
+    def test_reset_clears_cursor(self, state):
+        state.link_started(0, "a")
+        state.reset()
+        assert state.get_cursor() is None
+
+    def test_record_start_resume_keeps_start_time(self, state):
+        state._record["start_time"] = "2026-01-01T08:00:00"
+        state.record_start(resume=True)
+        assert state.get_start_time() == "2026-01-01T08:00:00"
+        state.record_start()
+        assert state.get_start_time() != "2026-01-01T08:00:00"
+
+    def test_record_start_resume_without_start_time(self, state):
+        state.record_start(resume=True)
+        assert state.get_start_time() is not None
+
+
+def _usage_result(tokens_in=100, tokens_out=10, cache_read=0, cost=0.01):
+    return {"success": True, "usage": {"input_tokens": tokens_in, "output_tokens": tokens_out,
+                                       "cache_read_input_tokens": cache_read,
+                                       "cache_creation_input_tokens": 0},
+            "cost_usd": cost, "num_turns": 2}
+
+
+class TestUsage:
+    def test_aggregates_per_chain_link_and_round(self, tmp_path, state):
+        state.record_usage("a", _usage_result())
+        state.record_usage("b", _usage_result(cache_read=300, cost=0.02))
+        state.increment_round()
+        state.record_usage("a", _usage_result())
+        usage = ChainState("test-chain", tmp_path).get_usage()
+        assert usage["total"]["calls"] == 3
+        assert usage["total"]["input_tokens"] == 300
+        assert usage["total"]["cost_usd"] == 0.04
+        assert usage["total"]["num_turns"] == 6
+        assert usage["links"]["a"]["calls"] == 2
+        assert usage["rounds"]["1"]["cache_read_input_tokens"] == 300
+        assert usage["rounds"]["2"]["calls"] == 1
+
+    def test_plain_text_results_ignored(self, state):
+        state.record_usage("a", {"success": True, "output": "x"})
+        assert state.get_usage() == {}
+
+    def test_keeps_recent_rounds(self, state):
+        for _ in range(USAGE_ROUNDS_KEPT + 5):
+            state.record_usage("a", _usage_result())
+            state.increment_round()
+        usage = state.get_usage()
+        assert len(usage["rounds"]) == USAGE_ROUNDS_KEPT
+        assert "1" not in usage["rounds"]
+        assert usage["total"]["calls"] == USAGE_ROUNDS_KEPT + 5
+
+    def test_cache_hit_rate(self):
+        assert cache_hit_rate({}) == 0.0
+        assert cache_hit_rate({"input_tokens": 100, "cache_read_input_tokens": 300}) == 0.75
+
+    def test_reset_clears_usage(self, state):
+        state.record_usage("a", _usage_result())
+        state.reset()
+        assert state.get_usage() == {}
+
+
+class TestStatusListeners:
+    def test_listener_called_on_transition(self, state):
+        from llmauto.core.state import add_status_listener, remove_status_listener
+        events = []
+        callback = lambda name, old, new: events.append((name, old, new))
+        add_status_listener(callback)
+        try:
+            state.set_status("RUNNING")
+            state.set_status("RUNNING")  # kein Wechsel -> keine Benachrichtigung
+            state.set_status("COMPLETED")
+        finally:
+            remove_status_listener(callback)
+        assert events == [
+            ("test-chain", "UNKNOWN", "RUNNING"),
+            ("test-chain", "RUNNING", "COMPLETED"),
+        ]
+
+    def test_failing_listener_does_not_break_set_status(self, state):
+        from llmauto.core.state import add_status_listener, remove_status_listener
+
+        def broken(name, old, new):
+            raise RuntimeError("kaputt")
+        add_status_listener(broken)
+        try:
+            state.set_status("RUNNING")
+        finally:
+            remove_status_listener(broken)
+        assert state.get_status() == "RUNNING"
+
+
+class TestHardStop:
+    def test_soft_stop_is_not_hard(self, state):
+        state.request_stop("Sanft")
+        assert state.is_stop_requested()
+        assert not state.is_hard_stop_requested()
+
+    def test_hard_stop(self, state):
+        state.request_stop("Haengt fest", hard=True)
+        assert state.is_stop_requested()
+        assert state.is_hard_stop_requested()
+        assert state.get_stop_reason() == "Haengt fest"
+
+    def test_no_stop_file(self, state):
+        assert not state.is_hard_stop_requested()
+
+
+class TestPersistence:
+    """Tests fuer den gecachten State mit state.json und Einzeldatei-Spiegel."""
+
+    def test_state_record_written(self, state):
+        state.set_status("RUNNING")
+        state.increment_round()
+        record = json.loads(state.state_file.read_text(encoding="utf-8"))
+        assert record["status"] == "RUNNING"
+        assert record["round"] == 1
+
+    def test_reload_in_new_instance(self, tmp_path, state):
+        state.set_status("RUNNING")
+        state.record_start()
+        for _ in range(3):
+            state.increment_round()
+        other = ChainState("test-chain", tmp_path)
+        assert other.get_status() == "RUNNING"
+        assert other.get_round() == 3
+        assert other.get_start_time() is not None
+
+    def test_legacy_files_mirrored(self, state):
+        state.set_status("RUNNING")
+        state.increment_round()
+        assert state.status_file.read_text(encoding="utf-8") == "RUNNING"
+        assert state.round_file.read_text(encoding="utf-8") == "1"
+
+    def test_external_status_edit_detected(self, state):
+        state.set_status("RUNNING")
+        # Agent schreibt status.txt direkt
+        time.sleep(0.01)
+        state.status_file.write_text("COMPLETED", encoding="utf-8")
+        assert state.get_status() == "COMPLETED"
+
+    def test_external_record_change_detected(self, tmp_path, state):
+        state.set_status("RUNNING")
+        other = ChainState("test-chain", tmp_path)
+        time.sleep(0.01)
+        other.increment_round()
+        assert state.get_round() == 1
+
+    def test_migration_from_legacy_files(self, tmp_path):
+        state_dir = tmp_path / "state" / "alt"
+        state_dir.mkdir(parents=True)
+        (state_dir / "status.txt").write_text("STOPPED", encoding="utf-8")
+        (state_dir / "round_counter.txt").write_text("7", encoding="utf-8")
+        state = ChainState("alt", tmp_path)
+        assert state.get_status() == "STOPPED"
+        assert state.get_round() == 7
+
+    def test_without_legacy_mirror(self, tmp_path):
+        state = ChainState("kompakt", tmp_path, mirror_legacy=False)
+        state.set_status("RUNNING")
+        state.increment_round()
+        assert state.state_file.exists()
+        assert not state.status_file.exists()
+        assert not state.round_file.exists()
+
+    def test_batch_writes_once(self, state, monkeypatch):
+        from llmauto.core import state as state_module
+        writes = []
+        original = state_module.atomic_write_text
+        monkeypatch.setattr(state_module, "atomic_write_text",
+                            lambda path, text: (writes.append(path.name), original(path, text)))
+        with state.batch():
+            state.record_start()
+            state.set_status("RUNNING")
+            state.increment_round()
+        assert writes.count("state.json") == 1
+
+    def test_no_temp_files_left(self, state):
+        state.set_status("RUNNING")
+        state.write_handoff("Inhalt")
+        assert not list(state.state_dir.glob("*.tmp"))
+
+    def test_handoff_cache_sees_external_write(self, state):
+        state.write_handoff("Version 1")
+        assert state.get_handoff() == "Version 1"
+        state.handoff_file.write_text("Version 2 vom Agent", encoding="utf-8")
+        assert state.get_handoff() == "Version 2 vom Agent"
+
+
+class TestBlockedScan:
+    def test_consecutive_blocks_trigger_shutdown(self, state):
+        state.write_handoff("# Runde 1\nOK\nBLOCKED: a\n\nBLOCKED: b\nblocked: c\n")
+        stop, reason = state.check_shutdown({"max_consecutive_blocks": 3})
+        assert stop is True
+        assert reason == "MAX_BLOCKS: 3"
+
+    def test_interrupted_blocks_do_not_trigger(self, state):
+        state.write_handoff("BLOCKED: a\nBLOCKED: b\nWeiter gearbeitet\nBLOCKED: c\n")
+        stop, _ = state.check_shutdown({"max_consecutive_blocks": 2})
+        assert stop is False
+
+
+def _rounds(numbers):
+    return "".join(f"# Handoff - Runde {n}\n{'x' * 40}\n" for n in numbers)
+
+
+class TestHandoffCompaction:
+    def test_within_budget_untouched(self):
+        content = _rounds([1, 2])
+        assert split_handoff(content, max_bytes=10_000) == (content, "", False)
+
+    def test_keeps_newest_appended_sections(self):
+        kept, archived, newest_first = split_handoff(_rounds([1, 2, 3, 4]), max_lines=4)
+        assert kept == _rounds([3, 4])
+        assert archived == _rounds([1, 2])
+        assert newest_first is False
+
+    def test_newest_first_layout(self):
+        kept, archived, newest_first = split_handoff(_rounds([4, 3, 2, 1]), max_lines=4)
+        assert kept == _rounds([4, 3])
+        assert archived == _rounds([2, 1])
+        assert newest_first is True
+
+    def test_newest_section_never_cut(self):
+        kept, archived, _ = split_handoff(_rounds([1, 2]), max_bytes=10)
+        assert kept == _rounds([2])
+        assert archived == _rounds([1])
+
+    def test_compact_archives_and_links(self, state):
+        state.write_handoff(_rounds([1, 2, 3]))
+        archive = state.compact_handoff(max_lines=2, summarize=lambda text: "- Runde 1-2 erledigt")
+        assert archive.parent == state.handoff_archive_dir
+        assert archive.read_text(encoding="utf-8") == _rounds([1, 2])
+        handoff = state.get_handoff()
+        assert handoff.startswith("# Zusammenfassung aelterer Runden")
+        assert archive.name in handoff
+        assert "- Runde 1-2 erledigt" in handoff
+        assert handoff.endswith(_rounds([3]))
+
+    def test_compact_noop_and_failing_summary(self, state):
+        state.write_handoff(_rounds([1]))
+        assert state.compact_handoff(max_lines=1) is None
+        state.write_handoff(_rounds([1, 2]))
+
+        def broken(text):
+            raise RuntimeError("kein Modell")
+        assert state.compact_handoff(max_lines=2, summarize=broken) is not None
+        assert state.get_handoff().endswith(_rounds([2]))
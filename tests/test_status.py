@@ -0,0 +1,122 @@
+"""Tests fuer llmauto.modes.status -- schnelle Statusabfragen und Importzeit."""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import llmauto
+from llmauto.core.state import ChainState
+from llmauto.modes import status as status_mode
+
+
+PACKAGE_PARENT = str(Path(llmauto.__file__).parent.parent)
+# Obergrenze fuer den Import des schnellen Pfads (grosszuegig fuer langsame CI)
+IMPORT_BUDGET_SECONDS = 0.5
+
+
+def _python(code):
+    env = dict(os.environ, PYTHONPATH=PACKAGE_PARENT)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         env=env, cwd=PACKAGE_PARENT, timeout=60)
+    assert out.returncode == 0, out.stderr
+    return out.stdout
+
+
+@pytest.fixture
+def chain_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(status_mode, "load_chain", lambda name: {"max_rounds": 7, "runtime_hours": 2,
+                                                                   "task_pools": {}})
+    state = ChainState("k1", tmp_path)
+    state.set_status("RUNNING")
+    state.increment_round()
+    state.record_start()
+    state.write_handoff("# Runde 1\n## Rolle: worker\n## Task: Tests\n## Status: OK\n")
+    return tmp_path
+
+
+class TestChainStatus:
+    def test_fields(self, chain_dir):
+        info = status_mode.chain_status("k1", chain_dir)
+        assert info["status"] == "RUNNING"
+        assert info["round"] == 1
+        assert info["max_rounds"] == 7
+        assert (info["last_role"], info["last_task"], info["last_status"]) == ("worker", "Tests", "OK")
+        assert info["runtime_hours"] is not None
+        json.dumps(info)
+
+    def test_unknown_chain_creates_nothing(self, chain_dir):
+        info = status_mode.chain_status("neu", chain_dir)
+        assert info["status"] == "UNKNOWN"
+        assert not (chain_dir / "state" / "neu").exists()
+
+    def test_chain_names_skip_internal(self, chain_dir):
+        (chain_dir / "state" / "_governor").mkdir()
+        assert status_mode.chain_names(chain_dir) == ["k1"]
+
+    def test_usage(self, chain_dir, capsys):
+        ChainState("k1", chain_dir).record_usage("worker", {
+            "usage": {"input_tokens": 100, "output_tokens": 5, "cache_read_input_tokens": 300},
+            "cost_usd": 0.5, "num_turns": 4,
+        })
+        info = status_mode.chain_status("k1", chain_dir)
+        assert info["usage"]["total"]["cost_usd"] == 0.5
+        status_mode._print_status(info)
+        out = capsys.readouterr().out
+        assert "Cache 75%" in out and "0.5000$" in out
+
+
+    def test_field(self, chain_dir, monkeypatch, capsys):
+        monkeypatch.setattr(status_mode, "BASE_DIR", chain_dir)
+        assert status_mode.show_status("k1", field="status") == 0
+        assert status_mode.show_status("k1", field="round") == 0
+        assert status_mode.show_status("k1", field="stop_reason") == 0
+        assert capsys.readouterr().out == "RUNNING\n1\n\n"
+        assert status_mode.show_status("k1", field="gibtsnicht") == 1
+        assert "status" in capsys.readouterr().err
+
+    def test_pools_read_only(self, chain_dir, monkeypatch):
+        from llmauto.core import taskpool
+        from llmauto.core.taskpool import TaskPool
+
+        source = chain_dir / "AUFGABEN.txt"
+        source.write_text("- [ ] a\n- [ ] b\n", encoding="utf-8")
+        pool_config = {"type": "file", "path": str(source)}
+        state_dir = chain_dir / "state" / "k1"
+        TaskPool("plan", pool_config, state_dir).claim("w")
+        pool_file = state_dir / "pools" / "plan.json"
+        before = pool_file.read_bytes()
+        source.write_text("- [ ] a\n- [ ] b\n- [ ] c\n", encoding="utf-8")
+        monkeypatch.setattr(status_mode, "load_chain", lambda name: {"task_pools": {"plan": pool_config}})
+        monkeypatch.setattr(taskpool, "file_lock", lambda *a, **k: pytest.fail("Pool-Lock genommen"))
+        info = status_mode.chain_status("k1", chain_dir)
+        assert info["pools"]["plan"] == {"open": 1, "claimed": 1, "done": 0, "failed": 0}
+        assert pool_file.read_bytes() == before
+
+
+class TestFastPath:
+    def test_status_json_without_engine(self):
+        out = _python(
+            "import sys\n"
+            "from llmauto.llmauto import main\n"
+            "sys.argv = ['llmauto', 'chain', 'list', '--json']\n"
+            "main()\n"
+            "print(sorted(m for m in sys.modules if m.startswith('llmauto.')))\n"
+            "print('asyncio' in sys.modules)\n"
+        )
+        *payload, modules, has_asyncio = out.strip().splitlines()
+        assert isinstance(json.loads("\n".join(payload)), list)
+        assert "llmauto.modes.chain" not in modules
+        assert "llmauto.core.runner" not in modules
+        assert has_asyncio == "False"
+
+    def test_import_budget(self):
+        out = _python(
+            "import time\n"
+            "start = time.perf_counter()\n"
+            "import llmauto.llmauto, llmauto.modes.status\n"
+            "print(time.perf_counter() - start)\n"
+        )
+        assert float(out) < IMPORT_BUDGET_SECONDS
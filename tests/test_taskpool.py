@@ -0,0 +1,165 @@
+"""Tests fuer llmauto.core.taskpool -- Aufgabenpools mit Claim/Lease/Complete."""
+import os
+import time
+
+import pytest
+
+from llmauto.core.taskpool import TaskPool, file_lock, parse_task_file
+
+
+def _file_pool(tmp_path, text, **extra):
+    source = tmp_path / "AUFGABEN.txt"
+    source.write_text(text, encoding="utf-8")
+    config = {"type": "file", "path": str(source)}
+    config.update(extra)
+    return TaskPool("plan", config, tmp_path / "state"), source
+
+
+class TestParseTaskFile:
+    def test_checkboxes(self):
+        tasks = parse_task_file("# Titel\n- [ ] eins\n- [x] zwei\nNotiz\n")
+        assert [(t[1], t[3]) for t in tasks] == [("eins", False), ("zwei", True)]
+
+    def test_plain_lines_and_priority(self):
+        tasks = parse_task_file("# Titel\naufgabe a\n[P1] aufgabe b\n")
+        assert [(t[1], t[2]) for t in tasks] == [("aufgabe a", 5), ("[P1] aufgabe b", 1)]
+
+    def test_duplicate_titles_get_own_ids(self):
+        tasks = parse_task_file("- [ ] tests\n- [ ] doku\n- [ ] tests\n")
+        assert len({t[0] for t in tasks}) == 3
+        assert tasks[0][0] == parse_task_file("- [ ] tests\n")[0][0]
+
+
+class TestClaim:
+    def test_priority_then_file_order(self, tmp_path):
+        pool, _ = _file_pool(tmp_path, "- [ ] a\n- [ ] [P1] b\n- [ ] c\n")
+        assert pool.claim("w1")["title"] == "[P1] b"
+        assert pool.claim("w2")["title"] == "a"
+        assert pool.claim("w3")["title"] == "c"
+        assert pool.claim("w4") is None
+
+    def test_no_double_claim_across_instances(self, tmp_path):
+        pool_a, source = _file_pool(tmp_path, "- [ ] a\n- [ ] b\n")
+        pool_b = TaskPool("plan", {"type": "file", "path": str(source)}, tmp_path / "state")
+        first = pool_a.claim("w1")
+        second = pool_b.claim("w2")
+        assert first["id"] != second["id"]
+        assert pool_a.claim("w3") is None
+
+    def test_expired_lease_is_reclaimed(self, tmp_path):
+        pool, _ = _file_pool(tmp_path, "- [ ] a\n")
+        pool.claim("w1", lease_seconds=-1)
+        assert pool.claim("w2")["holder"] == "w2"
+
+    def test_done_in_source_is_skipped(self, tmp_path):
+        pool, source = _file_pool(tmp_path, "- [ ] a\n- [ ] b\n")
+        source.write_text("- [x] a\n- [ ] b\n", encoding="utf-8")
+        st = source.stat()
+        os.utime(source, (st.st_atime, st.st_mtime + 5))
+        assert pool.claim("w1")["title"] == "b"
+
+    def test_duplicate_lines_are_separate_tasks(self, tmp_path):
+        pool, _ = _file_pool(tmp_path, "- [ ] tests\n- [ ] tests\n")
+        first, second = pool.claim("w1"), pool.claim("w2")
+        assert second is not None and first["id"] != second["id"]
+
+
+class TestSourceChanges:
+    @staticmethod
+    def _rewrite(source, text):
+        source.write_text(text, encoding="utf-8")
+        st = source.stat()
+        os.utime(source, (st.st_atime, st.st_mtime + 5))
+
+    def test_removed_and_reworded_lines_are_retired(self, tmp_path):
+        pool, source = _file_pool(tmp_path, "- [ ] a\n- [ ] b\n- [ ] c\n")
+        assert pool.claim("w1")["title"] == "a"
+        self._rewrite(source, "- [ ] b neu\n")
+        assert pool.counts() == {"open": 1, "claimed": 0, "done": 3, "failed": 0}
+        assert pool.claim("w2")["title"] == "b neu"
+        assert pool.claim("w3") is None
+
+    def test_retired_task_reopens_when_line_returns(self, tmp_path):
+        pool, source = _file_pool(tmp_path, "- [ ] a\n- [ ] b\n")
+        pool.complete(pool.claim("w")["id"])
+        self._rewrite(source, "- [ ] a\n")
+        assert pool.is_exhausted() is True
+        self._rewrite(source, "- [ ] a\n- [ ] b\n")
+        assert pool.counts()["open"] == 1
+        assert pool.claim("w")["title"] == "b"
+
+    def test_list_pool_retires_removed_tasks(self, tmp_path):
+        TaskPool("l", {"type": "list", "tasks": ["a", "b"]}, tmp_path / "state").counts()
+        pool = TaskPool("l", {"type": "list", "tasks": ["b"]}, tmp_path / "state")
+        assert pool.counts()["open"] == 1
+        assert pool.claim("w")["title"] == "b"
+
+
+class TestComplete:
+    def test_success_and_exhausted(self, tmp_path):
+        pool, _ = _file_pool(tmp_path, "- [ ] a\n")
+        task = pool.claim("w1")
+        assert pool.is_exhausted() is False
+        assert pool.complete(task["id"]) == "done"
+        assert pool.is_exhausted() is True
+
+    def test_failure_requeues_until_max_attempts(self, tmp_path):
+        pool, _ = _file_pool(tmp_path, "- [ ] a\n", max_attempts=2)
+        assert pool.complete(pool.claim("w")["id"], success=False) == "open"
+        assert pool.complete(pool.claim("w")["id"], success=False) == "failed"
+        assert pool.claim("w") is None
+
+    def test_release_keeps_attempts(self, tmp_path):
+        pool, _ = _file_pool(tmp_path, "- [ ] a\n")
+        task = pool.claim("w")
+        pool.release(task["id"])
+        again = pool.claim("w")
+        assert again["id"] == task["id"]
+        assert again["attempts"] == 0
+
+    def test_persisted_under_state(self, tmp_path):
+        pool, source = _file_pool(tmp_path, "- [ ] a\n")
+        pool.complete(pool.claim("w")["id"])
+        reopened = TaskPool("plan", {"type": "file", "path": str(source)}, tmp_path / "state")
+        assert reopened.counts()["done"] == 1
+        assert (tmp_path / "state" / "pools" / "plan.json").exists()
+
+
+class TestPoolTypes:
+    def test_directory_pool(self, tmp_path):
+        tasks = tmp_path / "tasks"
+        tasks.mkdir()
+        (tasks / "01.md").write_text("# Erste Aufgabe\nDetails", encoding="utf-8")
+        (tasks / "02.md").write_text("Zweite", encoding="utf-8")
+        pool = TaskPool("d", {"type": "directory", "path": str(tasks), "pattern": "*.md"},
+                        tmp_path / "state")
+        task = pool.claim("w")
+        assert task["title"] == "Erste Aufgabe"
+        assert task["source"].endswith("01.md")
+
+    def test_list_pool(self, tmp_path):
+        pool = TaskPool("l", {"type": "list", "tasks": ["a", {"title": "b", "priority": 1}]},
+                        tmp_path / "state")
+        assert pool.claim("w")["title"] == "b"
+
+    def test_unsupported_type(self, tmp_path):
+        with pytest.raises(ValueError):
+            TaskPool("g", {"type": "github_issues"}, tmp_path / "state")
+
+
+class TestFileLock:
+    def test_stale_lock_taken_over(self, tmp_path):
+        lock = tmp_path / "x.lock"
+        lock.write_text("123")
+        old = time.time() - 120
+        os.utime(lock, (old, old))
+        with file_lock(lock, timeout=1):
+            assert lock.exists()
+        assert not lock.exists()
+
+    def test_timeout(self, tmp_path):
+        lock = tmp_path / "x.lock"
+        lock.write_text("123")
+        with pytest.raises(TimeoutError):
+            with file_lock(lock, timeout=0.1):
+                pass
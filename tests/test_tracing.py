@@ -0,0 +1,123 @@
+"""Tests fuer llmauto.core.tracing -- Chrome-Trace-Events eines Ketten-Laufs."""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from llmauto.core import tracing
+from llmauto.core.runner import CLAUDE_CMD_ENV, ClaudeRunner
+
+FAKE_CLAUDE = Path(__file__).parent.parent / "scripts" / "fake_claude.py"
+
+
+def _spans(tracer):
+    tracer.close()
+    return [e for e in tracing.load_events(tracer.path) if e["ph"] == "X"]
+
+
+class TestSpans:
+    def test_noop_without_tracer(self):
+        with tracing.span("x", a=1) as args:
+            args["b"] = 2
+        tracing.instant("y")
+
+    def test_span_written_with_args(self, tmp_path):
+        tracer = tracing.Tracer(tmp_path / "t.jsonl", "kette")
+        with tracing.activate(tracer):
+            with tracing.span("aussen", "chain", a=1) as args:
+                with tracing.span("innen", "io"):
+                    pass
+                args["ergebnis"] = "ok"
+        inner, outer = _spans(tracer)
+        assert inner["name"] == "innen" and outer["name"] == "aussen"
+        assert outer["args"] == {"a": 1, "ergebnis": "ok"}
+        assert outer["ts"] <= inner["ts"]
+        assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"] + 1
+
+    def test_lanes_per_task(self, tmp_path):
+        tracer = tracing.Tracer(tmp_path / "t.jsonl", "kette")
+
+        async def link(i):
+            with tracing.lane(i, f"link-{i}"), tracing.span(f"link-{i}", "link"):
+                await asyncio.sleep(0.01)
+
+        async def main():
+            with tracing.activate(tracer):
+                await asyncio.gather(link(1), link(2))
+                with tracing.span("danach"):
+                    pass
+
+        asyncio.run(main())
+        events = tracing.load_events(tracer.path)
+        tracer.close()
+        tids = {e["name"]: e["tid"] for e in events if e["ph"] == "X"}
+        assert tids == {"link-1": 1, "link-2": 2, "danach": 0}
+        names = {e["args"]["name"] for e in events if e["name"] == "thread_name"}
+        assert {"link-1", "link-2"} <= names
+
+    def test_activate_resets(self, tmp_path):
+        tracer = tracing.Tracer(tmp_path / "t.jsonl", "kette")
+        with tracing.activate(tracer):
+            pass
+        with tracing.span("ausserhalb"):
+            pass
+        assert _spans(tracer) == []
+
+
+class TestRunnerSpans:
+    def test_cli_and_spawn_spans(self, tmp_path, monkeypatch):
+        monkeypatch.delenv(CLAUDE_CMD_ENV, raising=False)
+        monkeypatch.setenv("FAKE_CLAUDE_HANDOFF", "")
+        runner = ClaudeRunner(claude_cmd=[sys.executable, str(FAKE_CLAUDE)], timeout=30)
+        tracer = tracing.Tracer(tmp_path / "t.jsonl", "kette")
+        with tracing.activate(tracer):
+            runner.run("Hallo", model="m")
+        spans = {e["name"]: e for e in _spans(tracer)}
+        assert spans["CLI"]["args"]["returncode"] == 0
+        assert spans["CLI"]["args"]["model"] == "m"
+        assert "Prozessstart" in spans
+
+
+class TestFiles:
+    def test_start_trace_prunes_old_runs(self, tmp_path):
+        directory = tracing.trace_dir(tmp_path)
+        directory.mkdir()
+        for i in range(3):
+            (directory / f"2026010{i}-000000-1.jsonl").write_text("", encoding="utf-8")
+        tracer = tracing.start_trace("k", tmp_path, keep=2)
+        tracer.close()
+        traces = tracing.list_traces(tmp_path)
+        assert len(traces) == 2
+        assert tracer.path in traces
+
+    def test_load_skips_broken_lines(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        path.write_text('{"ph": "X", "name": "a", "ts": 0, "dur": 1}\n{"ph": "X", "na', encoding="utf-8")
+        assert len(tracing.load_events(path)) == 1
+
+    def test_summarize(self):
+        events = [
+            {"ph": "X", "name": "a", "cat": "link", "ts": 0, "dur": 3e6, "args": {"round": 1}},
+            {"ph": "X", "name": "CLI", "cat": "cli", "ts": 0, "dur": 2e6},
+            {"ph": "X", "name": "b", "cat": "link", "ts": 3e6, "dur": 1e6, "args": {"round": 1}},
+            {"ph": "X", "name": "Warten (cooldown)", "cat": "wait", "ts": 4e6, "dur": 1e6},
+        ]
+        info = tracing.summarize(events)
+        assert info["wall_s"] == 5.0
+        assert info["cli_s"] == 2.0 and info["wait_s"] == 1.0
+        assert [link["name"] for link in info["slowest_links"]] == ["a", "b"]
+
+    def test_show_trace_exports_chrome_json(self, tmp_path, capsys):
+        tracer = tracing.start_trace("k", tmp_path / "state" / "k")
+        with tracing.activate(tracer), tracing.span("a", "link", round=1):
+            pass
+        tracer.close()
+        output = tmp_path / "out.json"
+        assert tracing.show_trace("k", output=output, base_dir=tmp_path) == 0
+        data = json.loads(output.read_text(encoding="utf-8"))
+        assert any(e.get("name") == "a" for e in data["traceEvents"])
+        assert "1 Spans" in capsys.readouterr().out
+
+    def test_show_trace_without_runs(self, tmp_path, capsys):
+        assert tracing.show_trace("k", base_dir=tmp_path) == 1
+        assert tracing.show_trace("k", run="list", base_dir=tmp_path) == 1